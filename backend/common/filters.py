@@ -1,6 +1,8 @@
 import django_filters
+from django.db.models import Q
 from timekeeping.models import Holiday
-from payroll.models import PayrollCycle
+from payroll.models import PayrollCycle, PayrollRecord
+from payroll.services.helpers import normalize_month
 
 class HolidayFilter(django_filters.FilterSet):
     date = django_filters.DateFilter(field_name="date", lookup_expr="exact")
@@ -9,6 +11,7 @@ class HolidayFilter(django_filters.FilterSet):
     year = django_filters.NumberFilter(method="filter_year")
     type = django_filters.CharFilter(field_name="type", lookup_expr="iexact")
     is_national = django_filters.BooleanFilter(field_name="is_national")
+    branch = django_filters.NumberFilter(method="filter_branch")
 
     class Meta:
         model = Holiday
@@ -17,6 +20,10 @@ class HolidayFilter(django_filters.FilterSet):
     def filter_year(self, queryset, name, value):
         return queryset.filter(date__year=value)
 
+    def filter_branch(self, queryset, name, value):
+        # holidays observed by the branch: its local ones plus the nationwide ones
+        return queryset.filter(Q(branch_id=value) | Q(branch__isnull=True))
+
 
 class PayrollCycleFilter(django_filters.FilterSet):
     business = django_filters.NumberFilter(field_name="business_id")
@@ -25,4 +32,24 @@ class PayrollCycleFilter(django_filters.FilterSet):
 
     class Meta:
         model = PayrollCycle
-        fields = ["business", "cycle_type", "is_active"]
\ No newline at end of file
+        fields = ["business", "cycle_type", "is_active"]
+
+class PayrollRecordFilter(django_filters.FilterSet):
+    run = django_filters.NumberFilter(field_name="run_id")
+    employee = django_filters.NumberFilter(field_name="employee_id")
+    month = django_filters.CharFilter(method="filter_month")
+    cycle = django_filters.NumberFilter(field_name="payroll_cycle_id")
+    cycle_type = django_filters.CharFilter(field_name="payroll_cycle__cycle_type", lookup_expr="iexact")
+    component = django_filters.NumberFilter(field_name="component_id")
+    is_13th_month = django_filters.BooleanFilter(field_name="is_13th_month")
+
+    class Meta:
+        model = PayrollRecord
+        fields = ["run", "employee", "month", "cycle", "component", "is_13th_month"]
+
+    def filter_month(self, queryset, name, value):
+        # Accepts YYYY-MM or YYYY-MM-DD; records are stored on the 1st of the month
+        try:
+            return queryset.filter(month=normalize_month(value))
+        except ValueError:
+            return queryset.none()
@@ -0,0 +1,152 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset ("seek") pagination over a fixed, unique ordering.
+
+    Unlike DRF's CursorPagination (which seeks on the first ordering field only
+    and falls back to OFFSET for ties), the cursor here carries the full
+    ordering tuple of the last row, and the next page is fetched with a
+    lexicographic comparison:
+
+        (month, id) > (m0, id0)  ->  month > m0 OR (month = m0 AND id > id0)
+
+    so every page costs the same index range scan, however deep it is.
+    The last ordering field must be unique (normally "id").
+    Prefix a field with "-" to walk it in descending order.
+    """
+    ordering = ("id",)
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        fields = [f.lstrip("-") for f in self.ordering]
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model, fields)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(position))
+
+        # Fetch one extra row to know whether another page exists
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        self.next_position = None
+        if self.has_next and rows:
+            last = rows[-1]
+            self.next_position = [self._value_of(last, f) for f in fields]
+        return rows
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except ValueError:
+                pass
+        return self.page_size
+
+    # ---- cursor encoding ----
+    def decode_cursor(self, request, model, fields):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            if not isinstance(raw, list) or len(raw) != len(fields):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(fields, raw)
+            ]
+        except (ValueError, TypeError, UnicodeDecodeError, DjangoValidationError):
+            raise NotFound("Invalid cursor")
+
+    def encode_cursor(self, position):
+        payload = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in position])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    # ---- helpers ----
+    @staticmethod
+    def _value_of(obj, field):
+        if isinstance(obj, dict):
+            return obj[field]
+        value = getattr(obj, field)
+        return getattr(value, "pk", value)
+
+    def _seek_filter(self, position) -> Q:
+        """Expand a tuple comparison into OR-ed prefix equalities (portable across backends)."""
+        clauses = []
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            op = "lt" if field.startswith("-") else "gt"
+            eq = {f.lstrip("-"): position[j] for j, f in enumerate(self.ordering[:i])}
+            clauses.append(Q(**eq, **{f"{name}__{op}": position[i]}))
+        return reduce(or_, clauses)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor returned in `next`.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Rows per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class PayrollRecordPagination(KeysetPagination):
+    ordering = ("month", "id")
+
+
+class TimeLogPagination(KeysetPagination):
+    ordering = ("-date", "-id")
+    page_size = 200
@@ -1,6 +1,13 @@
-from datetime import datetime
+import json
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+
 from .fetch_holidays import get_holidays
 
+# Bundled rules: fixed dates, Easter offsets, nth weekdays and per-year lunar dates
+RULES_PATH = Path(__file__).resolve().parent / "data" / "ph_holiday_rules.json"
+
 # Based on historical data and common classifications in the Philippines.
 # The Nager.Date API does not distinguish between Regular and Special holidays for PH.
 REGULAR_HOLIDAY_NAMES = [
@@ -27,7 +34,93 @@ SPECIAL_HOLIDAY_NAMES = [
     "New Year's Eve",
 ]
 
-def get_ph_recurring_holidays(year: int):
+
+@lru_cache(maxsize=1)
+def load_rules() -> dict:
+    with open(RULES_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def rules_version() -> str:
+    return load_rules()["version"]
+
+
+def easter_sunday(year: int) -> date:
+    """Gregorian Easter (anonymous Gregorian / Meeus-Jones-Butcher algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year: int, month: int, weekday: int, nth: int) -> date:
+    """nth (1-based) `weekday` (Monday=0) of the month; nth=-1 is the last one."""
+    if nth < 0:
+        last = (date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1))
+        return last - timedelta(days=(last.weekday() - weekday) % 7)
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (nth - 1))
+
+
+def compute_ph_holidays(year: int):
+    """
+    Philippine nationwide holidays for `year` from the bundled rules, offline.
+    Same shape as before: {"REGULAR": [(name, date), ...], "SPECIAL": [...]}, by date.
+    When two holidays fall on the same date (e.g. Araw ng Kagitingan on Maundy
+    Thursday in 2020) only one row is kept, a REGULAR one if any.
+    """
+    rules = load_rules()
+    entries = []
+    for r in rules["fixed"]:
+        entries.append((r["name"], r["type"], date(year, r["month"], r["day"])))
+    easter = easter_sunday(year)
+    for r in rules["easter"]:
+        entries.append((r["name"], r["type"], easter + timedelta(days=r["offset"])))
+    for r in rules["weekday"]:
+        entries.append((r["name"], r["type"], nth_weekday(year, r["month"], r["weekday"], r["nth"])))
+    for name, r in rules["dated"].items():
+        for raw in r["dates"]:
+            d = date.fromisoformat(raw)
+            if d.year == year:
+                entries.append((name, r["type"], d))
+
+    by_date = {}
+    for name, htype, d in sorted(entries, key=lambda e: (e[1] != "REGULAR", e[2])):
+        by_date.setdefault(d, (name, htype))
+    out = {"REGULAR": [], "SPECIAL": []}
+    for d in sorted(by_date):
+        name, htype = by_date[d]
+        out[htype].append((name, d))
+    return out
+
+
+def get_ph_recurring_holidays(year: int, refresh: bool = False):
+    """
+    Philippine holidays for a year, computed offline from the bundled rules.
+    refresh=True also asks the Nager.Date API and adds the dates it knows that
+    the rules cannot compute (proclaimed holidays such as Eid'l Fitr); when the
+    API is unreachable the offline result is returned unchanged.
+    """
+    computed = compute_ph_holidays(year)
+    if not refresh:
+        return computed
+
+    online = fetch_ph_holidays(year)
+    known = {d for group in computed.values() for _, d in group}
+    for htype in ("REGULAR", "SPECIAL"):
+        extra = [(name, d) for name, d in online[htype] if d not in known]
+        computed[htype] = sorted(computed[htype] + extra, key=lambda e: e[1])
+    return computed
+
+
+def fetch_ph_holidays(year: int):
     """
     Fetches Philippine holidays for a given year from the Nager.Date API
     and categorizes them into REGULAR and SPECIAL.
@@ -7,7 +7,7 @@ from employees.views import EmployeeViewSet
 from payroll.views import BatchPayrollGenerationView, Generate13thMonthView, GeneratePayrollView, PayrollSummaryView, PayslipPreviewView, SalaryComponentViewSet, SalaryStructureViewSet, PayrollCycleViewSet, PayrollRecordViewSet, PayrollPolicyViewSet, SalaryRateViewSet, PayrollRunViewSet
 from positions.views import PositionViewSet
 from timekeeping.views import TimeLogViewSet, HolidayViewSet
-from timekeeping.views import TimeLogImportView
+from timekeeping.views import BulkTimeLogUploadView, TimeLogImportView, TimeLogImportJobViewSet, PunchUploadView
 from email_sender.views import SendSinglePayslipView, SendBulkPayslipView
 
 router = DefaultRouter()
@@ -20,6 +20,7 @@ router.register('components', SalaryComponentViewSet)
 router.register('structure', SalaryStructureViewSet)
 router.register('timekeeping', TimeLogViewSet)
 router.register('holidays', HolidayViewSet)
+router.register('timelog-import-jobs', TimeLogImportJobViewSet, basename='timelog-import-jobs')
 router.register('payrollcycle', PayrollCycleViewSet)
 router.register('policy', PayrollPolicyViewSet)
 router.register('records', PayrollRecordViewSet)
@@ -30,7 +31,9 @@ urlpatterns = [
     # Non-ViewSet endpoints go here:
     path('email/send-single-payslip/', SendSinglePayslipView.as_view(), name='send-single-payslip'),
     path('email/send-bulk-payslip/', SendBulkPayslipView.as_view(), name='send-bulk-payslip'),
+    path('timelogs/bulk/', BulkTimeLogUploadView.as_view(), name='bulk-timelog-upload'),
     path('timelogs/import/', TimeLogImportView.as_view(), name='timelog-import'),
+    path('punches/upload/', PunchUploadView.as_view(), name='punch-upload'),
     path('generate/', GeneratePayrollView.as_view(), name='generate-payroll'),
     path('summary/', PayrollSummaryView.as_view(), name='payroll-summary'),
     path('13th/', Generate13thMonthView.as_view(), name='generate-13th'),
@@ -216,6 +216,31 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# ---------------------------------------------------------------------------
+# Payroll storage
+# ---------------------------------------------------------------------------
+# PostgreSQL only: store PayrollRecord as a table RANGE-partitioned by month.
+# Applied by payroll migration 0009 or `manage.py partition_payroll_records`.
+PAYROLL_PARTITION_RECORDS = env.bool('PAYROLL_PARTITION_RECORDS', default=False)
+# Month partitions are created ahead by `manage.py partition_payroll_records` (cron):
+# the current month and this many after it. Rows of a month without one go to DEFAULT
+# until the next run moves them.
+PAYROLL_PARTITION_MONTHS_AHEAD = env.int('PAYROLL_PARTITION_MONTHS_AHEAD', default=3)
+
+# Cold archive: completed runs (and the TimeLogs of their cutoffs) older than this many
+# years are moved to gzip JSONL files by `manage.py archive_payroll`.
+PAYROLL_ARCHIVE_ROOT = env('PAYROLL_ARCHIVE_ROOT', default=str(BASE_DIR / 'archive'))
+PAYROLL_ARCHIVE_AFTER_YEARS = env.int('PAYROLL_ARCHIVE_AFTER_YEARS', default=2)
+# Archived payslip reads parse a business-year's records file once per process and
+# index it per employee-month; this many years stay parsed (re-read when a file grows).
+ARCHIVE_INDEX_CACHE_SIZE = env.int('ARCHIVE_INDEX_CACHE_SIZE', default=4)
+
+# Background timelog imports (timekeeping.importers.jobs): a RUNNING job whose
+# heartbeat is older than this many seconds is requeued by the next worker poll,
+# up to TIMELOG_IMPORT_MAX_ATTEMPTS runs; then it is marked FAILED.
+TIMELOG_IMPORT_STALE_AFTER = env.int('TIMELOG_IMPORT_STALE_AFTER', default=600)
+TIMELOG_IMPORT_MAX_ATTEMPTS = env.int('TIMELOG_IMPORT_MAX_ATTEMPTS', default=3)
+
 # ---------------------------------------------------------------------------
 # Default PK
 # ---------------------------------------------------------------------------
@@ -223,4 +248,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Uploaded files (timelog import jobs and their error reports)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = env('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
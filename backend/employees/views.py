@@ -8,6 +8,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import viewsets, status
 from payroll.models import SalaryRate
+from payroll.services.salary_rates import overlapping_rates
 from django.db import transaction
 from rest_framework.parsers import MultiPartParser
 from .importer import EmployeeImporter
@@ -92,8 +93,15 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         emp = self.get_object()
         rate_ser = SalaryRateInlineSerializer(data=request.data)
         rate_ser.is_valid(raise_exception=True)
+        data = rate_ser.validated_data
+        clash = overlapping_rates(emp, data["start_date"], data.get("end_date")).first()
+        if clash:
+            return Response(
+                {"detail": f"Overlaps the rate from {clash.start_date} to {clash.end_date or 'open'}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         with transaction.atomic():
-            rate = SalaryRate.objects.create(employee=emp, **rate_ser.validated_data)
+            rate = SalaryRate.objects.create(employee=emp, **data)
         return Response(
             {"employee_id": emp.id, "salary_rate": SalaryRateInlineSerializer(rate).data},
             status=status.HTTP_201_CREATED,
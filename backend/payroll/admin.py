@@ -6,6 +6,11 @@ from .models import (
     SalaryStructure,
     PayrollRecord,
     PayrollCycle,  # 👈 NEW
+    PayrollArchive,
+    ContributionBracket,
+    ContributionTable,
+    PayrollInputChange,
+    RetroAdjustment,
 )
 
 @admin.register(Position)
@@ -52,3 +57,35 @@ class PayrollPolicyAdmin(admin.ModelAdmin):
     )
     search_fields = ('business__name',)
     autocomplete_fields = ['business']
+
+
+@admin.register(PayrollArchive)
+class PayrollArchiveAdmin(admin.ModelAdmin):
+    list_display = ('business', 'year', 'run_count', 'record_count', 'timelog_count', 'archived_at')
+    list_filter = ('business', 'year')
+    readonly_fields = ('records_path', 'timelogs_path', 'archived_at')
+
+
+class ContributionBracketInline(admin.TabularInline):
+    model = ContributionBracket
+    extra = 0
+
+
+@admin.register(ContributionTable)
+class ContributionTableAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'effective_from', 'name', 'source')
+    list_filter = ('kind',)
+    inlines = [ContributionBracketInline]
+
+
+@admin.register(PayrollInputChange)
+class PayrollInputChangeAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'kind', 'date_from', 'date_to', 'recorded_at', 'processed_at', 'error')
+    list_filter = ('kind', 'processed_at')
+    raw_id_fields = ('employee',)
+
+
+@admin.register(RetroAdjustment)
+class RetroAdjustmentAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'source_run', 'target_run', 'amount', 'created_at')
+    raw_id_fields = ('employee', 'source_run', 'target_run')
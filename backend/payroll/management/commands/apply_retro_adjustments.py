@@ -0,0 +1,57 @@
+# payroll/management/commands/apply_retro_adjustments.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from organization.models import Business
+from payroll.models import PayrollRun
+from payroll.services.retro import apply_retro, retry_failed_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the paid payroll cycles touched by pending SalaryRate / TimeLog changes "
+        "and post the differences as RETRO_ADJ records in the next open (PENDING) run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", type=int, help="Business ID (default: all businesses)")
+        parser.add_argument("--run", type=int, help="PENDING PayrollRun to receive every adjustment")
+        parser.add_argument("--dry-run", action="store_true", help="Only report the adjustments")
+        parser.add_argument(
+            "--retry-failed", action="store_true",
+            help="First queue again the changes whose recompute failed (after fixing the cause)",
+        )
+
+    def handle(self, *args, **opts):
+        business = None
+        if opts["business"]:
+            business = Business.objects.filter(id=opts["business"]).first()
+            if business is None:
+                raise CommandError(f"Business {opts['business']} not found.")
+        target = None
+        if opts["run"]:
+            target = PayrollRun.objects.select_related("payroll_cycle").filter(id=opts["run"]).first()
+            if target is None:
+                raise CommandError(f"PayrollRun {opts['run']} not found.")
+            if target.status != "PENDING":
+                raise CommandError(f"PayrollRun {target.id} is {target.status}; adjustments need a PENDING run.")
+            business = business or target.business
+
+        if opts["retry_failed"] and not opts["dry_run"]:
+            self.stdout.write(f"{retry_failed_changes(business)} failed changes queued again")
+        result = apply_retro(business=business, target_run=target, dry_run=opts["dry_run"])
+        for adj in result.adjustments:
+            self.stdout.write(
+                f"employee {adj['employee_id']}: {adj['amount']} for run {adj['source_run_id']} "
+                f"-> run {adj['target_run_id']}"
+            )
+        for miss in result.unresolved:
+            self.stdout.write(self.style.WARNING(
+                f"employee {miss['employee_id']} (run {miss['run_id']}): {miss['reason']}"
+            ))
+        verb = "would be posted (dry run)" if result.dry_run else "posted"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(result.adjustments)} adjustments {verb} from {result.changes} changes "
+            f"({result.recomputed} employee-cycles recomputed, {result.processed} changes processed)"
+        ))
@@ -0,0 +1,49 @@
+# payroll/management/commands/archive_payroll.py
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from organization.models import Business
+from payroll.services.archive import archivable_years, archive_year
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed payroll runs (records + the TimeLogs of their cutoffs) older than "
+        "PAYROLL_ARCHIVE_AFTER_YEARS into gzip JSONL files under PAYROLL_ARCHIVE_ROOT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", type=int, help="Business ID (default: all businesses)")
+        parser.add_argument("--year", type=int, help="Archive this year only (must be outside the horizon)")
+        parser.add_argument("--after-years", type=int, default=None,
+                            help=f"Override the horizon (default: {settings.PAYROLL_ARCHIVE_AFTER_YEARS})")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+
+    def handle(self, *args, **opts):
+        businesses = Business.objects.all()
+        if opts["business"]:
+            businesses = businesses.filter(id=opts["business"])
+            if not businesses.exists():
+                raise CommandError(f"Business {opts['business']} not found.")
+
+        total_records = total_logs = 0
+        for business in businesses:
+            years = archivable_years(business, horizon_years=opts["after_years"])
+            if opts["year"]:
+                years = [y for y in years if y == opts["year"]]
+            for year in years:
+                result = archive_year(business, year, dry_run=opts["dry_run"])
+                total_records += result["records"]
+                total_logs += result["timelogs"]
+                prefix = "[dry-run] " if opts["dry_run"] else ""
+                self.stdout.write(
+                    f"{prefix}{business.name} {year}: {result['runs']} runs, "
+                    f"{result['records']} records, {result['timelogs']} timelogs"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Archived {total_records} payroll records and {total_logs} timelogs"
+            + (" (dry run)" if opts["dry_run"] else "")
+        ))
@@ -0,0 +1,44 @@
+# payroll/management/commands/partition_payroll_records.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from payroll.models import PayrollRun
+from payroll.services.partitions import (
+    convert_to_partitioned,
+    ensure_month_partition,
+    ensure_upcoming_partitions,
+    is_partitioned,
+    partitioning_enabled,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert PayrollRecord to a month-partitioned table (PostgreSQL) and create partitions for every run "
+        "month, the upcoming months and any month left in the DEFAULT partition. Run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead", type=int, default=None,
+            help="Months after the current one to create (default: settings.PAYROLL_PARTITION_MONTHS_AHEAD).",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning is only supported on PostgreSQL.")
+        if not partitioning_enabled():
+            raise CommandError("Set PAYROLL_PARTITION_RECORDS=true to enable partitioning.")
+
+        if convert_to_partitioned():
+            self.stdout.write(self.style.SUCCESS("Converted payroll records to a partitioned table."))
+        elif is_partitioned():
+            self.stdout.write("Payroll records are already partitioned.")
+
+        created = 0
+        for month in PayrollRun.objects.values_list("month", flat=True).distinct():
+            created += int(ensure_month_partition(month))
+        created += ensure_upcoming_partitions(options["ahead"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Month partitions created: {created}"))
@@ -0,0 +1,44 @@
+# payroll/management/commands/prune_blank_timelogs.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from organization.models import Business
+from payroll.services.attendance import prune_blank_timelogs
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete placeholder absent TimeLogs (no punches, OT, late, undertime, holiday or rest-day "
+        "flag) on scheduled workdays, where the calendar derives the same absence."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--business", type=int, help="Business ID (default: all businesses)")
+        parser.add_argument("--before", help="Only rows dated before YYYY-MM-DD")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows")
+
+    def handle(self, *args, **opts):
+        business = None
+        if opts["business"]:
+            business = Business.objects.filter(id=opts["business"]).first()
+            if business is None:
+                raise CommandError(f"Business {opts['business']} not found.")
+        before = None
+        if opts["before"]:
+            try:
+                before = datetime.strptime(opts["before"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--before must be YYYY-MM-DD.")
+
+        batch_size = max(1, opts["batch_size"])
+        if opts["dry_run"]:
+            count = prune_blank_timelogs(before, business, batch_size=batch_size, dry_run=True)
+            self.stdout.write(self.style.SUCCESS(f"✅ {count} blank timelogs would be deleted (dry run)"))
+            return
+
+        deleted = prune_blank_timelogs(before, business, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"✅ Deleted {deleted} blank timelogs"))
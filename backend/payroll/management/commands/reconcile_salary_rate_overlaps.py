@@ -0,0 +1,90 @@
+# payroll/management/commands/reconcile_salary_rate_overlaps.py
+import csv
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from payroll.models import SalaryRate
+from payroll.services.salary_rates import resolved_periods
+
+
+class Command(BaseCommand):
+    help = (
+        "List employees whose SalaryRate periods overlap, which blocks payroll migration 0012. "
+        "With --apply, rewrite each one's rates as the non-overlapping periods payroll already "
+        "resolves them to (the rate with the latest start wins), so no paid amount changes: "
+        "overlapped rates are closed, split or deleted after writing the old rows to --export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employee", type=int, help="Only this employee ID")
+        parser.add_argument("--apply", action="store_true", help="Rewrite the rates (default: report only).")
+        parser.add_argument("--export", help="CSV file receiving every changed or deleted row; required with --apply.")
+
+    def handle(self, *args, **opts):
+        if opts["apply"] and not opts["export"]:
+            raise CommandError("--apply needs --export so the original rates are kept somewhere.")
+
+        with transaction.atomic():
+            rates = SalaryRate.objects.order_by("employee_id", "start_date", "id")
+            if opts["employee"]:
+                rates = rates.filter(employee_id=opts["employee"])
+            if opts["apply"]:
+                rates = rates.select_for_update()
+            rows = list(rates.values_list("id", "employee_id", "amount", "start_date", "end_date"))
+
+            plans = []  # (employee_id, rows, periods)
+            for employee_id, group in groupby(rows, key=lambda r: r[1]):
+                group = list(group)
+                periods = resolved_periods((r[0], r[3], r[4]) for r in group)
+                if sorted(periods) != sorted((r[0], r[3], r[4]) for r in group):
+                    plans.append((employee_id, group, periods))
+            if not plans:
+                self.stdout.write(self.style.SUCCESS("✅ No overlapping SalaryRate periods."))
+                return
+
+            for employee_id, group, periods in plans:
+                self.stdout.write(f"employee {employee_id}:")
+                for pk, _, amount, start, end in group:
+                    self.stdout.write(f"  rate {pk}: {amount} {start} → {end or 'open'}")
+                for pk, start, end in periods:
+                    self.stdout.write(f"  becomes: rate {pk} {start} → {end or 'open'}")
+            if not opts["apply"]:
+                self.stdout.write(self.style.WARNING(
+                    f"{len(plans)} employee(s) with overlapping rates; nothing changed. "
+                    f"Re-run with --apply --export FILE."
+                ))
+                return
+
+            # Payroll resolves every day to the same amount before and after, so
+            # no input change is recorded: plain updates / bulk writes, no signals
+            changed, created, deleted = [], [], []
+            for employee_id, group, periods in plans:
+                by_id = {r[0]: r for r in group}
+                kept = set()
+                for pk, start, end in periods:
+                    if pk in kept:
+                        created.append(SalaryRate(employee_id=employee_id, amount=by_id[pk][2], start_date=start, end_date=end))
+                        continue
+                    kept.add(pk)
+                    if (start, end) != (by_id[pk][3], by_id[pk][4]):
+                        changed.append((by_id[pk], start, end))
+                deleted += [r for pk, r in by_id.items() if pk not in kept]
+
+            with open(opts["export"], "w", newline="", encoding="utf-8") as fh:
+                writer = csv.writer(fh)
+                writer.writerow(["action", "id", "employee_id", "amount", "start_date", "end_date"])
+                writer.writerows(["changed", *r] for r, _, _ in changed)
+                writer.writerows(["deleted", *r] for r in deleted)
+            # shrink before adding, so no step widens an overlap
+            doomed = SalaryRate.objects.filter(pk__in=[r[0] for r in deleted])
+            doomed._raw_delete(doomed.db)
+            for r, start, end in changed:
+                SalaryRate.objects.filter(pk=r[0]).update(start_date=start, end_date=end)
+            SalaryRate.objects.bulk_create(created)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(plans)} employee(s) reconciled: {len(changed)} rate(s) changed, {len(created)} added, "
+            f"{len(deleted)} deleted; original rows saved to {opts['export']}."
+        ))
@@ -0,0 +1,27 @@
+# payroll/management/commands/seed_contribution_tables.py
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.services.contribution_tables import SEED_PATH, load_seed, seed_contribution_tables
+
+
+class Command(BaseCommand):
+    help = "Store the bundled SSS / PhilHealth / Pag-IBIG / withholding tax table versions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help=f"Seed file (default: {SEED_PATH.name})")
+        parser.add_argument("--replace", action="store_true",
+                            help="Rewrite the brackets of versions that already exist")
+
+    def handle(self, *args, **opts):
+        path = Path(opts["file"]) if opts["file"] else None
+        try:
+            version = load_seed(path).get("version", "?")
+            counts = seed_contribution_tables(path, replace=opts["replace"])
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Could not seed contribution tables: {e}")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Contribution tables {version}: {counts['created']} created, "
+            f"{counts['replaced']} replaced, {counts['kept']} kept"
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0009_delete_workschedulepolicy'),
+        ('payroll', '0007_alter_payrollrecord_payroll_cycle_payrollrun_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payrollrecord',
+            index=models.Index(fields=['employee', 'month', 'is_13th_month'], name='payrec_emp_month_13th_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollrecord',
+            index=models.Index(fields=['month', 'payroll_cycle'], name='payrec_month_cycle_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollrecord',
+            index=models.Index(fields=['month', 'id'], name='payrec_month_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salaryrate',
+            index=models.Index(fields=['employee', 'start_date'], name='salaryrate_emp_start_idx'),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Partitions payroll_payrollrecord by month on PostgreSQL when
+# settings.PAYROLL_PARTITION_RECORDS is on; a no-op everywhere else.
+#
+# The conversion SQL is frozen here on purpose: later changes to
+# payroll.services.partitions must not change what this migration did.
+
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations
+
+TABLE = "payroll_payrollrecord"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def _month_range(month):
+    start = month.replace(day=1)
+    end = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+    return start, end
+
+
+def partition_records(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or not getattr(settings, "PAYROLL_PARTITION_RECORDS", False):
+        return
+
+    legacy = f"{TABLE}_legacy"
+    qn = connection.ops.quote_name
+
+    with connection.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+        if cur.fetchone() is not None:
+            return
+
+        cur.execute(f"LOCK TABLE {qn(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        cur.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(legacy)}")
+
+        cur.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(%s) AND contype IN ('f', 'u', 'c')
+            """,
+            [legacy],
+        )
+        constraints = cur.fetchall()
+        cur.execute(
+            """
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.tablename = %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint c
+                  WHERE c.conrelid = to_regclass(%s) AND c.conname = i.indexname
+              )
+            """,
+            [legacy, legacy],
+        )
+        indexes = cur.fetchall()
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {qn(legacy)}")
+        max_id = cur.fetchone()[0]
+        cur.execute(f"SELECT DISTINCT date_trunc('month', month)::date FROM {qn(legacy)}")
+        months = [row[0] for row in cur.fetchall()]
+
+        cur.execute(f"CREATE TABLE {qn(TABLE)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) PARTITION BY RANGE (month)")
+        cur.execute(f"CREATE TABLE {qn(DEFAULT_PARTITION)} PARTITION OF {qn(TABLE)} DEFAULT")
+        for m in months:
+            start, end = _month_range(m)
+            name = f"{TABLE}_y{m.year:04d}m{m.month:02d}"
+            cur.execute(
+                f"CREATE TABLE {qn(name)} PARTITION OF {qn(TABLE)} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+
+        cur.execute(f"INSERT INTO {qn(TABLE)} SELECT * FROM {qn(legacy)}")
+        cur.execute(f"DROP TABLE {qn(legacy)}")
+
+        seq = f"{TABLE}_id_seq"
+        cur.execute(f"CREATE SEQUENCE {qn(seq)} OWNED BY {qn(TABLE)}.id")
+        cur.execute(f"ALTER TABLE {qn(TABLE)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [seq])
+        cur.execute("SELECT setval(%s, %s, %s)", [seq, max(max_id, 1), max_id > 0])
+
+        cur.execute(f"ALTER TABLE {qn(TABLE)} ADD PRIMARY KEY (id, month)")
+        for name, definition in constraints:
+            cur.execute(f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} {definition}")
+        legacy_ref = re.compile(rf"\bON (ONLY )?(\S+\.)?{re.escape(legacy)}\b")
+        for _name, definition in indexes:
+            cur.execute(legacy_ref.sub(f"ON {qn(TABLE)}", definition))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0008_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0003_workschedulepolicy'),
+        ('payroll', '0009_partition_payroll_records'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('records_path', models.CharField(max_length=500)),
+                ('timelogs_path', models.CharField(max_length=500)),
+                ('run_count', models.PositiveIntegerField(default=0)),
+                ('record_count', models.PositiveIntegerField(default=0)),
+                ('timelog_count', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_archives', to='organization.business')),
+            ],
+            options={
+                'ordering': ['business_id', 'year'],
+                'constraints': [models.UniqueConstraint(fields=('business', 'year'), name='uniq_payroll_archive_business_year')],
+            },
+        ),
+    ]
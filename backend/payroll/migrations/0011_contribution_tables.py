@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0010_payroll_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContributionTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SSS', 'SSS'), ('PHIC', 'PhilHealth'), ('HDMF', 'Pag-IBIG'), ('TAX', 'Withholding Tax (monthly)')], max_length=10)),
+                ('effective_from', models.DateField()),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('source', models.CharField(blank=True, help_text='Circular / revenue regulation', max_length=200)),
+            ],
+            options={
+                'ordering': ['kind', '-effective_from'],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'effective_from'), name='uniq_contribution_table_version')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContributionBracket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lower_bound', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('fixed_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('rate', models.DecimalField(decimal_places=4, default=0, max_digits=7)),
+                ('excess_over', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('salary_credit', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='brackets', to='payroll.contributiontable')),
+            ],
+            options={
+                'ordering': ['table', 'lower_bound'],
+                'constraints': [models.UniqueConstraint(fields=('table', 'lower_bound'), name='uniq_contribution_bracket_bound')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Forbids overlapping SalaryRate periods per employee on PostgreSQL with an
+# exclusion constraint; a no-op everywhere else (the serializers still check).
+
+from django.db import migrations
+
+CONSTRAINT = "salaryrate_no_overlap"
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("payroll", "SalaryRate")._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT a.employee_id, a.id, b.id FROM {table} a JOIN {table} b
+              ON a.employee_id = b.employee_id AND a.id < b.id
+             AND daterange(a.start_date, a.end_date, '[]') && daterange(b.start_date, b.end_date, '[]')
+             LIMIT 10
+            """
+        )
+        clashes = cursor.fetchall()
+    if clashes:
+        listed = ", ".join(f"employee {e}: rates {a} & {b}" for e, a, b in clashes)
+        raise RuntimeError(
+            f"Overlapping SalaryRate periods must be fixed before migrating ({listed}). "
+            f"Run `manage.py reconcile_salary_rate_overlaps` to list them all, then with "
+            f"--apply --export FILE to close them the way payroll already resolves them."
+        )
+    # int8range over the single employee id keeps this to core GiST operator classes (no btree_gist)
+    schema_editor.execute(
+        f"""
+        ALTER TABLE {table} ADD CONSTRAINT {CONSTRAINT} EXCLUDE USING gist (
+            int8range(employee_id, employee_id, '[]') WITH &&,
+            daterange(start_date, end_date, '[]') WITH &&
+        )
+        """
+    )
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("payroll", "SalaryRate")._meta.db_table
+    schema_editor.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {CONSTRAINT}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0011_contribution_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0009_delete_workschedulepolicy'),
+        ('payroll', '0012_salaryrate_no_overlap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollInputChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SALARY_RATE', 'Salary rate'), ('TIMELOG', 'Time log')], max_length=20)),
+                ('date_from', models.DateField()),
+                ('date_to', models.DateField(blank=True, null=True)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_input_changes', to='employees.employee')),
+            ],
+            options={
+                'ordering': ['recorded_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['employee', 'date_from'], name='inputchange_pending_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RetroAdjustment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('detail', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='retro_adjustments', to='employees.employee')),
+                ('source_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='retro_sources', to='payroll.payrollrun')),
+                ('target_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='retro_adjustments', to='payroll.payrollrun')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['employee', 'source_run'], name='retro_emp_source_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0013_retro_adjustments'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='payrollrecord',
+            name='payrec_emp_month_13th_idx',
+        ),
+    ]
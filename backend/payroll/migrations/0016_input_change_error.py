@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0015_cache_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollinputchange',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0016_input_change_error'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollrun',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
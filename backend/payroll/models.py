@@ -87,7 +87,14 @@ class PayrollRecord(models.Model):
     )
 
     class Meta:
+        # its (employee, month) prefix also serves summary / payslip / 13th-month reads
         unique_together = ('employee', 'month', 'component', 'payroll_cycle')
+        indexes = [
+            # Cycle-wide reads (registers, partitions by month)
+            models.Index(fields=["month", "payroll_cycle"], name="payrec_month_cycle_idx"),
+            # Keyset pagination order for /records/
+            models.Index(fields=["month", "id"], name="payrec_month_id_idx"),
+        ]
 
     def __str__(self):
         tag = " (13th)" if self.is_13th_month else f" ({self.payroll_cycle})"
@@ -124,6 +131,9 @@ class PayrollRun(models.Model):
 
     status = models.CharField(max_length=20, default="COMPLETED")  # Optional: PENDING, PROCESSING, etc.
     generated_at = models.DateTimeField(auto_now_add=True)
+    # Set when the run is finalised as paid (POST /api/payroll-runs/{id}/mark-paid/).
+    # A paid run is locked: later corrections reach it only as retro adjustments.
+    paid_at = models.DateTimeField(null=True, blank=True)
 
     notes = models.TextField(blank=True, null=True)
 
@@ -141,6 +151,168 @@ class SalaryRate(models.Model):
 
     class Meta:
         ordering = ["-start_date"]
+        indexes = [
+            models.Index(fields=["employee", "start_date"], name="salaryrate_emp_start_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} — ₱{self.amount} from {self.start_date}"
+
+
+class PayrollInputChange(models.Model):
+    """
+    An input of past payroll changed: a SalaryRate or TimeLog written for
+    [date_from, date_to] (null date_to = open-ended). Written by
+    payroll.signals; payroll.services.retro turns the pending rows into
+    RETRO_ADJ line items and stamps processed_at (and `error` if that failed).
+    """
+    SALARY_RATE = "SALARY_RATE"
+    TIMELOG = "TIMELOG"
+    KIND_CHOICES = [
+        (SALARY_RATE, "Salary rate"),
+        (TIMELOG, "Time log"),
+    ]
+
+    employee = models.ForeignKey("employees.Employee", on_delete=models.CASCADE, related_name="payroll_input_changes")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    date_from = models.DateField()
+    date_to = models.DateField(null=True, blank=True)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # Set with processed_at when a paid cycle of the change could not be recomputed
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["recorded_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["employee", "date_from"],
+                name="inputchange_pending_idx",
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} — {self.kind} {self.date_from}..{self.date_to or 'open'}"
+
+
+class RetroAdjustment(models.Model):
+    """
+    Difference between a paid run as recomputed today and what was paid
+    (plus earlier adjustments), posted into a later open run as RETRO_ADJ.
+    `detail` holds the per-component differences (earnings +, deductions -).
+    """
+    employee = models.ForeignKey("employees.Employee", on_delete=models.CASCADE, related_name="retro_adjustments")
+    source_run = models.ForeignKey(PayrollRun, on_delete=models.CASCADE, related_name="retro_sources")
+    target_run = models.ForeignKey(PayrollRun, on_delete=models.CASCADE, related_name="retro_adjustments")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    detail = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["employee", "source_run"], name="retro_emp_source_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} — {self.amount} for run {self.source_run_id} in run {self.target_run_id}"
+
+
+class PayrollArchive(models.Model):
+    """
+    Index row for one business-year moved out of the hot tables.
+    The line items live in gzip JSONL files under settings.PAYROLL_ARCHIVE_ROOT;
+    the year's PayrollRuns stay behind with status ARCHIVED.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name="payroll_archives")
+    year = models.PositiveSmallIntegerField()
+
+    records_path = models.CharField(max_length=500)
+    timelogs_path = models.CharField(max_length=500)
+
+    run_count = models.PositiveIntegerField(default=0)
+    record_count = models.PositiveIntegerField(default=0)
+    timelog_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["business_id", "year"]
+        constraints = [
+            models.UniqueConstraint(fields=["business", "year"], name="uniq_payroll_archive_business_year"),
+        ]
+
+    def __str__(self):
+        return f"{self.business.name} - {self.year} archive ({self.record_count} records)"
+
+
+
+class ContributionTable(models.Model):
+    """
+    One version of a government schedule (SSS, PhilHealth, Pag-IBIG, withholding
+    tax), valid from `effective_from` until the next version of the same kind.
+    Employee share for a monthly base x, from the bracket with the highest
+    lower_bound <= x:  fixed_amount + max(0, x - excess_over) * rate
+    (payroll.services.contribution_tables compiles and caches these).
+    """
+    SSS = "SSS"
+    PHILHEALTH = "PHIC"
+    PAGIBIG = "HDMF"
+    WITHHOLDING_TAX = "TAX"
+    KIND_CHOICES = [
+        (SSS, "SSS"),
+        (PHILHEALTH, "PhilHealth"),
+        (PAGIBIG, "Pag-IBIG"),
+        (WITHHOLDING_TAX, "Withholding Tax (monthly)"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    effective_from = models.DateField()
+    name = models.CharField(max_length=100, blank=True)
+    source = models.CharField(max_length=200, blank=True, help_text="Circular / revenue regulation")
+
+    class Meta:
+        ordering = ["kind", "-effective_from"]
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "effective_from"], name="uniq_contribution_table_version"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} from {self.effective_from}"
+
+
+class ContributionBracket(models.Model):
+    table = models.ForeignKey(ContributionTable, on_delete=models.CASCADE, related_name="brackets")
+    lower_bound = models.DecimalField(max_digits=12, decimal_places=2)
+    fixed_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    rate = models.DecimalField(max_digits=7, decimal_places=4, default=0)
+    excess_over = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # SSS monthly salary credit of the bracket (informational)
+    salary_credit = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        ordering = ["table", "lower_bound"]
+        constraints = [
+            models.UniqueConstraint(fields=["table", "lower_bound"], name="uniq_contribution_bracket_bound"),
+        ]
+
+    def clean(self):
+        if self.lower_bound < 0 or self.fixed_amount < 0 or self.rate < 0:
+            raise ValidationError("lower_bound, fixed_amount and rate cannot be negative.")
+
+    def __str__(self):
+        return f"{self.table} ≥ {self.lower_bound}"
+
+
+class CacheVersion(models.Model):
+    """
+    Version counter of a per-process cache (compiled contribution tables,
+    salary structures). Writers bump it in their own transaction; every worker
+    compares it with the version its cache was loaded at before computing pay
+    (payroll.services.cache_versions).
+    """
+    key = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
 
     def __str__(self):
-        return f"{self.employee} — ₱{self.amount} from {self.start_date}"
\ No newline at end of file
+        return f"{self.key} v{self.version}"
@@ -1,5 +1,8 @@
 from rest_framework import serializers
 from .models import PayrollPolicy, PayrollRun, SalaryComponent, SalaryRate, SalaryStructure, PayrollRecord, PayrollCycle
+from .services.archive import ARCHIVED, archived_run_rows
+from .services.position_structure import invalidate as invalidate_position_structure
+from .services.salary_rates import overlapping_rates
 
 
 class SalaryComponentSerializer(serializers.ModelSerializer):
@@ -38,7 +41,9 @@ class SalaryStructureBulkCreateSerializer(serializers.Serializer):
                 is_percentage=comp['is_percentage']
             ))
 
-        return SalaryStructure.objects.bulk_create(instances)
+        created = SalaryStructure.objects.bulk_create(instances)
+        invalidate_position_structure(position.pk)  # bulk_create sends no post_save
+        return created
 
 class GeneratePayrollSerializer(serializers.Serializer):
     employee_id = serializers.IntegerField()
@@ -114,8 +119,30 @@ class PayrollPolicySerializer(serializers.ModelSerializer):
             'holiday_special_multiplier',
         ]
 
-class PayrollRecordSerializer(serializers.ModelSerializer):
-    employee_name = serializers.CharField(source='employee.get_full_name', read_only=True)
+class SparseFieldsMixin:
+    """
+    Lets clients request a subset of fields with ?fields=a,b,c.
+    Unknown names are ignored; an empty/missing param keeps every field.
+    """
+    fields_query_param = "fields"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+        raw = request.query_params.get(self.fields_query_param)
+        if not raw:
+            return
+        wanted = {f.strip() for f in raw.split(",") if f.strip()}
+        if not wanted & set(self.fields):
+            return
+        for name in set(self.fields) - wanted:
+            self.fields.pop(name)
+
+
+class PayrollRecordSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    employee_name = serializers.CharField(source='employee.__str__', read_only=True)
     component_name = serializers.CharField(source='component.name', read_only=True)
     component_type = serializers.CharField(source='component.component_type', read_only=True)
 
@@ -155,13 +182,21 @@ class SalaryRateSerializer(serializers.ModelSerializer):
         if start and end and start > end:
             raise serializers.ValidationError("End date must be after start date.")
 
+        employee = attrs.get("employee", getattr(self.instance, "employee", None))
+        if employee and start:
+            clash = overlapping_rates(employee, start, end, exclude_pk=getattr(self.instance, "pk", None)).first()
+            if clash:
+                raise serializers.ValidationError(
+                    f"Overlaps the rate from {clash.start_date} to {clash.end_date or 'open'}."
+                )
+
         return attrs
     
 class PayrollRunSerializer(serializers.ModelSerializer):
     business_name = serializers.CharField(source="business.name", read_only=True)
     cycle_name = serializers.CharField(source="payroll_cycle.name", read_only=True)
     cycle_type = serializers.CharField(source="payroll_cycle.cycle_type", read_only=True)
-    records_count = serializers.IntegerField(source="records.count", read_only=True)
+    records_count = serializers.SerializerMethodField()
 
     class Meta:
         model = PayrollRun
@@ -175,9 +210,17 @@ class PayrollRunSerializer(serializers.ModelSerializer):
             "cycle_type",
             "status",
             "generated_at",
+            "paid_at",
             "notes",
             "records_count",
         ]
+        read_only_fields = ["paid_at"]
+
+    def get_records_count(self, obj) -> int:
+        if obj.status == ARCHIVED:
+            return len(archived_run_rows(obj))
+        # Records always share the run's month; filtering on it prunes partitions
+        return obj.records.filter(month=obj.month).count()
 
     def validate(self, attrs):
         """
@@ -0,0 +1,326 @@
+# payroll/services/archive.py
+"""
+Cold archive for closed payroll years.
+
+A business-year is archived by streaming its COMPLETED runs' PayrollRecords and
+the TimeLogs inside those runs' cutoffs into gzip JSONL files, then deleting
+them from the hot tables. Days no archived run paid, or that a run still open
+(PENDING, ...) covers, keep their TimeLogs. Layout under
+settings.PAYROLL_ARCHIVE_ROOT:
+
+    <business_id>/<year>.records.jsonl.gz
+    <business_id>/<year>.timelogs.jsonl.gz
+
+Files are appended as extra gzip members when a late run of an already
+archived year is archived, so readers must (and do) dedupe on the row id.
+The PayrollArchive table is the index: one row per business-year.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from payroll.models import PayrollArchive, PayrollRecord, PayrollRun, SalaryComponent
+from payroll.services.attendance import delete_timelogs
+from payroll.services.partitions import drop_month_partition_if_empty
+from payroll.services.payroll_cycles import cutoff_for_cycle
+from timekeeping.models import TimeLog
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED = "ARCHIVED"
+ARCHIVABLE_STATUSES = ("COMPLETED",)
+
+RECORD_FIELDS = (
+    "id", "run_id", "employee_id", "employee__first_name", "employee__last_name",
+    "month", "payroll_cycle_id", "payroll_cycle__cycle_type",
+    "component_id", "component__code", "component__name", "component__component_type",
+    "amount", "is_13th_month",
+)
+TIMELOG_FIELDS = (
+    "id", "employee_id", "date", "time_in", "time_out", "ot_hours", "late_minutes",
+    "undertime_minutes", "is_rest_day", "is_absent", "holiday_id",
+)
+
+
+def _root() -> Path:
+    return Path(getattr(settings, "PAYROLL_ARCHIVE_ROOT", Path(settings.BASE_DIR) / "archive"))
+
+
+def _paths(business_id: int, year: int) -> tuple[Path, Path]:
+    folder = _root() / str(business_id)
+    return folder / f"{year}.records.jsonl.gz", folder / f"{year}.timelogs.jsonl.gz"
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _append_jsonl(path: Path, rows: Iterable[dict]) -> int:
+    """Append rows as a new gzip member; fsync before returning so deletes are safe."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+            for row in rows:
+                gz.write(json.dumps(row, default=_json_default).encode("utf-8") + b"\n")
+                count += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+    return count
+
+
+def _iter_jsonl(path: Path):
+    if not path.exists():
+        return
+    seen: set[int] = set()
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            row = json.loads(line)
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            yield row
+
+
+# ─────────────────────────────────────────────────────────
+# Writing
+# ─────────────────────────────────────────────────────────
+def archivable_years(business, horizon_years: Optional[int] = None, today: Optional[date] = None) -> List[int]:
+    """Years with completed runs that are at least `horizon_years` behind the current one."""
+    horizon = horizon_years if horizon_years is not None else settings.PAYROLL_ARCHIVE_AFTER_YEARS
+    cutoff_year = (today or timezone.localdate()).year - horizon
+    months = (
+        PayrollRun.objects
+        .filter(business=business, status__in=ARCHIVABLE_STATUSES, month__year__lte=cutoff_year)
+        .values_list("month", flat=True)
+    )
+    return sorted({m.year for m in months})
+
+
+def _merge(spans: Iterable[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    out: List[Tuple[date, date]] = []
+    for start, end in sorted(spans):
+        if out and start <= out[-1][1] + timedelta(days=1):
+            out[-1] = (out[-1][0], max(out[-1][1], end))
+        else:
+            out.append((start, end))
+    return out
+
+
+def _paid_days(business, runs: List[PayrollRun]) -> Optional[Q]:
+    """
+    TimeLog dates the archived `runs` paid: their cutoffs, minus every day a
+    run of the business that is not closed yet covers. None without runs.
+    """
+    spans = _merge(cutoff_for_cycle(r.month, r.payroll_cycle) for r in runs)
+    if not spans:
+        return None
+    still_open = (
+        PayrollRun.objects
+        .select_related("payroll_cycle")
+        .filter(business=business, month__range=(spans[0][0] - timedelta(days=31), spans[-1][1]))
+        .exclude(status__in=ARCHIVABLE_STATUSES + (ARCHIVED,))
+    )
+    days = Q()
+    for start, end in spans:
+        days |= Q(date__range=(start, end))
+    for start, end in _merge(cutoff_for_cycle(r.month, r.payroll_cycle) for r in still_open):
+        days &= ~Q(date__range=(start, end))
+    return days
+
+
+def archive_year(business, year: int, dry_run: bool = False) -> Dict:
+    """
+    Move one business-year to cold storage. Returns counts.
+    Files are written (and fsynced) before any row is deleted.
+    """
+    start, end = date(year, 1, 1), date(year, 12, 31)
+    runs = list(
+        PayrollRun.objects
+        .select_related("payroll_cycle")
+        .filter(business=business, status__in=ARCHIVABLE_STATUSES, month__range=(start, end))
+    )
+    run_ids = [r.id for r in runs]
+    months = sorted({r.month for r in runs})
+    paid_days = _paid_days(business, runs)
+
+    records = (
+        PayrollRecord.objects
+        .filter(run_id__in=run_ids, month__in=months)
+        .order_by("month", "id")
+        .values(*RECORD_FIELDS)
+    )
+    hot_timelogs = (
+        TimeLog.objects.filter(employee__branch__business=business).filter(paid_days)
+        if paid_days is not None else TimeLog.objects.none()
+    )
+    timelogs = hot_timelogs.order_by("date", "id").values(*TIMELOG_FIELDS)
+
+    summary = {"business_id": business.id, "year": year, "runs": len(run_ids)}
+    if dry_run:
+        summary.update(records=records.count(), timelogs=timelogs.count(), dry_run=True)
+        return summary
+
+    records_path, timelogs_path = _paths(business.id, year)
+    record_count = _append_jsonl(records_path, records.iterator(chunk_size=5000))
+    timelog_count = _append_jsonl(timelogs_path, timelogs.iterator(chunk_size=5000))
+
+    with transaction.atomic():
+        PayrollRecord.objects.filter(run_id__in=run_ids, month__in=months).delete()
+        # no post_delete: these days are paid and closed, nothing for retro adjustments
+        if paid_days is not None:
+            delete_timelogs(hot_timelogs)
+        PayrollRun.objects.filter(id__in=run_ids).update(status=ARCHIVED)
+
+        archive, _ = PayrollArchive.objects.get_or_create(
+            business=business, year=year,
+            defaults={"records_path": str(records_path), "timelogs_path": str(timelogs_path)},
+        )
+        archive.run_count = PayrollRun.objects.filter(business=business, status=ARCHIVED, month__range=(start, end)).count()
+        archive.record_count += record_count
+        archive.timelog_count += timelog_count
+        archive.save()
+
+    for m in months:
+        drop_month_partition_if_empty(m)
+
+    logger.info("Archived %s/%s: %d runs, %d records, %d timelogs", business.id, year, len(run_ids), record_count, timelog_count)
+    summary.update(records=record_count, timelogs=timelog_count)
+    return summary
+
+
+# ─────────────────────────────────────────────────────────
+# Reading
+# ─────────────────────────────────────────────────────────
+def get_archive(business_id: int, month: date) -> Optional[PayrollArchive]:
+    return PayrollArchive.objects.filter(business_id=business_id, year=month.year).first()
+
+
+def _line(r: dict) -> Dict:
+    return {
+        "employee_id": r["employee_id"],
+        "component": r["component__name"],
+        "code": r["component__code"],
+        "type": r["component__component_type"],
+        "amount": Decimal(r["amount"]),
+        "cycle_type": r["payroll_cycle__cycle_type"],
+        "run_id": r["run_id"],
+        "is_13th_month": r["is_13th_month"],
+    }
+
+
+class _YearIndex(NamedTuple):
+    by_employee_month: Dict[Tuple[int, str], List[Dict]]
+    by_run_month: Dict[Tuple[int, str], List[Dict]]
+
+
+_index_lock = threading.Lock()
+_indexes: "OrderedDict[str, Tuple[Tuple[int, int], _YearIndex]]" = OrderedDict()  # path -> (file stamp, index)
+
+
+def _record_index(path: Path) -> _YearIndex:
+    """
+    One business-year's archived records, grouped per employee-month and per
+    run-month. Parsed once per process and reused until the file changes (an
+    archived late run appends to it); the ARCHIVE_INDEX_CACHE_SIZE most recent
+    years are kept.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return _YearIndex({}, {})
+    key, stamp = str(path), (st.st_size, st.st_mtime_ns)
+    with _index_lock:
+        hit = _indexes.get(key)
+        if hit is not None and hit[0] == stamp:
+            _indexes.move_to_end(key)
+            return hit[1]
+
+    by_employee_month: Dict[Tuple[int, str], List[Dict]] = defaultdict(list)
+    by_run_month: Dict[Tuple[int, str], List[Dict]] = defaultdict(list)
+    for r in _iter_jsonl(path):
+        line = _line(r)
+        by_employee_month[(r["employee_id"], r["month"])].append(line)
+        by_run_month[(r["run_id"], r["month"])].append(line)
+    index = _YearIndex(dict(by_employee_month), dict(by_run_month))
+
+    with _index_lock:
+        _indexes[key] = (stamp, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > getattr(settings, "ARCHIVE_INDEX_CACHE_SIZE", 4):
+            _indexes.popitem(last=False)
+    return index
+
+
+def archived_payroll_rows(
+    business_id: int,
+    employee_id: int,
+    month: date,
+    run_id: Optional[int] = None,
+    cycle_type: Optional[str] = None,
+    include_13th: bool = False,
+) -> Optional[List[Dict]]:
+    """
+    Archived line items for one employee-month, shaped like the payslip rows:
+      [{ "component", "code", "type", "amount", "cycle_type", "run_id", "is_13th_month", "employee_id" }, ...]
+    Returns None when the month was never archived (callers then report "not found"
+    exactly as before), and a possibly empty list otherwise.
+    Sorted earnings first, then by component name.
+    """
+    archive = get_archive(business_id, month)
+    if archive is None:
+        return None
+
+    rows = [
+        dict(line)
+        for line in _record_index(Path(archive.records_path)).by_employee_month.get((employee_id, month.isoformat()), ())
+        if (include_13th or not line["is_13th_month"])
+        and (run_id is None or line["run_id"] == run_id)
+        and (not cycle_type or line["cycle_type"] == cycle_type)
+    ]
+    rows.sort(key=lambda x: (x["type"] != SalaryComponent.EARNING, x["component"]))
+    return rows
+
+
+def archived_run_rows(run: PayrollRun) -> List[Dict]:
+    """
+    Archived line items of an ARCHIVED run (its month only, as the live
+    register reads), shaped like archived_payroll_rows.
+    """
+    archive = get_archive(run.business_id, run.month)
+    if archive is None:
+        return []
+    index = _record_index(Path(archive.records_path))
+    return [dict(line) for line in index.by_run_month.get((run.pk, run.month.isoformat()), ())]
+
+
+def archived_timelogs(business_id: int, start: date, end: date, employee_id: Optional[int] = None) -> List[Dict]:
+    """Archived TimeLog rows for audits, for every archived year touching [start, end]."""
+    out: List[Dict] = []
+    # a wrap-around cutoff anchored in December keeps January's logs in that year's file
+    years = (start.year - 1, end.year)
+    for archive in PayrollArchive.objects.filter(business_id=business_id, year__range=years):
+        for r in _iter_jsonl(Path(archive.timelogs_path)):
+            if employee_id is not None and r["employee_id"] != employee_id:
+                continue
+            if start.isoformat() <= r["date"] <= end.isoformat():
+                out.append(r)
+    return out
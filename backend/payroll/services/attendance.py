@@ -0,0 +1,261 @@
+# payroll/services/attendance.py
+"""
+DailyAttendance: every TimeLog analyzed once, stored as minutes and flags.
+
+A fact row remembers the TimeLog.import_hash it was computed from, so a
+cutoff only re-analyzes the logs whose punches/flags changed since
+(`ensure_attendance`); everything else is read back, one query per cutoff
+(`attendance_facts` for pay, rounded per day; `attendance_totals` for sums).
+
+Writers keep it warm:
+  * TimeLog.save()                   -> post_save      (payroll.signals)
+  * importer / punch pairing upserts -> timelogs_written (timekeeping.signals)
+Changes that alter the analysis of unchanged logs (work schedule, payroll
+policy grace, holidays) drop the affected facts instead; they are rebuilt
+lazily the next time a cutoff reads them.
+
+Workdays with no TimeLog at all are absences too: `missing_workdays` derives
+them from the work schedule, the holiday calendar and the hire date, so no
+blank "absent" rows need to be stored for them.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from employees.models import Employee
+from payroll.services.cache_versions import snapshot
+from payroll.services.time_analysis import _worked_hours_for_log, analyze_timelog
+from payroll.services.work_schedule import CompiledSchedule, schedule_for
+from timekeeping.models import DailyAttendance, TimeLog
+from timekeeping.services.holiday_calendar import calendar_for
+
+SIXTY = Decimal("60")
+MINUTE_FIELDS = [
+    "worked_minutes", "late_minutes", "undertime_minutes", "ot_minutes",
+    "rest_ot_minutes", "holiday_premium_minutes",
+]
+FACT_FIELDS = MINUTE_FIELDS + [
+    "is_rest_day", "is_holiday", "is_absent", "holiday", "employee", "date", "timelog_hash", "computed_at",
+]
+LOG_RELATED = ("employee", "holiday")
+
+
+def attendance_values(log: TimeLog, schedule: CompiledSchedule, holiday) -> dict:
+    """The DailyAttendance columns for one log (same rules as the per-log payroll loop had)."""
+    values = {f: Decimal("0") for f in MINUTE_FIELDS}
+    worked_hours = max(_worked_hours_for_log(log, schedule.break_hours), Decimal("0"))
+    values["worked_minutes"] = worked_hours * SIXTY
+
+    is_absent = False
+    for entry in analyze_timelog(log, schedule, holiday):
+        hours = Decimal(str(entry.get("hours", 0) or 0))
+        minutes = Decimal(str(entry.get("minutes", 0) or 0))
+        code = entry.get("code")
+        if code == "OT":
+            values["ot_minutes"] += hours * SIXTY
+        elif code == "REST_OT":
+            values["rest_ot_minutes"] += hours * SIXTY
+        elif code == "LATE":
+            values["late_minutes"] += minutes
+        elif code == "UNDERTIME":
+            values["undertime_minutes"] += minutes
+        elif code == "ABSENT":
+            is_absent = is_absent or hours > 0
+
+    if holiday is not None and worked_hours > 0:
+        # premium is the extra above normal pay (multiplier - 1)
+        mult_extra = Decimal(str(holiday.multiplier)) - Decimal("1")
+        if mult_extra > 0:
+            values["holiday_premium_minutes"] = worked_hours * SIXTY * mult_extra
+
+    values.update(
+        is_rest_day=not schedule.is_work_day(log.date.weekday()),
+        is_holiday=holiday is not None,
+        is_absent=is_absent,
+        holiday=holiday,
+    )
+    return values
+
+
+@snapshot()
+def refresh_attendance(logs: Iterable[TimeLog]) -> int:
+    """
+    (Re)compute the facts of `logs` and upsert them in one statement.
+    Logs should come with LOG_RELATED selected, or each one costs a query or two.
+    The calendar and schedules are checked against one read of the cache versions.
+    """
+    logs = list(logs)
+    if not logs:
+        return 0
+    calendar = calendar_for(min(log.date for log in logs), max(log.date for log in logs))
+    facts: List[DailyAttendance] = []
+    for log in logs:
+        branch_id = log.employee.branch_id
+        # A log's own holiday FK wins, otherwise its date decides
+        if log.holiday_id:
+            holiday = calendar.by_id(log.holiday_id) or log.holiday
+        else:
+            holiday = calendar.get(log.date, branch_id)
+        facts.append(DailyAttendance(
+            timelog_id=log.pk,
+            employee_id=log.employee_id,
+            date=log.date,
+            timelog_hash=log.import_hash,
+            **attendance_values(log, schedule_for(log.employee), holiday),
+        ))
+    DailyAttendance.objects.bulk_create(
+        facts,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["timelog"],
+        update_fields=FACT_FIELDS,
+    )
+    return len(facts)
+
+
+def refresh_attendance_for_keys(keys: Iterable[Tuple[int, object]]) -> int:
+    """Refresh the facts of the TimeLogs at these (employee_id, date) keys."""
+    keys = set(keys)
+    if not keys:
+        return 0
+    logs = (
+        TimeLog.objects
+        .select_related(*LOG_RELATED)
+        .filter(employee_id__in={k[0] for k in keys}, date__in={k[1] for k in keys})
+    )
+    return refresh_attendance(log for log in logs if (log.employee_id, log.date) in keys)
+
+
+def ensure_attendance(employee, start, end) -> int:
+    """Recompute the facts in [start, end] that are missing or older than their TimeLog."""
+    stale = (
+        TimeLog.objects
+        .select_related(*LOG_RELATED)
+        .filter(employee=employee, date__gte=start, date__lte=end)
+        .filter(Q(attendance__isnull=True) | ~Q(attendance__timelog_hash=F("import_hash")))
+    )
+    return refresh_attendance(stale)
+
+
+def attendance_totals(employee, start, end) -> dict:
+    """Summed minutes (Decimal, 0 when empty) and `absent_days` over [start, end]."""
+    totals = DailyAttendance.objects.filter(employee=employee, date__gte=start, date__lte=end).aggregate(
+        **{f: Sum(f) for f in MINUTE_FIELDS},
+        absent_days=Count("id", filter=Q(is_absent=True)),
+    )
+    return {k: (v if v is not None else Decimal("0")) for k, v in totals.items()}
+
+
+def attendance_facts(employee, start, end) -> List[dict]:
+    """The facts over [start, end] (minute columns and is_absent), by date; one query."""
+    return list(
+        DailyAttendance.objects
+        .filter(employee=employee, date__gte=start, date__lte=end)
+        .order_by("date", "timelog_id")
+        .values(*MINUTE_FIELDS, "is_absent")
+    )
+
+
+def expected_workdays(employee, start: date, end: date, schedule=None) -> Set[date]:
+    """
+    Days in [start, end] the employee is scheduled to work: on or after the
+    hire date, not after today, on a schedule workday and not a holiday.
+    """
+    if schedule is None:
+        schedule = schedule_for(employee)
+    first = max(start, employee.hire_date) if employee.hire_date else start
+    last = min(end, timezone.localdate())
+    if first > last:
+        return set()
+    calendar = calendar_for(first, last)
+    branch_id = employee.branch_id
+    days = (first + timedelta(days=i) for i in range((last - first).days + 1))
+    return {d for d in days if schedule.is_work_day(d.weekday()) and calendar.get(d, branch_id) is None}
+
+
+def missing_workdays(employee, start: date, end: date, schedule=None) -> Set[date]:
+    """Expected workdays in [start, end] without any TimeLog: each one is a full-day absence."""
+    expected = expected_workdays(employee, start, end, schedule)
+    if not expected:
+        return set()
+    logged = TimeLog.objects.filter(employee=employee, date__gte=min(expected), date__lte=max(expected))
+    return expected - set(logged.values_list("date", flat=True))
+
+
+def blank_timelogs(before: Optional[date] = None, business=None):
+    """
+    TimeLogs that only say "absent on a workday": marked absent, not a rest
+    day, and no punches, OT, late, undertime or holiday. Only the ones dated
+    on an expected workday are what `missing_workdays` would derive anyway;
+    `prune_blank_timelogs` checks that before deleting.
+    """
+    qs = TimeLog.objects.filter(
+        time_in__isnull=True, time_out__isnull=True, holiday__isnull=True,
+        ot_hours=0, late_minutes=0, undertime_minutes=0,
+        is_absent=True, is_rest_day=False,
+    )
+    if before is not None:
+        qs = qs.filter(date__lt=before)
+    if business is not None:
+        qs = qs.filter(employee__branch__business=business)
+    return qs
+
+
+def _derivable(rows: List[Tuple[int, int, date]]) -> List[int]:
+    """Ids of the (id, employee_id, date) blank rows dated on one of the employee's expected workdays."""
+    by_employee: Dict[int, List[Tuple[int, date]]] = defaultdict(list)
+    for log_id, employee_id, day in rows:
+        by_employee[employee_id].append((log_id, day))
+    out: List[int] = []
+    for employee in Employee.objects.filter(id__in=by_employee):
+        logs = by_employee[employee.pk]
+        expected = expected_workdays(employee, min(d for _, d in logs), max(d for _, d in logs))
+        out.extend(log_id for log_id, day in logs if day in expected)
+    return out
+
+
+def prune_blank_timelogs(
+    before: Optional[date] = None, business=None, batch_size: int = 5000, dry_run: bool = False,
+) -> int:
+    """
+    Delete the `blank_timelogs` that `missing_workdays` would derive anyway (on
+    the employee's expected workdays), in batches, with their DailyAttendance
+    rows. `dry_run` only counts them.
+    """
+    qs = blank_timelogs(before, business).order_by("id")
+    count = 0
+    last_id = 0
+    while True:
+        rows = list(qs.filter(id__gt=last_id).values_list("id", "employee_id", "date")[:batch_size])
+        if not rows:
+            return count
+        last_id = rows[-1][0]
+        ids = _derivable(rows)
+        if ids and not dry_run:
+            # pay does not change, so nothing for the input change index (no post_delete)
+            delete_timelogs(TimeLog.objects.filter(id__in=ids))
+        count += len(ids)
+
+
+def delete_timelogs(logs) -> int:
+    """
+    Delete the TimeLogs of the `logs` queryset and their facts with two plain
+    DELETEs. Unlike QuerySet.delete() no row is loaded and no post_delete is
+    sent, so nothing is written to the input change index: only for rows whose
+    removal does not change what a run pays (archived or blank days).
+    """
+    facts = DailyAttendance.objects.filter(timelog__in=logs.values("id"))
+    facts._raw_delete(facts.db)
+    return logs._raw_delete(logs.db)
+
+
+def invalidate_attendance(*conditions, **filters) -> int:
+    """Drop the facts matching the filters; they are rebuilt on the next read."""
+    deleted, _ = DailyAttendance.objects.filter(*conditions, **filters).delete()
+    return deleted
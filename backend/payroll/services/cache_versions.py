@@ -0,0 +1,72 @@
+# payroll/services/cache_versions.py
+"""
+Cross-process invalidation for the in-process payroll caches.
+
+Signals only reach the process that saved a change, so each cache also keeps
+the CacheVersion it was loaded at and reloads when the stored one moved:
+
+    version = current(KEY)          # one query (none inside a snapshot)
+    if cached_version != version: reload
+
+Writers call `bump(KEY)` (the caches' `invalidate()` does) in their
+transaction, so other workers see the new version exactly when they can see
+the new rows. A payroll run reads every version once with `snapshot()`, which
+also works as a decorator:
+
+    with snapshot():
+        ...   # every current() in this thread returns the versions read on entry
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+from django.db.models import F
+
+from payroll.models import CacheVersion
+
+CONTRIBUTION_TABLES = "contribution_tables"
+HOLIDAY_CALENDAR = "holiday_calendar"
+POSITION_STRUCTURES = "position_structures"
+WORK_SCHEDULES = "work_schedules"
+
+_local = threading.local()
+
+
+def _read() -> Dict[str, int]:
+    return dict(CacheVersion.objects.values_list("key", "version"))
+
+
+def current(key: str) -> int:
+    """The stored version of `key` (0 before the first bump)."""
+    if getattr(_local, "depth", 0):
+        if _local.versions is None:
+            _local.versions = _read()
+        return _local.versions.get(key, 0)
+    return _read().get(key, 0)
+
+
+def bump(key: str) -> None:
+    """Tell every process that caches `key` to reload it."""
+    if not CacheVersion.objects.filter(key=key).update(version=F("version") + 1):
+        _, created = CacheVersion.objects.get_or_create(key=key, defaults={"version": 1})
+        if not created:
+            CacheVersion.objects.filter(key=key).update(version=F("version") + 1)
+    if getattr(_local, "depth", 0):
+        _local.versions = None  # this thread's own change: re-read on the next current()
+
+
+@contextmanager
+def snapshot():
+    """Read the versions once for the block (a payroll run); nested blocks share it."""
+    depth = getattr(_local, "depth", 0)
+    if not depth:
+        _local.versions = None
+    _local.depth = depth + 1
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        if not depth:
+            _local.versions = None
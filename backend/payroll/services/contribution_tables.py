@@ -0,0 +1,245 @@
+# payroll/services/contribution_tables.py
+"""
+Versioned government contribution schedules (SSS, PhilHealth, Pag-IBIG,
+withholding tax) from ContributionTable / ContributionBracket.
+
+Every table version is compiled once into sorted tuples; a lookup is a
+`bisect` over the lower bounds plus one multiply-add, so per-employee cost is
+microseconds. `contributions_on(day)` returns the versions in force on a date
+(cached per date); a kind with no stored version falls back to the built-in
+PHRates values, so an empty database computes exactly what it always did.
+
+All versions are loaded with two queries and kept until saving or deleting a
+table or bracket invalidates them (payroll.signals): in this process at once,
+in every other worker through the CONTRIBUTION_TABLES cache version
+(payroll.services.cache_versions), checked before each lookup or once per run. New rates are data: add a version with its
+effective date (admin, or `seed_contribution_tables` for the bundled ones).
+"""
+from __future__ import annotations
+
+import json
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from payroll.models import ContributionBracket, ContributionTable
+from payroll.services import cache_versions
+
+SEED_PATH = Path(settings.BASE_DIR) / "common" / "data" / "ph_contribution_tables.json"
+KINDS = (ContributionTable.SSS, ContributionTable.PHILHEALTH, ContributionTable.PAGIBIG, ContributionTable.WITHHOLDING_TAX)
+
+Q2 = Decimal("0.01")
+ZERO = Decimal("0")
+RATE_SCALE = 10_000  # rates are stored with 4 decimals
+
+_lock = threading.Lock()
+_versions: Optional[Dict[str, List[Tuple[date, "CompiledTable"]]]] = None  # kind -> [(effective_from, table)] ascending
+_loaded_version: Optional[int] = None  # CacheVersion the versions were loaded at
+_by_date: Dict[date, "Contributions"] = {}
+_generation = 0  # bumped by invalidate()
+
+
+@dataclass(frozen=True)
+class CompiledTable:
+    kind: str
+    effective_from: Optional[date]          # None: built-in fallback
+    bounds: Tuple[Decimal, ...]             # ascending lower bounds
+    fixed: Tuple[Decimal, ...]
+    rates: Tuple[Decimal, ...]
+    excess_over: Tuple[Decimal, ...]
+
+    @classmethod
+    def build(cls, kind: str, effective_from: Optional[date], rows: Iterable[Tuple]) -> "CompiledTable":
+        """rows: (lower_bound, fixed_amount, rate, excess_over) in any order."""
+        rows = sorted((Decimal(str(lb)), Decimal(str(f)), Decimal(str(r)), Decimal(str(o))) for lb, f, r, o in rows)
+        if not rows:
+            raise ValueError(f"{kind} table from {effective_from} has no brackets")
+        bounds, fixed, rates, over = zip(*rows)
+        return cls(kind, effective_from, bounds, fixed, rates, over)
+
+    def bracket(self, base: Decimal) -> int:
+        """Index of the bracket with the highest lower bound <= base (the first one below all bounds)."""
+        return max(bisect_right(self.bounds, base) - 1, 0)
+
+    def amount(self, base: Decimal) -> Decimal:
+        i = self.bracket(base)
+        excess = base - self.excess_over[i]
+        share = self.fixed[i] + (excess * self.rates[i] if excess > 0 else ZERO)
+        return share.quantize(Q2, rounding=ROUND_HALF_UP)
+
+    @cached_property
+    def scaled(self) -> Optional[Tuple[Tuple[int, ...], ...]]:
+        """
+        (bounds, fixed, rates, excess_over) as integers: amounts in centavos,
+        rates x RATE_SCALE. None when a value needs finer precision, so integer
+        math would not reproduce `amount` exactly.
+        """
+        def ints(values, scale):
+            out = []
+            for v in values:
+                n = v * scale
+                if n != n.to_integral_value():
+                    return None
+                out.append(int(n))
+            return tuple(out)
+
+        parts = (ints(self.bounds, 100), ints(self.fixed, 100), ints(self.rates, RATE_SCALE), ints(self.excess_over, 100))
+        return None if any(p is None for p in parts) else parts
+
+
+@dataclass(frozen=True)
+class Contributions:
+    """The schedule versions in force on one date."""
+    on: date
+    sss: CompiledTable
+    philhealth: CompiledTable
+    pagibig: CompiledTable
+    withholding_tax: CompiledTable
+
+
+def builtin_tables(r=None) -> Dict[str, CompiledTable]:
+    """PHRates (the pre-table hardcoded values) expressed as brackets; same results."""
+    from payroll.services.mandatories import PHRates
+
+    r = r or PHRates()
+    sss_share, ph_share = r.sss_ee_share, r.ph_rate * r.ph_ee_split
+    return {
+        ContributionTable.SSS: CompiledTable.build(ContributionTable.SSS, None, [
+            (0, r.sss_min_sc * sss_share, 0, 0),
+            (r.sss_min_sc, 0, sss_share, 0),
+            (r.sss_max_sc, r.sss_max_sc * sss_share, 0, 0),
+        ]),
+        ContributionTable.PHILHEALTH: CompiledTable.build(ContributionTable.PHILHEALTH, None, [
+            (0, r.ph_min_base * ph_share, 0, 0),
+            (r.ph_min_base, 0, ph_share, 0),
+            (r.ph_max_base, r.ph_max_base * ph_share, 0, 0),
+        ]),
+        ContributionTable.PAGIBIG: CompiledTable.build(ContributionTable.PAGIBIG, None, [
+            (0, r.hdmf_min_base * r.hdmf_rate_low, 0, 0),
+            (r.hdmf_min_base, 0, r.hdmf_rate_low, 0),
+            (r.hdmf_high_threshold + Q2, 0, r.hdmf_rate_high, 0),
+            (r.hdmf_max_base, r.hdmf_max_base * r.hdmf_rate_high, 0, 0),
+        ]),
+        ContributionTable.WITHHOLDING_TAX: CompiledTable.build(ContributionTable.WITHHOLDING_TAX, None, [
+            (lb, base_tax, pct, lb) for lb, base_tax, pct, _ in r.tax_brackets
+        ]),
+    }
+
+
+# ─────────────────────────────────────────────────────────
+# Loading / cache
+# ─────────────────────────────────────────────────────────
+def _load_versions() -> Dict[str, List[Tuple[date, CompiledTable]]]:
+    versions: Dict[str, List[Tuple[date, CompiledTable]]] = {kind: [] for kind in KINDS}
+    for table in ContributionTable.objects.prefetch_related("brackets").order_by("kind", "effective_from"):
+        rows = [(b.lower_bound, b.fixed_amount, b.rate, b.excess_over) for b in table.brackets.all()]
+        if rows:
+            versions.setdefault(table.kind, []).append(
+                (table.effective_from, CompiledTable.build(table.kind, table.effective_from, rows))
+            )
+    return versions
+
+
+def _versions_now() -> Dict[str, List[Tuple[date, CompiledTable]]]:
+    global _versions, _loaded_version
+    version = cache_versions.current(cache_versions.CONTRIBUTION_TABLES)
+    with _lock:
+        if _versions is not None and _loaded_version == version:
+            return _versions
+        generation = _generation
+    versions = _load_versions()
+    with _lock:
+        # an invalidate() while we were loading means this result may already be stale
+        if generation == _generation:
+            _versions, _loaded_version = versions, version
+            _by_date.clear()
+    return versions
+
+
+def _in_force(versions: List[Tuple[date, CompiledTable]], day: date) -> Optional[CompiledTable]:
+    i = bisect_right([d for d, _ in versions], day) - 1
+    return versions[i][1] if i >= 0 else None
+
+
+def contributions_on(day: Optional[date] = None) -> Contributions:
+    """The tables in force on `day` (default today): latest version with effective_from <= day."""
+    day = day or date.today()
+    versions = _versions_now()
+    with _lock:
+        cached = _by_date.get(day)
+    if cached is not None:
+        return cached
+
+    fallback = builtin_tables()
+    chosen = {kind: _in_force(versions.get(kind, []), day) or fallback[kind] for kind in KINDS}
+    result = Contributions(
+        on=day,
+        sss=chosen[ContributionTable.SSS],
+        philhealth=chosen[ContributionTable.PHILHEALTH],
+        pagibig=chosen[ContributionTable.PAGIBIG],
+        withholding_tax=chosen[ContributionTable.WITHHOLDING_TAX],
+    )
+    with _lock:
+        if versions is _versions:
+            _by_date[day] = result
+    return result
+
+
+def invalidate() -> None:
+    """Forget the compiled tables here and, through the cache version, in every other process."""
+    global _versions, _generation
+    with _lock:
+        _versions = None
+        _by_date.clear()
+        _generation += 1
+    cache_versions.bump(cache_versions.CONTRIBUTION_TABLES)
+
+
+# ─────────────────────────────────────────────────────────
+# Seeding
+# ─────────────────────────────────────────────────────────
+def load_seed(path: Optional[Path] = None) -> dict:
+    with open(path or SEED_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def seed_contribution_tables(path: Optional[Path] = None, replace: bool = False) -> Dict[str, int]:
+    """
+    Store the bundled (or given) table versions. Existing versions (same kind
+    and effective date) are kept unless `replace`, which rewrites their brackets.
+    """
+    data = load_seed(path)
+    counts = {"created": 0, "replaced": 0, "kept": 0}
+    with transaction.atomic():
+        for spec in data["tables"]:
+            effective_from = datetime.strptime(spec["effective_from"], "%Y-%m-%d").date()
+            table, created = ContributionTable.objects.get_or_create(
+                kind=spec["kind"], effective_from=effective_from,
+                defaults={"name": spec.get("name", ""), "source": spec.get("source", "")},
+            )
+            if not created and not replace:
+                counts["kept"] += 1
+                continue
+            if not created:
+                table.brackets.all().delete()
+                table.name, table.source = spec.get("name", ""), spec.get("source", "")
+                table.save(update_fields=["name", "source"])
+            ContributionBracket.objects.bulk_create([
+                ContributionBracket(
+                    table=table, lower_bound=row[0], fixed_amount=row[1], rate=row[2], excess_over=row[3],
+                    salary_credit=row[4] if len(row) > 4 else None,
+                )
+                for row in spec["brackets"]
+            ])
+            counts["created" if created else "replaced"] += 1
+    # bulk_create skips the bracket signals
+    invalidate()
+    return counts
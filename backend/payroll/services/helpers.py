@@ -1,7 +1,7 @@
 from datetime import date
 from decimal import Decimal
 from django.utils.dateparse import parse_date
-from payroll.models import SalaryStructure, SalaryComponent
+from payroll.services.position_structure import structure_for
 
 def normalize_month(value) -> date:
     """
@@ -33,10 +33,4 @@ def normalize_month(value) -> date:
 
 def compute_regular_monthly_gross(position, base_salary: Decimal) -> Decimal:
     """Sum BASIC + other EARNING components from SalaryStructure (excludes time-based items)."""
-    total = Decimal("0.00")
-    qs = SalaryStructure.objects.filter(position=position).select_related("component")
-    for s in qs:
-        amt = (Decimal(s.amount) / Decimal("100.00")) * base_salary if s.is_percentage else Decimal(s.amount)
-        if s.component.component_type == SalaryComponent.EARNING:
-            total += amt
-    return total.quantize(Decimal("0.01"))
+    return structure_for(getattr(position, "pk", position)).regular_gross(base_salary)
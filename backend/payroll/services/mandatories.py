@@ -1,16 +1,26 @@
 # payroll/services/mandatories.py
 from __future__ import annotations
 from dataclasses import dataclass
+from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Literal, Tuple
+from typing import Dict, Iterable, List, Literal, Tuple
 
 from payroll.models import PayrollPolicy
+from payroll.services.contribution_tables import RATE_SCALE, CompiledTable, Contributions, contributions_on
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy comes with pandas (requirements.txt)
+    np = None
+
+MANDATORY_CODES = ("SSS_EE", "PHIC_EE", "HDMF_EE", "TAX_WHT")
+MAX_CENTAVOS = 10 ** 14  # keeps centavos x RATE_SCALE inside int64
 
 Q2 = Decimal("0.01")
 def q2(x: Decimal) -> Decimal:
     return x.quantize(Q2, rounding=ROUND_HALF_UP)
 
-# --- Core PH math (can be swapped with DB-driven values later) ---
+# --- Built-in PH values: fallback for kinds with no ContributionTable yet ---
 @dataclass(frozen=True)
 class PHRates:
     # SSS
@@ -38,53 +48,32 @@ class PHRates:
         (Decimal("666667.00"),Decimal("200833.33"),Decimal("0.35"),  "Over 666,667"),
     )
 
-def _sss_ee(base_monthly: Decimal, r: PHRates) -> Decimal:
-    msc = max(r.sss_min_sc, min(base_monthly, r.sss_max_sc))
-    return q2(msc * r.sss_ee_share)
-
-def _phic_ee(base_monthly: Decimal, r: PHRates) -> Decimal:
-    b = max(r.ph_min_base, min(base_monthly, r.ph_max_base))
-    return q2(b * r.ph_rate * r.ph_ee_split)
-
-def _hdmf_ee(base_monthly: Decimal, r: PHRates) -> Decimal:
-    b = max(r.hdmf_min_base, min(base_monthly, r.hdmf_max_base))
-    rate = r.hdmf_rate_low if base_monthly <= r.hdmf_high_threshold else r.hdmf_rate_high
-    return q2(b * rate)
-
-def _withholding_tax_monthly(taxable_monthly: Decimal, r: PHRates) -> Decimal:
-    x = taxable_monthly
-    if x <= r.tax_brackets[0][0]:
-        return Decimal("0.00")
-    tax = Decimal("0.00")
-    for lb, base_tax, pct, _ in r.tax_brackets:
-        if x > lb:
-            tax = base_tax + (x - lb) * pct
-        else:
-            break
-    return q2(max(tax, Decimal("0.00")))
-
-def load_rates_from_policy(policy: PayrollPolicy | None) -> PHRates:
+def load_rates_from_policy(policy: PayrollPolicy | None, on: date | None = None) -> Contributions:
     """
-    Hook to load from DB later. For now we just return defaults.
-    You can extend PayrollPolicy to store caps/rates and map them here.
+    Contribution schedules in force on `on` (default today), from the DB
+    tables (payroll.services.contribution_tables); PHRates fills any kind
+    that has no stored version. Government rates do not vary per business,
+    so `policy` does not change them.
     """
-    return PHRates()
+    return contributions_on(on)
 
 def compute_mandatories_monthly(
     gross_monthly: Decimal,
     policy: PayrollPolicy | None = None,
+    on: date | None = None,
 ) -> Dict[str, Decimal]:
     """
-    Compute employee-side mandatories on a MONTHLY basis.
+    Compute employee-side mandatories on a MONTHLY basis, with the tables in force on `on`.
     Returns dict { 'SSS_EE': Decimal, 'PHIC_EE': Decimal, 'HDMF_EE': Decimal, 'TAX_WHT': Decimal }
-    TAX_WHT = TRAIN withholding computed on (gross - SSS - PHIC - HDMF).
+    TAX_WHT = withholding computed on (gross - SSS - PHIC - HDMF).
     """
-    r = load_rates_from_policy(policy)
-    sss = _sss_ee(gross_monthly, r)
-    phic = _phic_ee(gross_monthly, r)
-    hdmf = _hdmf_ee(gross_monthly, r)
+    r = load_rates_from_policy(policy, on)
+    gross_monthly = Decimal(gross_monthly)
+    sss = r.sss.amount(gross_monthly)
+    phic = r.philhealth.amount(gross_monthly)
+    hdmf = r.pagibig.amount(gross_monthly)
     taxable = max(Decimal("0.00"), gross_monthly - sss - phic - hdmf)
-    tax_wht = _withholding_tax_monthly(taxable, r)
+    tax_wht = r.withholding_tax.amount(taxable)
     return {
         "SSS_EE": sss,
         "PHIC_EE": phic,
@@ -92,6 +81,55 @@ def compute_mandatories_monthly(
         "TAX_WHT": tax_wht,
     }
 
+# --- Batch (vectorized) ---
+def _table_centavos(table: CompiledTable, base: "np.ndarray") -> "np.ndarray":
+    bounds, fixed, rates, excess_over = (np.asarray(v, dtype=np.int64) for v in table.scaled)
+    i = np.maximum(np.searchsorted(bounds, base, side="right") - 1, 0)
+    excess = np.maximum(base - excess_over[i], 0)
+    # ROUND_HALF_UP on a non-negative product
+    return fixed[i] + (excess * rates[i] + RATE_SCALE // 2) // RATE_SCALE
+
+def mandatories_centavos(gross: "np.ndarray", r: Contributions) -> Dict[str, "np.ndarray"]:
+    """Vector core of compute_mandatories_monthly: int64 centavos in, int64 centavos out."""
+    sss = _table_centavos(r.sss, gross)
+    phic = _table_centavos(r.philhealth, gross)
+    hdmf = _table_centavos(r.pagibig, gross)
+    taxable = np.maximum(gross - sss - phic - hdmf, 0)
+    return {
+        "SSS_EE": sss,
+        "PHIC_EE": phic,
+        "HDMF_EE": hdmf,
+        "TAX_WHT": _table_centavos(r.withholding_tax, taxable),
+    }
+
+def compute_mandatories_batch(
+    gross_monthly: Iterable[Decimal],
+    policy: PayrollPolicy | None = None,
+    on: date | None = None,
+) -> Dict[str, List[Decimal]]:
+    """
+    compute_mandatories_monthly for many monthly grosses at once:
+    { 'SSS_EE': [...], 'PHIC_EE': [...], 'HDMF_EE': [...], 'TAX_WHT': [...] } in input order.
+    Bracket lookup is np.searchsorted and the math is integer centavos, so the
+    results equal the scalar ones; inputs or tables that are not centavo-exact
+    take the scalar path.
+    """
+    amounts = [Decimal(g) for g in gross_monthly]
+    r = load_rates_from_policy(policy, on)
+    tables = (r.sss, r.philhealth, r.pagibig, r.withholding_tax)
+    vectorizable = (
+        np is not None
+        and all(t.scaled is not None for t in tables)
+        and all(a == a.quantize(Q2) and abs(a) < MAX_CENTAVOS / 100 for a in amounts)
+    )
+    if not vectorizable:
+        rows = [compute_mandatories_monthly(a, policy, on) for a in amounts]
+        return {code: [row[code] for row in rows] for code in MANDATORY_CODES}
+
+    gross = np.fromiter((int(a * 100) for a in amounts), dtype=np.int64, count=len(amounts))
+    out = mandatories_centavos(gross, r)
+    return {code: [Decimal(int(v)).scaleb(-2) for v in out[code]] for code in MANDATORY_CODES}
+
 def allocate_to_cycle(
     monthly_amounts: Dict[str, Decimal],
     cycle: Literal["MONTHLY", "SEMI_1", "SEMI_2"],
@@ -0,0 +1,274 @@
+# payroll/services/partitions.py
+"""
+Optional declarative RANGE partitioning of payroll_payrollrecord by `month`
+(PostgreSQL only, behind settings.PAYROLL_PARTITION_RECORDS).
+
+Layout once converted:
+  payroll_payrollrecord                 (partitioned parent, PK = (id, month))
+  payroll_payrollrecord_y2025m08        FOR VALUES FROM ('2025-08-01') TO ('2025-09-01')
+  payroll_payrollrecord_default         DEFAULT (catches months with no partition yet)
+
+The ORM keeps treating `id` as the primary key; PostgreSQL only requires the
+partition key to be part of every unique constraint, which the existing
+(employee, month, component, payroll_cycle) key already satisfies.
+On any other backend (SQLite in dev / desktop) every function here is a no-op.
+
+Partitions are created ahead of time by `manage.py partition_payroll_records`
+(run it from cron): the current month and settings.PAYROLL_PARTITION_MONTHS_AHEAD
+months after it, plus any month whose rows landed in DEFAULT meanwhile (they
+are moved out). Payroll generation itself never runs DDL.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date
+
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from payroll.models import PayrollRecord
+
+logger = logging.getLogger(__name__)
+
+TABLE = PayrollRecord._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+# months whose partition is known to exist in this process
+_known_months: set[date] = set()
+
+
+def partitioning_enabled() -> bool:
+    return connection.vendor == "postgresql" and getattr(settings, "PAYROLL_PARTITION_RECORDS", False)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def _month_range(month: date) -> tuple[date, date]:
+    start = month.replace(day=1)
+    end = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+    return start, end
+
+
+def _remember(*months: date) -> None:
+    # only once the DDL is committed: a rolled back caller leaves no partition behind
+    transaction.on_commit(lambda: _known_months.update(months))
+
+
+def is_partitioned(cursor=None) -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    if cursor is None:
+        with connection.cursor() as cur:
+            return is_partitioned(cur)
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+        [TABLE],
+    )
+    return cursor.fetchone() is not None
+
+
+def ensure_month_partition(month: date) -> bool:
+    """
+    Make sure a partition exists for `month`. Returns True if one was created.
+    Rows that already landed in the DEFAULT partition for that month are moved
+    into the new partition before it is attached.
+    """
+    if not partitioning_enabled():
+        return False
+    month = month.replace(day=1)
+    if month in _known_months:
+        return False
+
+    name = partition_name(month)
+    start, end = _month_range(month)
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cur:
+        if not is_partitioned(cur):
+            return False
+        # Serialize concurrent creators of the same partition
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [name])
+        cur.execute("SELECT to_regclass(%s)", [name])
+        if cur.fetchone()[0] is not None:
+            _remember(month)
+            return False
+
+        cur.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(TABLE)} INCLUDING DEFAULTS)")
+        cur.execute(
+            f"WITH moved AS (DELETE FROM {qn(DEFAULT_PARTITION)} "
+            f"WHERE month >= %s AND month < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            [start, end],
+        )
+        cur.execute(
+            f"ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+        _remember(month)
+
+    logger.info("Created payroll record partition %s", name)
+    return True
+
+
+def upcoming_months(count: int, today: Optional[date] = None) -> List[date]:
+    """The current month and the `count` months after it."""
+    month = (today or timezone.localdate()).replace(day=1)
+    months = []
+    for _ in range(count + 1):
+        months.append(month)
+        month = _month_range(month)[1]
+    return months
+
+
+def default_partition_months() -> List[date]:
+    """Months with rows in the DEFAULT partition (no month partition existed when they were written)."""
+    if not partitioning_enabled() or not is_partitioned():
+        return []
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT DISTINCT date_trunc('month', month)::date FROM {connection.ops.quote_name(DEFAULT_PARTITION)}"
+        )
+        return sorted(row[0] for row in cur.fetchall())
+
+
+def ensure_upcoming_partitions(count: Optional[int] = None, today: Optional[date] = None) -> int:
+    """
+    Create the partitions of the next months and of the months stranded in
+    DEFAULT; returns how many were created. Meant for the maintenance command,
+    outside any request.
+    """
+    if count is None:
+        count = getattr(settings, "PAYROLL_PARTITION_MONTHS_AHEAD", 3)
+    months = set(upcoming_months(count, today)) | set(default_partition_months())
+    return sum(int(ensure_month_partition(m)) for m in sorted(months))
+
+
+def convert_to_partitioned() -> bool:
+    """
+    One-time conversion of the plain table into a partitioned one.
+    Idempotent: returns False if the table is already partitioned (or the
+    feature is off). Runs inside a single transaction and holds an ACCESS
+    EXCLUSIVE lock on the table for the duration of the copy.
+    """
+    if not partitioning_enabled():
+        return False
+
+    legacy = f"{TABLE}_legacy"
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cur:
+        if is_partitioned(cur):
+            return False
+
+        cur.execute(f"LOCK TABLE {qn(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        cur.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(legacy)}")
+
+        # Capture constraint / index definitions before they disappear with the legacy table
+        cur.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(%s) AND contype IN ('f', 'u', 'c')
+            """,
+            [legacy],
+        )
+        constraints = cur.fetchall()
+        cur.execute(
+            """
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.tablename = %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint c
+                  WHERE c.conrelid = to_regclass(%s) AND c.conname = i.indexname
+              )
+            """,
+            [legacy, legacy],
+        )
+        indexes = cur.fetchall()
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {qn(legacy)}")
+        max_id = cur.fetchone()[0]
+        cur.execute(f"SELECT DISTINCT date_trunc('month', month)::date FROM {qn(legacy)}")
+        months = [row[0] for row in cur.fetchall()]
+
+        # Parent table: same columns (and column order), partitioned by month
+        cur.execute(f"CREATE TABLE {qn(TABLE)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) PARTITION BY RANGE (month)")
+        cur.execute(f"CREATE TABLE {qn(DEFAULT_PARTITION)} PARTITION OF {qn(TABLE)} DEFAULT")
+
+        for m in months:
+            start, end = _month_range(m)
+            cur.execute(
+                f"CREATE TABLE {qn(partition_name(m))} PARTITION OF {qn(TABLE)} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+
+        cur.execute(f"INSERT INTO {qn(TABLE)} SELECT * FROM {qn(legacy)}")
+        cur.execute(f"DROP TABLE {qn(legacy)}")  # also drops its identity sequence
+
+        # id is fed from a plain sequence: identity columns on partitioned
+        # tables need PostgreSQL 17+
+        seq = f"{TABLE}_id_seq"
+        cur.execute(f"CREATE SEQUENCE {qn(seq)} OWNED BY {qn(TABLE)}.id")
+        cur.execute(f"ALTER TABLE {qn(TABLE)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [seq])
+        cur.execute("SELECT setval(%s, %s, %s)", [seq, max(max_id, 1), max_id > 0])
+
+        # Recreate keys / indexes on the parent (they cascade to every partition)
+        cur.execute(f"ALTER TABLE {qn(TABLE)} ADD PRIMARY KEY (id, month)")
+        for name, definition in constraints:
+            cur.execute(f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} {definition}")
+        legacy_ref = re.compile(rf"\bON (ONLY )?(\S+\.)?{re.escape(legacy)}\b")
+        for _name, definition in indexes:
+            cur.execute(legacy_ref.sub(f"ON {qn(TABLE)}", definition))
+        _remember(*months)
+
+    logger.info("Converted %s to a partitioned table with %d month partitions", TABLE, len(months))
+    return True
+
+
+def drop_month_partition_if_empty(month: date) -> bool:
+    """Drop the partition for `month` when nothing is left in it (e.g. after archiving)."""
+    if not partitioning_enabled():
+        return False
+    month = month.replace(day=1)
+    name = partition_name(month)
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [name])
+        cur.execute("SELECT to_regclass(%s)", [name])
+        if cur.fetchone()[0] is None:
+            return False
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM {qn(name)})")
+        if cur.fetchone()[0]:
+            return False
+        # Flush the deferred FK checks queued on this partition, or DETACH fails
+        # with "pending trigger events" inside an outer transaction. Only its
+        # own constraints, and back to their declared mode afterwards, so the
+        # caller's other deferred constraints stay deferred.
+        cur.execute(
+            "SELECT conname, condeferred FROM pg_constraint WHERE conrelid = to_regclass(%s) AND condeferrable",
+            [name],
+        )
+        deferrable = cur.fetchall()
+        if deferrable:
+            cur.execute(f"SET CONSTRAINTS {', '.join(qn(c) for c, _ in deferrable)} IMMEDIATE")
+        cur.execute(f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(name)}")
+        cur.execute(f"DROP TABLE {qn(name)}")
+        # the names also matched the parent's and sibling partitions' copies, which still exist
+        cur.execute(
+            "SELECT DISTINCT conname FROM pg_constraint WHERE conname = ANY(%s) AND condeferrable AND condeferred",
+            [[c for c, _ in deferrable]],
+        )
+        deferred = [row[0] for row in cur.fetchall()]
+        if deferred:
+            cur.execute(f"SET CONSTRAINTS {', '.join(qn(c) for c in deferred)} DEFERRED")
+
+    _known_months.discard(month)
+    logger.info("Dropped empty payroll record partition %s", name)
+    return True
@@ -45,6 +45,11 @@ def get_dynamic_cutoff(month: date | str, cycle_type: str, business) -> Tuple[da
         logger.error("Matching cycle not found. Available cycles for business %s: %s", business.id, available)
         raise e
 
+    return cutoff_for_cycle(month, cycle)
+
+
+def cutoff_for_cycle(month: date, cycle: PayrollCycle) -> Tuple[date, date]:
+    """(start_date, end_date) of `cycle` anchored in `month`; no query (e.g. for a run's own cycle)."""
     # Days in the anchor (this) month
     days_in_month = monthrange(month.year, month.month)[1]
 
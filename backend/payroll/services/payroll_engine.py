@@ -10,30 +10,49 @@ from employees.models import Employee
 from payroll.models import (
     PayrollRecord,
     PayrollRun,
-    SalaryStructure,
     SalaryComponent,
     PayrollPolicy,
     PayrollCycle,
 )
-from payroll.services.mandatories import compute_mandatories_monthly, allocate_to_cycle
+from payroll.services.cache_versions import snapshot
+from payroll.services.mandatories import (
+    allocate_to_cycle,
+    compute_mandatories_batch,
+    compute_mandatories_monthly,
+)
 from payroll.services.payroll_cycles import get_dynamic_cutoff
+from payroll.services.position_structure import structure_for, structures_for
 from payroll.services.time_analysis import compute_time_based_components
 from payroll.services.helpers import compute_regular_monthly_gross
-from payroll.services.salary_rates import get_salary_for_month
+from payroll.services.salary_rates import CutoffSalary, SalaryResolver, cutoff_salaries
 
 # 🧰 Codes used by the mandatories service (when enabled)
 MANDATORY_CODES = {"SSS_EE", "PHIC_EE", "HDMF_EE", "TAX_WHT"}
 
 
+@snapshot()  # contribution tables / salary structures: one version read per run
 def generate_payroll_for_employee(
     employee,
     month: date,
     cycle_type: str,
-    run=None
+    run=None,
+    monthly_mandatories: dict | None = None,
+    salary: CutoffSalary | None = None,
+    persist: bool = True,
 ) -> dict:
     """
     Core payroll generator: builds PayrollRecords for an employee in a given month + cycle.
-    Optionally attaches to a PayrollRun instance.
+    Optionally attaches to a PayrollRun instance. `monthly_mandatories` and
+    `salary` are the employee's precomputed values from the batch pre-pass
+    (they skip the scalar computation / the SalaryRate query).
+
+    The salary structure is priced at the cutoff's pro-rated base: a rate
+    change or a hire inside the cutoff splits it into rate segments weighted
+    by scheduled workdays. Hourly rates and mandatories use the rate in force
+    at the end of the cutoff.
+
+    persist=False is a simulation: the same lines are computed and returned
+    (record_id None) but no PayrollRecord is written.
 
     Behavior switches:
       - If settings.PAYROLL_USE_MANDATORIES is False (MVP), government deductions should be
@@ -41,6 +60,8 @@ def generate_payroll_for_employee(
       - If True, engine computes mandatories programmatically and excludes those codes
         from SalaryStructure to avoid double-counting.
     """
+    if persist and run is not None and run.paid_at:
+        raise ValueError(f"PayrollRun {run.pk} is paid; corrections to it are posted as retro adjustments.")
     if not employee.position or not employee.branch or not employee.branch.business:
         raise ValueError("Employee must be assigned to a branch, position, and business.")
 
@@ -61,31 +82,17 @@ def generate_payroll_for_employee(
     except PayrollCycle.DoesNotExist:
         raise ValueError(f"No active PayrollCycle found for business '{business.name}' and type '{cycle_type}'")
 
-    base_salary: Decimal = get_salary_for_month(employee, month)
-
-    with transaction.atomic():
-        generated = []
-
-        # ─────────────────────────────────────────────────────────
-        # 1) Position-based components from SalaryStructure
-        #    Exclude mandatory codes only when the service is ON to avoid duplicates.
-        # ─────────────────────────────────────────────────────────
-        struct_qs = (
-            SalaryStructure.objects
-            .filter(position=employee.position)
-            .select_related("component")
-        )
-        if getattr(settings, "PAYROLL_USE_MANDATORIES", False):
-            struct_qs = struct_qs.exclude(component__code__in=MANDATORY_CODES)
+    if salary is None:
+        salary = cutoff_salaries([employee], cutoff_start, cutoff_end).get(employee.pk)
+    if salary is None:
+        raise ValueError(f"No salary rate found for {employee} between {cutoff_start} and {cutoff_end}")
+    base_salary = salary.rate
 
-        for struct in struct_qs:
-            comp = struct.component
-            amount = (
-                (Decimal(struct.amount) / Decimal("100")) * base_salary
-                if struct.is_percentage else
-                Decimal(struct.amount)
-            ).quantize(Decimal("0.01"))
+    generated = []
 
+    def post(comp, amount, source):
+        record_id = None
+        if persist:
             record, _created = PayrollRecord.objects.update_or_create(
                 employee=employee,
                 month=month,
@@ -97,23 +104,33 @@ def generate_payroll_for_employee(
                     "run": run,
                 }
             )
+            record_id = record.id
+        generated.append({
+            "record_id": record_id,
+            "component": comp.name,
+            "code": comp.code,
+            "type": comp.component_type,
+            "amount": str(amount),
+            "source": source,
+        })
 
-            generated.append({
-                "record_id": record.id,
-                "component": comp.name,
-                "code": comp.code,
-                "type": comp.component_type,
-                "amount": str(amount),
-                "source": "structure",
-            })
+    with transaction.atomic():
+        # ─────────────────────────────────────────────────────────
+        # 1) Position-based components from SalaryStructure
+        #    Exclude mandatory codes only when the service is ON to avoid duplicates.
+        # ─────────────────────────────────────────────────────────
+        exclude = MANDATORY_CODES if getattr(settings, "PAYROLL_USE_MANDATORIES", False) else ()
+        for comp, amount in structure_for(employee.position_id).lines(salary.prorated, exclude=exclude):
+            post(comp, amount, "structure")
 
         # ─────────────────────────────────────────────────────────
         # 2) Government mandatories (SSS/PHIC/HDMF/Tax) — OPTIONAL
         #    Only run when PAYROLL_USE_MANDATORIES is True.
         # ─────────────────────────────────────────────────────────
         if getattr(settings, "PAYROLL_USE_MANDATORIES", False):
-            gross_monthly = compute_regular_monthly_gross(employee.position, base_salary)
-            monthly_mandatories = compute_mandatories_monthly(gross_monthly, policy)
+            if monthly_mandatories is None:
+                gross_monthly = compute_regular_monthly_gross(employee.position, base_salary)
+                monthly_mandatories = compute_mandatories_monthly(gross_monthly, policy, on=month)
             allocated = allocate_to_cycle(monthly_mandatories, cycle_type)
             components = SalaryComponent.objects.filter(code__in=allocated.keys())
             comp_map = {c.code: c for c in components}
@@ -122,27 +139,7 @@ def generate_payroll_for_employee(
                 comp = comp_map.get(code)
                 if not comp:
                     continue
-
-                record, _created = PayrollRecord.objects.update_or_create(
-                    employee=employee,
-                    month=month,
-                    component=comp,
-                    payroll_cycle=payroll_cycle,
-                    defaults={
-                        "amount": amount,
-                        "is_13th_month": False,
-                        "run": run
-                    }
-                )
-
-                generated.append({
-                    "record_id": record.id,
-                    "component": comp.name,
-                    "code": comp.code,
-                    "type": comp.component_type,
-                    "amount": str(amount),
-                    "source": "mandatories",
-                })
+                post(comp, amount, "mandatories")
 
         # ─────────────────────────────────────────────────────────
         # 3) Time-based components (OT, late, undertime, absent, holiday/rest premiums)
@@ -156,31 +153,9 @@ def generate_payroll_for_employee(
         )
 
         for row in time_rows:
-            comp = row["component"]
-            amount = row["amount"]
+            post(row["component"], row["amount"], "time-analysis")
 
-            record, _created = PayrollRecord.objects.update_or_create(
-                employee=employee,
-                month=month,
-                component=comp,
-                payroll_cycle=payroll_cycle,
-                defaults={
-                    "amount": amount,
-                    "is_13th_month": False,
-                    "run": run
-                }
-            )
-
-            generated.append({
-                "record_id": record.id,
-                "component": comp.name,
-                "code": comp.code,
-                "type": comp.component_type,
-                "amount": str(amount),
-                "source": "time-analysis",
-            })
-
-    return {
+    result = {
         "employee_id": employee.id,
         "employee_name": f"{employee.first_name} {employee.last_name}",
         "month": month.strftime("%Y-%m"),
@@ -192,8 +167,55 @@ def generate_payroll_for_employee(
         "base_salary_used": str(base_salary),
         "records_generated": generated,
     }
+    if salary.is_prorated:
+        result["prorated_salary"] = str(salary.prorated.quantize(Decimal("0.01")))
+        result["rate_segments"] = [
+            {"start": seg.start, "end": seg.end, "amount": str(seg.amount)} for seg in salary.segments
+        ]
+    return result
+
+
+def batch_monthly_mandatories(employees, month: date, policy=None, salaries: dict[int, Decimal] | None = None) -> dict[int, dict]:
+    """
+    Monthly mandatories for every employee of a run in one vectorized call:
+    { employee_id: { 'SSS_EE': ..., ... } }. `salaries` maps employee id to
+    the monthly rate (default: the rate on `month`); salary structures load
+    with at most one query. Employees without a rate are left out and fail in
+    their own generation.
+    """
+    employees = [e for e in employees if e.position_id]
+    if salaries is None:
+        resolver = SalaryResolver.for_employees(employees)
+        salaries = {e.id: resolver.amount_on(e.id, month) for e in employees}
+    structures = structures_for({e.position_id for e in employees})
+
+    ids, grosses = [], []
+    for e in employees:
+        amount = salaries.get(e.id)
+        if amount is not None:
+            ids.append(e.id)
+            grosses.append(structures[e.position_id].regular_gross(amount))
+    columns = compute_mandatories_batch(grosses, policy, on=month)
+    return {emp_id: {code: values[i] for code, values in columns.items()} for i, emp_id in enumerate(ids)}
+
+
+def _cutoff_salaries_by_business(employees, month: date, cycle_type: str, resolver: SalaryResolver) -> dict[int, CutoffSalary]:
+    """cutoff_salaries for a run's employees, one cutoff per business (usually just one)."""
+    by_business: dict[int, list] = {}
+    for e in employees:
+        if e.branch_id and e.branch.business_id:
+            by_business.setdefault(e.branch.business_id, []).append(e)
+    out: dict[int, CutoffSalary] = {}
+    for group in by_business.values():
+        try:
+            start, end = get_dynamic_cutoff(month, cycle_type, group[0].branch.business)
+        except Exception:
+            continue  # the generator reports the missing cycle per employee
+        out.update(cutoff_salaries(group, start, end, resolver))
+    return out
 
 
+@snapshot()
 def generate_batch_payroll(
     month: date,
     cycle_type: str,
@@ -239,23 +261,47 @@ def generate_batch_payroll(
         if not created and (run.notes or "") != "Auto-generated by payroll engine":
             run.notes = "Auto-generated by payroll engine"
             run.save(update_fields=["notes"])
+    if run.paid_at:
+        raise ValueError(f"PayrollRun {run.pk} is paid; corrections to it are posted as retro adjustments.")
 
-    qs = (
+    qs = list(
         Employee.objects
         .select_related("position", "branch__business")
         .filter(id__in=employee_ids, active=True)
     )
+    # every rate and position structure in one query each; the per-employee generation then queries neither
+    resolver = SalaryResolver.for_employees(qs)
+    structures = structures_for({e.position_id for e in qs})
+    salaries = _cutoff_salaries_by_business(qs, month, cycle_type, resolver)
+
+    mandatories: dict[int, dict] = {}
+    if getattr(settings, "PAYROLL_USE_MANDATORIES", False):
+        policy = PayrollPolicy.objects.filter(business_id=run.business_id).first()
+        rates = {employee_id: s.rate for employee_id, s in salaries.items()}
+        mandatories = batch_monthly_mandatories(qs, month, policy, rates)
 
     for employee in qs:
         try:
+            salary = salaries.get(employee.id)  # None: the generator reports what is missing
             if salary_overrides and employee.id in salary_overrides:
                 # For MVP we just note the override; engine still uses SalaryRate internally.
                 # If you need strict override, pass it into the generator and thread it through.
                 base_salary = Decimal(str(salary_overrides[employee.id]))
-                result = generate_payroll_for_employee(employee, month, cycle_type, run=run)
+                result = generate_payroll_for_employee(
+                    employee, month, cycle_type, run=run,
+                    monthly_mandatories=mandatories.get(employee.id), salary=salary,
+                )
                 result["note"] = f"Salary override provided (not applied to records): {base_salary}"
+                if employee.position_id in structures:
+                    result["simulated_structure"] = [
+                        {"code": comp.code, "type": comp.component_type, "amount": str(amount)}
+                        for comp, amount in structures[employee.position_id].lines(base_salary)
+                    ]
             else:
-                result = generate_payroll_for_employee(employee, month, cycle_type, run=run)
+                result = generate_payroll_for_employee(
+                    employee, month, cycle_type, run=run,
+                    monthly_mandatories=mandatories.get(employee.id), salary=salary,
+                )
 
             result["status"] = "success"
             results.append(result)
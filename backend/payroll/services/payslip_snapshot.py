@@ -12,6 +12,7 @@ from django.utils.dateparse import parse_date
 
 from employees.models import Employee
 from payroll.models import PayrollRecord, SalaryComponent, PayrollCycle, PayrollRun
+from payroll.services.archive import archived_payroll_rows
 
 
 def _normalize_month(value) -> date:
@@ -104,20 +105,31 @@ def get_employee_payslip_snapshot(
             used_cycle_type = distinct_cycles.first()
 
     # Build rows and totals
-    rows: List[Dict] = []
-    earnings = Decimal("0.00")
-    deductions = Decimal("0.00")
-
-    for r in qs:
-        rows.append({
+    rows: List[Dict] = [
+        {
             "component": r.component.name,
             "type": r.component.component_type,  # 'EARNING' or 'DEDUCTION'
             "amount": r.amount,
-        })
-        if r.component.component_type == SalaryComponent.EARNING:
-            earnings += r.amount
-        else:
-            deductions += r.amount
+        }
+        for r in qs
+    ]
+
+    # Nothing hot → the month may have been moved to the cold archive
+    if not rows:
+        archived = archived_payroll_rows(
+            business.id, employee_id, month,
+            run_id=used_run_id, cycle_type=used_cycle_type, include_13th=include_13th,
+        )
+        if archived:
+            if used_cycle_type is None:
+                cycles = {a["cycle_type"] for a in archived}
+                if len(cycles) > 1:
+                    raise ValueError("Multiple cycles found for this employee/month. Provide run_id or cycle_type.")
+                used_cycle_type = cycles.pop()
+            rows = [{"component": a["component"], "type": a["type"], "amount": a["amount"]} for a in archived]
+
+    earnings = sum((r["amount"] for r in rows if r["type"] == SalaryComponent.EARNING), Decimal("0.00"))
+    deductions = sum((r["amount"] for r in rows if r["type"] != SalaryComponent.EARNING), Decimal("0.00"))
 
     net = earnings - deductions
 
@@ -0,0 +1,119 @@
+# payroll/services/position_structure.py
+"""
+Compiled salary structures.
+
+A position's SalaryStructure rows are loaded once into a PositionStructure:
+fixed components (peso amounts) and percentage components (fractions of the
+base salary) kept apart, with the EARNING totals of each precomputed. Pricing
+a base salary is then a few multiplications and no query:
+
+    structure = structure_for(position_id)
+    structure.regular_gross(base_salary)      # BASIC + other earnings
+    structure.lines(base_salary, exclude=...) # [(component, amount)] to post
+
+Positions are kept per process until saving or deleting a SalaryStructure or
+SalaryComponent invalidates them (payroll.signals): here at once, in every
+other worker through the POSITION_STRUCTURES cache version
+(payroll.services.cache_versions). Bulk writes that skip signals
+(bulk_create / update) should call `invalidate()` themselves.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from payroll.models import SalaryComponent, SalaryStructure
+from payroll.services import cache_versions
+
+Q2 = Decimal("0.01")
+HUNDRED = Decimal("100")
+ZERO = Decimal("0.00")
+
+_lock = threading.Lock()
+_positions: Dict[int, Tuple[int, "PositionStructure"]] = {}  # position id -> (cache version, structure)
+_generation = 0  # bumped by invalidate()
+
+
+@dataclass(frozen=True)
+class PositionStructure:
+    position_id: Optional[int]
+    fixed: Tuple[Tuple[SalaryComponent, Decimal], ...]        # (component, amount)
+    percentage: Tuple[Tuple[SalaryComponent, Decimal], ...]   # (component, fraction of base salary)
+    fixed_earnings: Decimal
+    percentage_earnings: Decimal                               # sum of EARNING fractions
+
+    @classmethod
+    def build(cls, position_id: Optional[int], rows: Iterable[SalaryStructure]) -> "PositionStructure":
+        fixed, percentage = [], []
+        fixed_earnings = percentage_earnings = Decimal("0")
+        for s in rows:
+            earning = s.component.component_type == SalaryComponent.EARNING
+            if s.is_percentage:
+                fraction = Decimal(s.amount) / HUNDRED
+                percentage.append((s.component, fraction))
+                percentage_earnings += fraction if earning else 0
+            else:
+                fixed.append((s.component, Decimal(s.amount)))
+                fixed_earnings += Decimal(s.amount) if earning else 0
+        return cls(position_id, tuple(fixed), tuple(percentage), fixed_earnings, percentage_earnings)
+
+    def regular_gross(self, base_salary: Decimal) -> Decimal:
+        """BASIC + other EARNING components (no time-based items), 0.01."""
+        return (self.fixed_earnings + self.percentage_earnings * base_salary).quantize(Q2)
+
+    def lines(self, base_salary: Decimal, exclude: Iterable[str] = ()) -> List[Tuple[SalaryComponent, Decimal]]:
+        """Every component's amount for `base_salary` (0.01), skipping component codes in `exclude`."""
+        exclude = set(exclude)
+        out = [(c, amount.quantize(Q2)) for c, amount in self.fixed if c.code not in exclude]
+        out += [(c, (fraction * base_salary).quantize(Q2)) for c, fraction in self.percentage if c.code not in exclude]
+        return out
+
+
+EMPTY = PositionStructure(None, (), (), Decimal("0"), Decimal("0"))
+
+
+def structures_for(position_ids: Iterable[int]) -> Dict[int, PositionStructure]:
+    """Compiled structures of these positions; the missing/outdated ones load in one query."""
+    wanted = {int(p) for p in position_ids if p is not None}
+    if not wanted:
+        return {}
+    version = cache_versions.current(cache_versions.POSITION_STRUCTURES)
+    with _lock:
+        found = {p: _positions[p][1] for p in wanted if p in _positions and _positions[p][0] == version}
+        generation = _generation
+    stale = wanted - found.keys()
+    if stale:
+        rows: Dict[int, List[SalaryStructure]] = {p: [] for p in stale}
+        for s in SalaryStructure.objects.filter(position_id__in=stale).select_related("component").order_by("id"):
+            rows[s.position_id].append(s)
+        loaded = {p: PositionStructure.build(p, rows[p]) for p in stale}
+        with _lock:
+            # an invalidate() while we were loading means this result may already be stale
+            if generation == _generation:
+                _positions.update({p: (version, structure) for p, structure in loaded.items()})
+        found.update(loaded)
+    return found
+
+
+def structure_for(position_id: Optional[int]) -> PositionStructure:
+    """The position's compiled structure (an empty one for None); at most one query when cold."""
+    if position_id is None:
+        return EMPTY
+    return structures_for([position_id])[int(position_id)]
+
+
+def invalidate(position_id: Optional[int] = None) -> None:
+    """
+    Forget one position's structure, or every position's. Other processes
+    only see that a structure changed, so they reload every position.
+    """
+    global _generation
+    with _lock:
+        if position_id is None:
+            _positions.clear()
+        else:
+            _positions.pop(position_id, None)
+        _generation += 1
+    cache_versions.bump(cache_versions.POSITION_STRUCTURES)
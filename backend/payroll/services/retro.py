@@ -0,0 +1,412 @@
+# payroll/services/retro.py
+"""
+Retroactive adjustments.
+
+A SalaryRate or TimeLog written after its period was paid leaves the paid
+run wrong. Writers record what changed as PayrollInputChange rows (the input
+change index, kept by payroll.signals, including the importer / punch pairing
+bulk writes) for the days a paid run covers. `apply_retro`:
+
+  1. reads the pending changes and finds the paid runs (COMPLETED and
+     finalised with `paid_at`; a generated run is not paid yet) whose cutoff
+     intersects each change and that paid that employee, so only the
+     affected employee-cycles are recomputed, never whole runs;
+  2. recomputes those employee-cycles per run in bulk with the engine in
+     simulation mode (persist=False: no PayrollRecord is written);
+  3. compares each with what was paid plus earlier adjustments, on the
+     components the changed inputs feed only (`fed_codes`): the simulation
+     prices with today's structure, policy, schedule and calendar, and a rule
+     changed since payment must not be paid out as a correction. It posts the
+     difference as a RetroAdjustment and a RETRO_ADJ record in the next open
+     (PENDING) run of the business, then stamps the changes processed.
+
+A change whose difference has no open run to go to (or, with an explicit
+`target_run`, whose paid run does not come before it) stays pending for the
+next call. A change whose paid cycle cannot be recomputed at all (e.g. its
+PayrollCycle was deactivated) is reported once and stamped processed with
+the `error`; `retry_failed_changes` queues those again once the cause is fixed.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from employees.models import Employee
+from payroll.models import (
+    PayrollInputChange, PayrollPolicy, PayrollRecord, PayrollRun, RetroAdjustment, SalaryComponent,
+)
+from payroll.services.cache_versions import snapshot
+from payroll.services.mandatories import MANDATORY_CODES
+from payroll.services.payroll_cycles import cutoff_for_cycle
+from payroll.services.position_structure import EMPTY, PositionStructure, structures_for
+from payroll.services.salary_rates import cutoff_salaries
+from payroll.services.time_analysis import COMPONENT_DEFS as TIME_COMPONENTS
+
+RETRO_CODE = "RETRO_ADJ"
+COMPLETED = "COMPLETED"
+OPEN = "PENDING"
+Q2 = Decimal("0.01")
+
+
+@dataclass
+class RetroResult:
+    changes: int = 0                                  # pending changes read
+    recomputed: int = 0                               # employee-cycles simulated
+    adjustments: List[dict] = field(default_factory=list)
+    unresolved: List[dict] = field(default_factory=list)
+    processed: int = 0                                # changes stamped processed
+    dry_run: bool = False
+
+
+# ─────────────────────────────────────────────────────────
+# Input change index
+# ─────────────────────────────────────────────────────────
+def _paid_cutoffs(employee_ids: Iterable[int], earliest: date) -> Dict[int, List[Tuple[date, date]]]:
+    """{ employee_id: [(start, end)] } of the paid runs of each employee's business that may reach `earliest`."""
+    # a cutoff may start in the month before (wrap-around cycles); one query via the branch
+    runs = (
+        PayrollRun.objects
+        .select_related("payroll_cycle")
+        .filter(paid_runs(), business__branches__employees__id__in=set(employee_ids),
+                month__gte=earliest.replace(day=1) - timedelta(days=31))
+        .annotate(employee_id=F("business__branches__employees__id"))
+    )
+    out: Dict[int, List[Tuple[date, date]]] = defaultdict(list)
+    for run in runs:
+        out[run.employee_id].append(cutoff_for_cycle(run.month, run.payroll_cycle))
+    return out
+
+
+def record_input_change(employee_id: int, kind: str, date_from: date, date_to: Optional[date]) -> bool:
+    """
+    Index the change if a paid run's cutoff covers any of its days; a run paid
+    later is generated from the inputs as they are then. Returns whether it did.
+    """
+    change = PayrollInputChange(employee_id=employee_id, kind=kind, date_from=date_from, date_to=date_to)
+    if not any(_overlaps(start, end, change) for start, end in _paid_cutoffs([employee_id], date_from).get(employee_id, ())):
+        return False
+    change.save()
+    return True
+
+
+def record_timelog_changes(keys: Iterable[Tuple[int, date]]) -> int:
+    """One change row per employee covering the written (employee_id, date) keys that paid runs cover."""
+    keys = list(keys)
+    if not keys:
+        return 0
+    cutoffs = _paid_cutoffs({employee_id for employee_id, _ in keys}, min(day for _, day in keys))
+    spans: Dict[int, Tuple[date, date]] = {}
+    for employee_id, day in keys:
+        if not any(start <= day <= end for start, end in cutoffs.get(employee_id, ())):
+            continue
+        lo, hi = spans.get(employee_id, (day, day))
+        spans[employee_id] = (min(lo, day), max(hi, day))
+    PayrollInputChange.objects.bulk_create([
+        PayrollInputChange(employee_id=e, kind=PayrollInputChange.TIMELOG, date_from=lo, date_to=hi)
+        for e, (lo, hi) in spans.items()
+    ])
+    return len(spans)
+
+
+def pending_changes(business=None):
+    qs = PayrollInputChange.objects.filter(processed_at__isnull=True)
+    if business is not None:
+        qs = qs.filter(employee__branch__business=business)
+    return qs
+
+
+def retry_failed_changes(business=None) -> int:
+    """Queue the changes that failed to recompute again; returns how many."""
+    qs = PayrollInputChange.objects.filter(processed_at__isnull=False).exclude(error="")
+    if business is not None:
+        qs = qs.filter(employee__branch__business=business)
+    return qs.update(processed_at=None, error="")
+
+
+# ─────────────────────────────────────────────────────────
+# Affected employee-cycles
+# ─────────────────────────────────────────────────────────
+def paid_runs() -> Q:
+    """Runs finalised as paid; regenerating any other run changes nothing that was paid."""
+    return Q(status=COMPLETED, paid_at__isnull=False)
+
+
+def _overlaps(start: date, end: date, change: PayrollInputChange) -> bool:
+    return change.date_from <= end and (change.date_to is None or change.date_to >= start)
+
+
+def affected_employee_runs(changes: Iterable[PayrollInputChange]) -> Dict[PayrollRun, Set[int]]:
+    """
+    { paid run: {employee ids} } for the runs whose cutoff intersects a
+    change of that employee and that actually paid the employee.
+    """
+    changes = list(changes)
+    if not changes:
+        return {}
+    business_of = dict(
+        Employee.objects.filter(id__in={c.employee_id for c in changes}).values_list("id", "branch__business_id")
+    )
+    # a cutoff may start in the month before a change (wrap-around cycles)
+    earliest_month = min(c.date_from for c in changes).replace(day=1) - timedelta(days=31)
+    runs = (
+        PayrollRun.objects
+        .select_related("payroll_cycle")
+        .filter(paid_runs(), business_id__in=set(business_of.values()) - {None}, month__gte=earliest_month)
+    )
+    by_business: Dict[int, List[Tuple[PayrollRun, date, date]]] = defaultdict(list)
+    for run in runs:
+        start, end = cutoff_for_cycle(run.month, run.payroll_cycle)
+        by_business[run.business_id].append((run, start, end))
+
+    candidates: Dict[PayrollRun, Set[int]] = defaultdict(set)
+    for change in changes:
+        for run, start, end in by_business.get(business_of.get(change.employee_id), ()):
+            if _overlaps(start, end, change):
+                candidates[run].add(change.employee_id)
+    if not candidates:
+        return {}
+
+    # only employees the run paid (one query)
+    paid = set(
+        PayrollRecord.objects
+        .filter(run__in=list(candidates), employee_id__in=set().union(*candidates.values()))
+        .values_list("run_id", "employee_id")
+        .distinct()
+    )
+    out: Dict[PayrollRun, Set[int]] = {}
+    for run, employee_ids in candidates.items():
+        hit = {e for e in employee_ids if (run.pk, e) in paid}
+        if hit:
+            out[run] = hit
+    return out
+
+
+# ─────────────────────────────────────────────────────────
+# Simulation and differences
+# ─────────────────────────────────────────────────────────
+def _signed(component_type: str, amount) -> Decimal:
+    amount = Decimal(str(amount))
+    return amount if component_type == SalaryComponent.EARNING else -amount
+
+
+def simulate_run(run: PayrollRun, employee_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    Recompute `employee_ids` in `run` without writing PayrollRecords:
+    { employee_id: engine result } (or {"error": ...}). One SalaryRate query
+    and one mandatories batch for the whole group.
+    """
+    from payroll.services.payroll_engine import batch_monthly_mandatories, generate_payroll_for_employee
+
+    employees = list(
+        Employee.objects.select_related("position", "branch__business").filter(id__in=set(employee_ids))
+    )
+    start, end = cutoff_for_cycle(run.month, run.payroll_cycle)
+    salaries = cutoff_salaries(employees, start, end)
+    mandatories: Dict[int, dict] = {}
+    if getattr(settings, "PAYROLL_USE_MANDATORIES", False):
+        policy = PayrollPolicy.objects.filter(business_id=run.business_id).first()
+        mandatories = batch_monthly_mandatories(
+            employees, run.month, policy, {employee_id: s.rate for employee_id, s in salaries.items()}
+        )
+
+    out: Dict[int, dict] = {}
+    for employee in employees:
+        try:
+            out[employee.pk] = generate_payroll_for_employee(
+                employee, run.month, run.payroll_cycle.cycle_type, run=run,
+                monthly_mandatories=mandatories.get(employee.pk), salary=salaries.get(employee.pk), persist=False,
+            )
+        except Exception as e:
+            out[employee.pk] = {"error": str(e)}
+    return out
+
+
+def paid_lines(run: PayrollRun, employee_ids: Iterable[int]) -> Dict[int, Dict[str, Decimal]]:
+    """What the run paid, per employee and component code (signed), plus earlier adjustments."""
+    employee_ids = set(employee_ids)
+    lines: Dict[int, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+    records = (
+        PayrollRecord.objects
+        .filter(run=run, month=run.month, employee_id__in=employee_ids, is_13th_month=False)
+        .exclude(component__code=RETRO_CODE)
+        .values_list("employee_id", "component__code", "component__component_type", "amount")
+    )
+    for employee_id, code, component_type, amount in records:
+        lines[employee_id][code] += _signed(component_type, amount)
+    for adj in RetroAdjustment.objects.filter(source_run=run, employee_id__in=employee_ids):
+        for code, delta in adj.detail.items():
+            lines[adj.employee_id][code] += Decimal(delta)
+    return lines
+
+
+def fed_codes(kinds: Set[str], structure: PositionStructure, paid: Iterable[str]) -> Set[str]:
+    """
+    Component codes the changed input kinds feed. Both feed the time-based
+    components (a SalaryRate through the hourly rate); a SalaryRate also
+    feeds the mandatories and the structure's percentage components the run
+    paid (fixed amounts and components added since do not depend on it).
+    """
+    codes = set(TIME_COMPONENTS)
+    if PayrollInputChange.SALARY_RATE in kinds:
+        codes |= set(MANDATORY_CODES)
+        codes |= {component.code for component, _ in structure.percentage} & set(paid)
+    return codes
+
+
+def differences(simulated: dict, paid: Dict[str, Decimal], codes: Optional[Set[str]] = None) -> Dict[str, Decimal]:
+    """Per-code (recomputed - paid), zero differences dropped; only `codes` when given."""
+    now: Dict[str, Decimal] = defaultdict(Decimal)
+    for line in simulated["records_generated"]:
+        if line["code"] != RETRO_CODE:
+            now[line["code"]] += _signed(line["type"], line["amount"])
+    codes = (set(now) | set(paid)) if codes is None else codes
+    diff = {code: (now.get(code, Decimal("0")) - paid.get(code, Decimal("0"))).quantize(Q2) for code in codes}
+    return {code: d for code, d in sorted(diff.items()) if d}
+
+
+def _period(run: PayrollRun) -> Tuple[date, int]:
+    return run.month, run.payroll_cycle.start_day
+
+
+def next_open_run(run: PayrollRun, open_runs: List[PayrollRun]) -> Optional[PayrollRun]:
+    """The first open run of the business whose period comes after `run`'s."""
+    later = [r for r in open_runs if r.business_id == run.business_id and _period(r) > _period(run)]
+    return min(later, key=lambda r: (*_period(r), r.pk), default=None)
+
+
+# ─────────────────────────────────────────────────────────
+# Apply
+# ─────────────────────────────────────────────────────────
+def _retro_component() -> SalaryComponent:
+    component, _ = SalaryComponent.objects.get_or_create(
+        code=RETRO_CODE,
+        defaults={"name": "Retroactive adjustment", "component_type": SalaryComponent.EARNING},
+    )
+    return component
+
+
+def _post(employee_id: int, target: PayrollRun, component: SalaryComponent) -> Decimal:
+    """RETRO_ADJ record of the target run = all adjustments it received for the employee (may be negative)."""
+    total = (
+        RetroAdjustment.objects.filter(employee_id=employee_id, target_run=target).aggregate(total=Sum("amount"))["total"]
+        or Decimal("0")
+    )
+    PayrollRecord.objects.update_or_create(
+        employee_id=employee_id,
+        month=target.month,
+        component=component,
+        payroll_cycle=target.payroll_cycle,
+        defaults={"amount": total, "is_13th_month": False, "run": target},
+    )
+    return total
+
+
+@snapshot()
+def apply_retro(business=None, target_run: Optional[PayrollRun] = None, dry_run: bool = False) -> RetroResult:
+    """
+    Turn the pending input changes (of `business`, or all) into adjustments.
+    `target_run` receives every adjustment instead of each run's next open run;
+    only paid runs of its business that come before it are adjusted into it.
+    dry_run computes and reports without writing anything.
+    """
+    result = RetroResult(dry_run=dry_run)
+    with transaction.atomic():
+        changes = list(pending_changes(business).select_for_update(of=("self",)))
+        result.changes = len(changes)
+        affected = affected_employee_runs(changes)
+
+        runs_filter = Q(status=OPEN)
+        if business is not None:
+            runs_filter &= Q(business=business)
+        open_runs = [target_run] if target_run else list(PayrollRun.objects.select_related("payroll_cycle").filter(runs_filter))
+        no_target = f"not before target run {target_run.pk}" if target_run else "no open run"
+        component = None if dry_run else _retro_component()
+
+        # the (employee, paid run) keys each change intersects, and the input kinds changed per key
+        cutoffs = {run.pk: cutoff_for_cycle(run.month, run.payroll_cycle) for run in affected}
+        keys_of: Dict[int, List[Tuple[int, int]]] = {}
+        kinds: Dict[Tuple[int, int], Set[str]] = defaultdict(set)
+        for change in changes:
+            keys_of[change.pk] = [
+                (change.employee_id, run.pk) for run, employee_ids in affected.items()
+                if change.employee_id in employee_ids and _overlaps(*cutoffs[run.pk], change)
+            ]
+            for key in keys_of[change.pk]:
+                kinds[key].add(change.kind)
+        position_of = dict(
+            Employee.objects.filter(id__in=set().union(*affected.values())).values_list("id", "position_id")
+        ) if affected else {}
+        structures = structures_for(position_of.values())
+
+        # per (employee, paid run): left pending, or failed with a reason
+        waiting: Set[Tuple[int, int]] = set()
+        failed: Dict[Tuple[int, int], str] = {}
+        touched: Set[Tuple[int, PayrollRun]] = set()
+        for run in sorted(affected, key=lambda r: (*_period(r), r.pk)):
+            employee_ids = affected[run]
+            simulated = simulate_run(run, employee_ids)
+            result.recomputed += len(employee_ids)
+            paid = paid_lines(run, employee_ids)
+            target = next_open_run(run, open_runs)
+
+            for employee_id in sorted(employee_ids):
+                sim = simulated.get(employee_id, {"error": "employee not found"})
+                if "error" in sim:
+                    failed[(employee_id, run.pk)] = sim["error"]
+                    result.unresolved.append({"employee_id": employee_id, "run_id": run.pk, "reason": sim["error"]})
+                    continue
+                lines = paid.get(employee_id, {})
+                structure = structures.get(position_of.get(employee_id), EMPTY)
+                diff = differences(sim, lines, fed_codes(kinds[(employee_id, run.pk)], structure, lines))
+                if not diff:
+                    continue
+                if target is None:
+                    waiting.add((employee_id, run.pk))
+                    result.unresolved.append({"employee_id": employee_id, "run_id": run.pk, "reason": no_target})
+                    continue
+                amount = sum(diff.values(), Decimal("0"))
+                result.adjustments.append({
+                    "employee_id": employee_id,
+                    "source_run_id": run.pk,
+                    "target_run_id": target.pk,
+                    "amount": str(amount),
+                    "detail": {code: str(d) for code, d in diff.items()},
+                })
+                if not dry_run:
+                    RetroAdjustment.objects.create(
+                        employee_id=employee_id, source_run=run, target_run=target, amount=amount,
+                        detail={code: str(d) for code, d in diff.items()},
+                    )
+                    touched.add((employee_id, target))
+
+        if dry_run:
+            return result
+        for employee_id, target in touched:
+            _post(employee_id, target, component)
+
+        # Each change is settled by the employee-cycles it intersects: any left
+        # waiting keeps it pending; otherwise it is processed, with the errors
+        # of the ones that could not be recomputed
+        done, errors = [], {}
+        for change in changes:
+            keys = keys_of[change.pk]
+            if any(k in waiting for k in keys):
+                continue
+            reasons = [f"run {run_id}: {failed[(e, run_id)]}" for e, run_id in keys if (e, run_id) in failed]
+            if reasons:
+                errors[change.pk] = "; ".join(reasons)
+            else:
+                done.append(change.pk)
+        now = timezone.now()
+        result.processed = PayrollInputChange.objects.filter(pk__in=done).update(processed_at=now)
+        for pk, error in errors.items():
+            result.processed += PayrollInputChange.objects.filter(pk=pk).update(processed_at=now, error=error)
+    return result
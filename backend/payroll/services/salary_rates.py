@@ -1,9 +1,35 @@
 # payroll/services/salary_rates.py
-from datetime import date
+"""
+SalaryRate lookups.
+
+`get_salary_for_month` answers for one employee. For a run, `SalaryResolver`
+loads the rates of every employee with one query and keeps them per employee
+as start-date-sorted arrays, so resolving any date is a `bisect`.
+
+A cutoff is paid per rate segment: `cutoff_salaries` splits it where the rate
+changes (and before the hire date, where nothing is owed) and pro-rates the
+monthly rate by the schedule workdays each segment covers.
+
+Rate periods of one employee must not overlap: the serializers reject it via
+`overlapping_rates`, and on PostgreSQL an exclusion constraint
+(payroll migration 0012) enforces it for every writer. Rows that predate it
+are rewritten as their `resolved_periods` by `manage.py
+reconcile_salary_rate_overlaps`.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
 from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
 from django.db import models
 
 from payroll.models import SalaryRate
+from payroll.services.cache_versions import snapshot
+from payroll.services.work_schedule import schedule_for
+
 
 def get_salary_for_month(employee, target_month: date) -> Decimal:
     """
@@ -21,3 +47,163 @@ def get_salary_for_month(employee, target_month: date) -> Decimal:
     if not rate:
         raise ValueError(f"No salary rate found for {employee} on {target_month}")
     return rate.amount
+
+
+def overlapping_rates(employee, start_date: date, end_date: Optional[date], exclude_pk=None):
+    """The employee's rates whose [start_date, end_date] period intersects the given one (null end = open)."""
+    qs = SalaryRate.objects.filter(employee=employee).filter(
+        models.Q(end_date__gte=start_date) | models.Q(end_date__isnull=True)
+    )
+    if end_date is not None:
+        qs = qs.filter(start_date__lte=end_date)
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    return qs
+
+
+def resolved_periods(rates: Iterable[Tuple[int, date, Optional[date]]]) -> List[Tuple[int, date, Optional[date]]]:
+    """
+    One employee's (rate id, start, end) rows as the non-overlapping periods
+    they are paid by: [(rate id, start, end)], by start. Where periods overlap
+    the rate with the latest start wins, as in SalaryResolver.amount_on (the
+    higher id on the same start), so every day keeps the amount it resolved to.
+    A rate may come out split in several periods, or not at all.
+    """
+    rates = sorted(rates, key=lambda r: (r[1], r[0]))
+    bounds = sorted({r[1] for r in rates} | {r[2] + timedelta(days=1) for r in rates if r[2] is not None})
+    out: List[Tuple[int, date, Optional[date]]] = []
+    for i, day in enumerate(bounds):
+        last = bounds[i + 1] - timedelta(days=1) if i + 1 < len(bounds) else None
+        covering = [r for r in rates if r[1] <= day and (r[2] is None or r[2] >= day)]
+        if not covering:
+            continue
+        winner = covering[-1][0]
+        if out and out[-1][0] == winner and out[-1][2] == day - timedelta(days=1):
+            out[-1] = (winner, out[-1][1], last)
+        else:
+            out.append((winner, day, last))
+    return out
+
+
+class SalaryResolver:
+    """
+    Every SalaryRate of a set of employees, indexed for date lookups:
+
+        resolver = SalaryResolver.for_employees(employee_ids)   # one query
+        resolver.amount_on(employee.id, month)                   # bisect, no query
+
+    Same selection as get_salary_for_month: the rate covering the date with
+    the latest start_date.
+    """
+
+    def __init__(self, rates: Iterable[Tuple[int, date, Optional[date], Decimal]]):
+        by_employee: Dict[int, List[Tuple[date, Optional[date], Decimal]]] = {}
+        for employee_id, start, end, amount in rates:
+            by_employee.setdefault(employee_id, []).append((start, end, amount))
+        self._starts: Dict[int, List[date]] = {}
+        self._rates: Dict[int, List[Tuple[date, Optional[date], Decimal]]] = {}
+        for employee_id, rows in by_employee.items():
+            rows.sort(key=lambda r: r[0])
+            self._starts[employee_id] = [r[0] for r in rows]
+            self._rates[employee_id] = rows
+
+    @classmethod
+    def for_employees(cls, employees: Iterable) -> "SalaryResolver":
+        """Employees or their ids."""
+        ids = {getattr(e, "pk", e) for e in employees}
+        rows = SalaryRate.objects.filter(employee_id__in=ids).order_by().values_list(
+            "employee_id", "start_date", "end_date", "amount"
+        )
+        return cls(rows)
+
+    def amount_on(self, employee_id: int, day: date) -> Optional[Decimal]:
+        """The rate in force on `day`, or None."""
+        starts = self._starts.get(employee_id)
+        if not starts:
+            return None
+        rows = self._rates[employee_id]
+        # latest start <= day first; earlier ones only matter for legacy overlapping periods
+        for i in range(bisect_right(starts, day) - 1, -1, -1):
+            start, end, amount = rows[i]
+            if end is None or end >= day:
+                return amount
+        return None
+
+    def segments(self, employee_id: int, start: date, end: date, hired: Optional[date] = None) -> List["RateSegment"]:
+        """
+        [start, end] split into runs of days with the same rate; days before
+        `hired` or without a rate are left out.
+        """
+        if hired is not None and hired > start:
+            start = hired
+        out: List[RateSegment] = []
+        day = start
+        while day <= end:
+            amount = self.amount_on(employee_id, day)
+            if amount is not None:
+                if out and out[-1].amount == amount and out[-1].end == day - timedelta(days=1):
+                    out[-1] = out[-1]._replace(end=day)
+                else:
+                    out.append(RateSegment(day, day, amount))
+            day += timedelta(days=1)
+        return out
+
+
+class RateSegment(NamedTuple):
+    start: date
+    end: date
+    amount: Decimal     # monthly rate
+
+
+@dataclass(frozen=True)
+class CutoffSalary:
+    """What an employee earns in one cutoff."""
+    rate: Decimal                       # monthly rate in force at the last paid day (hourly rates, mandatories)
+    prorated: Decimal                   # monthly-equivalent base for the cutoff (salary structure)
+    segments: Tuple[RateSegment, ...]
+
+    @property
+    def is_prorated(self) -> bool:
+        return self.prorated != self.rate
+
+
+def _workdays(start: date, end: date, schedule) -> int:
+    days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+    return sum(1 for d in days if schedule.is_work_day(d.weekday()))
+
+
+def cutoff_salary(segments: List[RateSegment], start: date, end: date, schedule) -> Optional[CutoffSalary]:
+    """
+    Pro-rate the segments of [start, end] by schedule workdays. One segment
+    covering the whole cutoff is paid its rate unchanged; None if no day has a rate.
+    """
+    if not segments:
+        return None
+    rate = segments[-1].amount
+    if len(segments) == 1 and segments[0].start == start and segments[0].end == end:
+        return CutoffSalary(rate, rate, tuple(segments))
+
+    total = _workdays(start, end, schedule)
+    if total:
+        paid = sum(s.amount * _workdays(s.start, s.end, schedule) for s in segments) / total
+    else:  # no scheduled workday at all: calendar days
+        paid = sum(s.amount * ((s.end - s.start).days + 1) for s in segments) / ((end - start).days + 1)
+    return CutoffSalary(rate, paid, tuple(segments))
+
+
+@snapshot()
+def cutoff_salaries(employees, start: date, end: date, resolver: Optional[SalaryResolver] = None) -> Dict[int, CutoffSalary]:
+    """
+    cutoff_salary for every employee in one pass: one SalaryRate query (none
+    with `resolver`) and the cached branch schedules. Employees without any
+    rate in the cutoff are left out.
+    """
+    employees = list(employees)
+    if resolver is None:
+        resolver = SalaryResolver.for_employees(employees)
+    out: Dict[int, CutoffSalary] = {}
+    for e in employees:
+        salary = cutoff_salary(resolver.segments(e.pk, start, end, e.hire_date), start, end, schedule_for(e))
+        if salary is not None:
+            out[e.pk] = salary
+    return out
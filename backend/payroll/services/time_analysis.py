@@ -1,11 +1,11 @@
 # payroll/services/time_analysis.py
-from datetime import datetime, timedelta, date, time as dt_time
-from types import SimpleNamespace
-from decimal import Decimal, ROUND_HALF_UP
 from collections import defaultdict
+from datetime import datetime, timedelta, date
+from decimal import Decimal, ROUND_HALF_UP
 
 from timekeeping.models import TimeLog
 from payroll.models import SalaryComponent
+from payroll.services.work_schedule import CompiledSchedule, compile_schedule, schedule_for
 
 # ─────────────────────────────────────────────────────────
 # helpers
@@ -56,10 +56,13 @@ def _worked_hours_for_log(log: TimeLog, break_hours: Decimal) -> Decimal:
     return _q2(_to_hours(dt_out - dt_in) - break_hours)
 
 # ─────────────────────────────────────────────────────────
-# your analyzer (UNCHANGED)
+# analyzer (schedule compiled by payroll.services.work_schedule)
 # ─────────────────────────────────────────────────────────
-def analyze_timelog(timelog, schedule) -> list[dict]:
+def analyze_timelog(timelog, schedule, holiday=None) -> list[dict]:
     """
+    `holiday`: the Holiday observed on the log's date (from the holiday calendar)
+    when the log itself carries none.
+
     Clean, non-overlapping codes:
 
     - REST DAY: only REST_OT (no LATE / UNDERTIME / ABSENT)
@@ -71,23 +74,17 @@ def analyze_timelog(timelog, schedule) -> list[dict]:
         * UNDERTIME once: max( left-early, shortfall-to-min-hours )
         * OT if hours_worked > expected_hours
     """
-    policy = getattr(timelog.employee.branch.business, "payroll_policy", None)
-
-    # Pull schedule params with safe fallbacks
-    grace = getattr(schedule, "grace_minutes", None)
-    if grace is None:
-        grace = getattr(policy, "grace_minutes", 0) or 0
-    break_hours = Decimal(str(getattr(schedule, "break_hours", "1.00") or "1.00"))
-    min_hours = Decimal(str(getattr(schedule, "min_hours_required", "8.00") or "8.00"))
-
-    expected_in = getattr(schedule, "time_in", None)
-    expected_out = getattr(schedule, "time_out", None)
-
-    # Workdays (Mon–Fri) fallback if schedule missing
-    work_days = schedule.get_work_days() if schedule and hasattr(schedule, "get_work_days") else {0,1,2,3,4}
-    weekday = timelog.date.weekday()
-    is_rest_day = weekday not in work_days
-    is_holiday = bool(getattr(timelog, "holiday_id", None))
+    if not isinstance(schedule, CompiledSchedule):
+        # a WorkSchedulePolicy (or None): compile it, grace falling back to the business policy
+        branch = getattr(timelog.employee, "branch", None)
+        policy = getattr(getattr(branch, "business", None), "payroll_policy", None)
+        schedule = compile_schedule(schedule, getattr(policy, "grace_minutes", 0) or 0)
+
+    grace = schedule.grace_minutes
+    break_hours = schedule.break_hours
+    min_hours = schedule.min_hours_required
+    is_rest_day = not schedule.is_work_day(timelog.date.weekday())
+    is_holiday = bool(getattr(timelog, "holiday_id", None)) or holiday is not None
 
     # Missing punches
     if not timelog.time_in or not timelog.time_out:
@@ -121,14 +118,12 @@ def analyze_timelog(timelog, schedule) -> list[dict]:
     if hours_worked <= Decimal("0.00"):
         return [{"code": "ABSENT", "hours": min_hours}]
 
-    # Expected day bounds (guard if schedule missing)
-    exp_in_dt = datetime.combine(timelog.date, expected_in) if expected_in else None
-    exp_out_dt = datetime.combine(timelog.date, expected_out) if expected_out else None
-    if exp_out_dt and exp_in_dt and exp_out_dt <= exp_in_dt:
-        exp_out_dt += timedelta(days=1)
+    # Expected day bounds (overnight-aware span)
+    exp_in_dt = datetime.combine(timelog.date, schedule.time_in)
+    exp_out_dt = exp_in_dt + timedelta(minutes=schedule.span_minutes)
 
     # LATE (emit minutes already net of grace) ✅
-    if exp_in_dt and dt_in > exp_in_dt:
+    if dt_in > exp_in_dt:
         late_delta = dt_in - exp_in_dt
         late_minutes = _to_minutes(late_delta)
         eff = late_minutes - Decimal(grace)
@@ -137,7 +132,7 @@ def analyze_timelog(timelog, schedule) -> list[dict]:
 
     # UNDERTIME — compute once, as the MAX of two sources ✅
     undertime_from_left_early = Decimal("0.00")
-    if exp_out_dt and dt_out < exp_out_dt:
+    if dt_out < exp_out_dt:
         undertime_delta = exp_out_dt - dt_out
         undertime_from_left_early = _to_minutes(undertime_delta)
 
@@ -149,17 +144,26 @@ def analyze_timelog(timelog, schedule) -> list[dict]:
     if undertime_total > 0:
         components.append({"code": "UNDERTIME", "minutes": undertime_total})
 
-    # OT: only if over expected hours (when we have expected bounds)
-    if exp_in_dt and exp_out_dt:
-        expected_hours = _to_hours(exp_out_dt - exp_in_dt) - break_hours
-        if hours_worked > expected_hours:
-            components.append({"code": "OT", "hours": (hours_worked - expected_hours).quantize(Decimal("0.01"))})
+    # OT: only if over expected hours
+    expected_hours = schedule.expected_daily_hours
+    if hours_worked > expected_hours:
+        components.append({"code": "OT", "hours": (hours_worked - expected_hours).quantize(Decimal("0.01"))})
 
     return components
 
 # ─────────────────────────────────────────────────────────
 # ✅ MODIFIED: cutoff-aware & policy-driven compute
 # ─────────────────────────────────────────────────────────
+class _FallbackPolicy:
+    grace_minutes = 0
+    standard_working_days = Decimal("22")
+    late_penalty_per_minute = Decimal("0")
+    undertime_penalty_per_minute = Decimal("0")
+    absent_penalty_per_day = Decimal("0")
+    ot_multiplier = Decimal("1.25")
+    rest_day_multiplier = Decimal("1.30")
+
+
 def compute_time_based_components(
     employee,
     start: date,            # ✅ cutoff start
@@ -170,41 +174,23 @@ def compute_time_based_components(
     """
     Compute time-based earnings/deductions for an employee within [start, end].
     Returns: list of {"component": SalaryComponent, "amount": Decimal}
+
+    Logs are analyzed once into DailyAttendance (payroll.services.attendance);
+    here the cutoff reads those rows in one query. Each day's amount is
+    rounded on its own and the days are summed, as pay always was. Scheduled
+    workdays without a log count as absent.
     """
+    from payroll.services.attendance import attendance_facts, ensure_attendance, missing_workdays
+
     # fallbacks if policy is missing
     if not policy:
-        class _P:
-            grace_minutes = 0
-            standard_working_days = Decimal("22")
-            late_penalty_per_minute = Decimal("0")
-            undertime_penalty_per_minute = Decimal("0")
-            absent_penalty_per_day = Decimal("0")
-            ot_multiplier = Decimal("1.25")
-            rest_day_multiplier = Decimal("1.30")
-        policy = _P()
+        policy = _FallbackPolicy()
 
     # derive hourly rate from base salary and standard days
-    schedule = getattr(getattr(employee, "branch", None), "work_schedule", None)
-    if schedule is None:
-        schedule = SimpleNamespace(
-            time_in=dt_time(9, 0),
-            time_out=dt_time(18, 0),
-            min_hours_required=Decimal("8.00"),
-            break_hours=Decimal("1.00"),
-            get_work_days=lambda: {0, 1, 2, 3, 4},  # Mon–Fri
-            grace_minutes=(getattr(policy, "grace_minutes", 0) if policy else 0),
-        )
+    schedule = schedule_for(employee, policy)
     # expected daily hours based on schedule; fallback to 8
-    if schedule and schedule.time_in and schedule.time_out is not None:
-        # build a fake date just to measure span
-        exp_in = datetime.combine(start, schedule.time_in)
-        exp_out = datetime.combine(start, schedule.time_out)
-        if exp_out <= exp_in:
-            exp_out += timedelta(days=1)
-        expected_daily_hours = _to_hours(exp_out - exp_in) - Decimal(getattr(schedule, "break_hours", 0) or 0)
-        if expected_daily_hours <= 0:
-            expected_daily_hours = Decimal("8")
-    else:
+    expected_daily_hours = schedule.expected_daily_hours
+    if expected_daily_hours <= 0:
         expected_daily_hours = Decimal("8")
 
     working_days = Decimal(str(getattr(policy, "standard_working_days", Decimal("22"))))
@@ -213,74 +199,34 @@ def compute_time_based_components(
 
     hourly_rate = _q2(Decimal(base_salary) / (working_days * expected_daily_hours))
 
-    logs = (
-        TimeLog.objects
-        .select_related("holiday", "employee__branch__business")
-        .filter(employee=employee, date__gte=start, date__lte=end)
-        .order_by("date")
-    )
+    # Re-analyze only logs that changed since their attendance row was computed
+    ensure_attendance(employee, start, end)
+    facts = attendance_facts(employee, start, end)
+    sixty = Decimal("60")
 
-    totals = defaultdict(lambda: Decimal("0.00"))
+    ot_mult = Decimal(str(getattr(policy, "ot_multiplier", Decimal("1.25"))))
+    # premium (extra) portion over normal rate
+    rest_extra = Decimal(str(getattr(policy, "rest_day_multiplier", Decimal("1.30")))) - Decimal("1")
+    late_rate = Decimal(str(getattr(policy, "late_penalty_per_minute", 0)))
+    undertime_rate = Decimal(str(getattr(policy, "undertime_penalty_per_minute", 0)))
 
-    for log in logs:
-        analyzed = analyze_timelog(log, schedule) or []
-
-        # derive worked hours for premiums (holiday/rest day)
-        worked_hours = _worked_hours_for_log(log, Decimal(getattr(schedule, "break_hours", 0) or 0))
-
-        # 1) premiums inferred from the log (holiday/rest-day)
-        if log.holiday_id and worked_hours > 0:
-            # premium is the extra above normal pay (multiplier - 1)
-            mult_extra = Decimal(str(log.holiday.multiplier)) - Decimal("1")
-            if mult_extra > 0:
-                amt = _q2(worked_hours * hourly_rate * mult_extra)
-                totals["HOLIDAY_PREMIUM"] += amt
-
-        # 2) analyzer-emitted items (OT, REST_OT, LATE, UNDERTIME, ABSENT)
-        for entry in analyzed:
-            raw_code = entry.get("code")
-            comp_code = CODE_MAP.get(raw_code, raw_code)
-
-            hours = Decimal(str(entry.get("hours", 0) or 0))
-            minutes = Decimal(str(entry.get("minutes", 0) or 0))
-
-            if comp_code == "OT":
-                ot_mult = Decimal(str(getattr(policy, "ot_multiplier", Decimal("1.25"))))
-                amt = _q2(hours * hourly_rate * ot_mult)
-                totals[comp_code] += amt
-
-            elif comp_code == "REST_OT":
-                # premium (extra) portion over normal rate
-                rest_extra = Decimal(str(getattr(policy, "rest_day_multiplier", Decimal("1.30")))) - Decimal("1")
-                if rest_extra > 0 and hours > 0:
-                    amt = _q2(hours * hourly_rate * rest_extra)
-                    totals[comp_code] += amt
-
-            elif comp_code == "LATE":
-                rate = Decimal(str(getattr(policy, "late_penalty_per_minute", 0)))
-                if minutes > 0 and rate > 0:
-                    amt = _q2(minutes * rate)   # minutes already net of grace
-                    totals[comp_code] += amt
-
-            elif comp_code == "UNDERTIME":
-                rate = Decimal(str(getattr(policy, "undertime_penalty_per_minute", 0)))
-                if minutes > 0 and rate > 0:
-                    amt = _q2(minutes * rate)
-                    totals[comp_code] += amt
-
-            elif comp_code == "ABSENT":
-                per_day = Decimal(str(getattr(policy, "absent_penalty_per_day", 0)))
-                # treat one ABSENT entry per log-date as 1 day; if you prefer fractional, convert hours/expected_daily_hours
-                days = Decimal("1") if hours > 0 else Decimal("0")
-                if days > 0 and per_day > 0:
-                    amt = _q2(days * per_day)
-                    totals[comp_code] += amt
-
-            else:
-                # unknown -> treat hours as simple earning at base hourly (safe fallback)
-                if hours > 0:
-                    amt = _q2(hours * hourly_rate)
-                    totals[comp_code] += amt
+    totals = defaultdict(lambda: Decimal("0.00"))
+    for f in facts:
+        # premium is the extra above normal pay (multiplier - 1), already folded into the minutes
+        totals["HOLIDAY_PREMIUM"] += _q2(f["holiday_premium_minutes"] / sixty * hourly_rate)
+        totals["OT"] += _q2(f["ot_minutes"] / sixty * hourly_rate * ot_mult)
+        if rest_extra > 0:
+            totals["REST_OT"] += _q2(f["rest_ot_minutes"] / sixty * hourly_rate * rest_extra)
+        if late_rate > 0:
+            totals["LATE"] += _q2(f["late_minutes"] * late_rate)   # minutes already net of grace
+        if undertime_rate > 0:
+            totals["UNDERTIME"] += _q2(f["undertime_minutes"] * undertime_rate)
+
+    per_day = Decimal(str(getattr(policy, "absent_penalty_per_day", 0)))
+    # one ABSENT per log-date counts as 1 day, plus scheduled workdays with no log at all
+    if per_day > 0:
+        absent_days = sum(1 for f in facts if f["is_absent"]) + len(missing_workdays(employee, start, end, schedule))
+        totals["ABSENT"] = _q2(absent_days * per_day)
 
     # build final rows
     rows: list[dict] = []
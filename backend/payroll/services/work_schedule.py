@@ -0,0 +1,161 @@
+# payroll/services/work_schedule.py
+"""
+Compiled work schedules.
+
+A WorkSchedulePolicy is stored as strings and Decimals (`regular_work_days` is
+a CSV, hours are Decimals, times are `time`s). `compile_schedule` turns one into
+an immutable CompiledSchedule once: a weekday bitmask, minutes-of-day integers
+and the expected day length / grace precomputed, so the analyzer's per-log work
+is a bit test and integer arithmetic.
+
+`schedule_for_branch(branch_id)` keeps one compiled schedule per branch in
+process. Branches without a WorkSchedulePolicy get the 9–6 Mon–Fri default
+with the business PayrollPolicy grace. Saving a WorkSchedulePolicy,
+PayrollPolicy or Branch invalidates the cache (payroll.signals): here at once,
+in every other worker through the WORK_SCHEDULES cache version
+(payroll.services.cache_versions).
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import time
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from organization.models import Branch
+from payroll.services import cache_versions
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_WORK_DAYS = (0, 1, 2, 3, 4)  # Mon–Fri
+
+_lock = threading.Lock()
+_branches: Dict[int, Tuple[int, "CompiledSchedule"]] = {}  # branch id -> (cache version, schedule)
+_generation = 0  # bumped by invalidate()
+
+
+@dataclass(frozen=True)
+class CompiledSchedule:
+    branch_id: Optional[int]
+    work_day_mask: int              # bit n set = weekday n (0=Mon) is a workday
+    time_in: time
+    time_out: time
+    start_minute: int               # minutes after midnight
+    span_minutes: int               # time_in -> time_out, overnight-aware
+    break_hours: Decimal
+    min_hours_required: Decimal
+    grace_minutes: int
+    expected_daily_hours: Decimal   # span - break, 0.01 h
+    expected_minutes: Decimal       # expected_daily_hours in minutes
+
+    @property
+    def end_minute(self) -> int:
+        """Minutes after the start day's midnight; > 1440 for overnight shifts."""
+        return self.start_minute + self.span_minutes
+
+    def is_work_day(self, weekday: int) -> bool:
+        return bool(self.work_day_mask >> weekday & 1)
+
+    def get_work_days(self) -> FrozenSet[int]:
+        return frozenset(d for d in range(7) if self.is_work_day(d))
+
+
+def _minute_of_day(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def work_day_mask(days) -> int:
+    mask = 0
+    for d in days:
+        mask |= 1 << d
+    return mask
+
+
+def compile_schedule(policy=None, grace_minutes: int = 0, branch_id: Optional[int] = None) -> CompiledSchedule:
+    """
+    Compile a WorkSchedulePolicy (or anything with the same attributes); None
+    gives the 9–6 Mon–Fri default with `grace_minutes`.
+    """
+    if policy is None:
+        time_in, time_out = time(9, 0), time(18, 0)
+        break_hours, min_hours = Decimal("1.00"), Decimal("8.00")
+        days = DEFAULT_WORK_DAYS
+    else:
+        time_in, time_out = policy.time_in, policy.time_out
+        break_hours = Decimal(str(getattr(policy, "break_hours", "1.00") or "0"))
+        min_hours = Decimal(str(getattr(policy, "min_hours_required", "8.00") or "8.00"))
+        days = policy.get_work_days() if hasattr(policy, "get_work_days") else DEFAULT_WORK_DAYS
+        grace = getattr(policy, "grace_minutes", None)
+        if grace is not None:
+            grace_minutes = grace
+
+    start = _minute_of_day(time_in)
+    span = (_minute_of_day(time_out) - start) % MINUTES_PER_DAY or MINUTES_PER_DAY  # out <= in: next day
+    hours = (Decimal(span) / Decimal(60)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    expected = hours - break_hours
+    return CompiledSchedule(
+        branch_id=branch_id,
+        work_day_mask=work_day_mask(days),
+        time_in=time_in,
+        time_out=time_out,
+        start_minute=start,
+        span_minutes=span,
+        break_hours=break_hours,
+        min_hours_required=min_hours,
+        grace_minutes=int(grace_minutes or 0),
+        expected_daily_hours=expected,
+        expected_minutes=expected * 60,
+    )
+
+
+def _load(branch_id: int) -> CompiledSchedule:
+    branch = (
+        Branch.objects
+        .select_related("work_schedule", "business__payroll_policy")
+        .filter(pk=branch_id)
+        .first()
+    )
+    policy = getattr(branch, "work_schedule", None) if branch else None
+    payroll_policy = getattr(branch.business, "payroll_policy", None) if branch else None
+    return compile_schedule(policy, getattr(payroll_policy, "grace_minutes", 0), branch_id)
+
+
+def schedule_for_branch(branch_id: Optional[int]) -> CompiledSchedule:
+    """The branch's compiled schedule (the default one for None); at most one query when cold."""
+    if branch_id is None:
+        return compile_schedule(None)
+    version = cache_versions.current(cache_versions.WORK_SCHEDULES)
+    with _lock:
+        cached = _branches.get(branch_id)
+        generation = _generation
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    schedule = _load(branch_id)
+    with _lock:
+        # an invalidate() while we were loading means this result may already be stale
+        if generation == _generation:
+            _branches[branch_id] = (version, schedule)
+    return schedule
+
+
+def schedule_for(employee, policy=None) -> CompiledSchedule:
+    """The compiled schedule of the employee's branch; `policy` only supplies grace when there is no branch."""
+    branch_id = getattr(employee, "branch_id", None)
+    if branch_id is None:
+        return compile_schedule(None, getattr(policy, "grace_minutes", 0) if policy else 0)
+    return schedule_for_branch(branch_id)
+
+
+def invalidate(branch_id: Optional[int] = None) -> None:
+    """
+    Forget one branch's schedule, or every branch's. Other processes only see
+    that a schedule changed, so they reload every branch.
+    """
+    global _generation
+    with _lock:
+        if branch_id is None:
+            _branches.clear()
+        else:
+            _branches.pop(branch_id, None)
+        _generation += 1
+    cache_versions.bump(cache_versions.WORK_SCHEDULES)
@@ -0,0 +1,163 @@
+# payroll/signals.py
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from employees.models import Employee
+from organization.models import Branch, WorkSchedulePolicy
+from payroll.models import (
+    ContributionBracket, ContributionTable, PayrollInputChange, PayrollPolicy, SalaryComponent, SalaryRate,
+    SalaryStructure,
+)
+from payroll.services.contribution_tables import invalidate as invalidate_contribution_tables
+from payroll.services.attendance import (
+    LOG_RELATED, invalidate_attendance, refresh_attendance, refresh_attendance_for_keys,
+)
+from payroll.services.position_structure import invalidate as invalidate_position_structure
+from payroll.services.retro import record_input_change, record_timelog_changes
+from payroll.services.work_schedule import invalidate as invalidate_schedules
+from timekeeping.models import Holiday, TimeLog
+from timekeeping.signals import holidays_written, timelogs_written
+
+
+@receiver(post_save, sender=ContributionTable)
+@receiver(post_delete, sender=ContributionTable)
+@receiver(post_save, sender=ContributionBracket)
+@receiver(post_delete, sender=ContributionBracket)
+def invalidate_contributions(sender, instance, **kwargs):
+    invalidate_contribution_tables()
+
+
+@receiver(post_save, sender=SalaryStructure)
+@receiver(post_delete, sender=SalaryStructure)
+def invalidate_structure_for_position(sender, instance, created=False, **kwargs):
+    # an edited row may have moved from another position
+    invalidate_position_structure(instance.position_id if created else None)
+
+
+@receiver(post_save, sender=SalaryComponent)
+@receiver(post_delete, sender=SalaryComponent)
+def invalidate_structures_for_component(sender, instance, **kwargs):
+    # code / type changes alter every position that uses the component
+    invalidate_position_structure()
+
+
+# ─────────────────────────────────────────────────────────
+# Compiled work schedule cache
+# ─────────────────────────────────────────────────────────
+@receiver(post_save, sender=WorkSchedulePolicy)
+@receiver(post_delete, sender=WorkSchedulePolicy)
+def invalidate_branch_schedule(sender, instance, **kwargs):
+    invalidate_schedules(instance.branch_id)
+
+
+@receiver(post_save, sender=Branch)
+@receiver(post_delete, sender=Branch)
+def invalidate_schedule_for_branch(sender, instance, **kwargs):
+    invalidate_schedules(instance.pk)
+
+
+@receiver(post_save, sender=PayrollPolicy)
+@receiver(post_delete, sender=PayrollPolicy)
+def invalidate_business_schedules(sender, instance, **kwargs):
+    # default schedules take their grace from the business policy
+    invalidate_schedules()
+
+
+# ─────────────────────────────────────────────────────────
+# DailyAttendance upkeep
+# ─────────────────────────────────────────────────────────
+@receiver(post_save, sender=TimeLog)
+def refresh_attendance_for_log(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_attendance(TimeLog.objects.select_related(*LOG_RELATED).filter(pk=instance.pk))
+
+
+@receiver(timelogs_written)
+def refresh_attendance_for_written_logs(sender, keys, **kwargs):
+    refresh_attendance_for_keys(keys)
+
+
+@receiver(post_save, sender=WorkSchedulePolicy)
+@receiver(post_delete, sender=WorkSchedulePolicy)
+def drop_attendance_for_schedule(sender, instance, **kwargs):
+    invalidate_attendance(employee__branch_id=instance.branch_id)
+
+
+@receiver(post_save, sender=PayrollPolicy)
+@receiver(post_delete, sender=PayrollPolicy)
+def drop_attendance_for_policy(sender, instance, **kwargs):
+    # grace minutes change lateness
+    invalidate_attendance(employee__branch__business_id=instance.business_id)
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def drop_attendance_for_holiday(sender, instance, **kwargs):
+    # the holiday's (new) date, plus wherever it applied before a date change
+    on_date = Q(date=instance.date)
+    if instance.branch_id:
+        on_date &= Q(employee__branch_id=instance.branch_id)
+    invalidate_attendance(on_date | Q(holiday_id=instance.pk))
+
+
+@receiver(pre_save, sender=Employee)
+def remember_previous_branch(sender, instance, raw=False, **kwargs):
+    instance._previous_branch_id = None
+    if instance.pk and not raw:
+        instance._previous_branch_id = (
+            Employee.objects.filter(pk=instance.pk).values_list("branch_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Employee)
+def drop_attendance_for_branch_move(sender, instance, created, raw=False, **kwargs):
+    # facts were analyzed with the old branch's schedule and local holidays
+    if created or raw:
+        return
+    if getattr(instance, "_previous_branch_id", None) != instance.branch_id:
+        invalidate_attendance(employee_id=instance.pk)
+
+
+@receiver(holidays_written)
+def drop_attendance_for_written_holidays(sender, dates, **kwargs):
+    # seeded holidays are nationwide
+    invalidate_attendance(date__in=dates)
+
+
+# ─────────────────────────────────────────────────────────
+# Input change index (retro adjustments)
+# ─────────────────────────────────────────────────────────
+@receiver(pre_save, sender=SalaryRate)
+def remember_previous_rate_period(sender, instance, raw=False, **kwargs):
+    # an edit that moves the period also affects the days it no longer covers
+    instance._previous_period = None
+    if instance.pk and not raw:
+        instance._previous_period = (
+            SalaryRate.objects.filter(pk=instance.pk).values_list("employee_id", "start_date", "end_date").first()
+        )
+
+
+@receiver(post_save, sender=SalaryRate)
+@receiver(post_delete, sender=SalaryRate)
+def record_salary_rate_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    record_input_change(instance.employee_id, PayrollInputChange.SALARY_RATE, instance.start_date, instance.end_date)
+    previous = getattr(instance, "_previous_period", None)
+    if previous and previous != (instance.employee_id, instance.start_date, instance.end_date):
+        record_input_change(previous[0], PayrollInputChange.SALARY_RATE, previous[1], previous[2])
+
+
+@receiver(post_save, sender=TimeLog)
+@receiver(post_delete, sender=TimeLog)
+def record_timelog_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    record_input_change(instance.employee_id, PayrollInputChange.TIMELOG, instance.date, instance.date)
+
+
+@receiver(timelogs_written)
+def record_written_timelogs(sender, keys, **kwargs):
+    record_timelog_changes(keys)
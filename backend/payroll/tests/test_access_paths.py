@@ -0,0 +1,98 @@
+# payroll/tests/test_access_paths.py
+"""Access-path regression tests: every hot query must be served by an index."""
+from datetime import date
+
+from django.db import connection, transaction
+from django.test import TestCase
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from payroll.models import PayrollCycle, PayrollRecord, PayrollRun, SalaryRate
+from timekeeping.models import TimeLog
+
+
+class AccessPathIndexTests(TestCase):
+    """
+    Runs EXPLAIN for the queries the engine, summaries and importer issue and
+    asserts the planner picks an index. On PostgreSQL sequential scans are
+    disabled for the check, since tiny test tables would otherwise always be
+    scanned; a query with no usable index still falls back to a Seq Scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = Business.objects.create(name="Index Co")
+        cls.branch = Branch.objects.create(business=cls.business, name="Main")
+        cls.employee = Employee.objects.create(
+            first_name="Ana", last_name="Cruz", hire_date=date(2024, 1, 1), branch=cls.branch
+        )
+        cls.cycle = PayrollCycle.objects.create(
+            business=cls.business, name="Monthly", cycle_type="MONTHLY", start_day=1, end_day=31
+        )
+        cls.payroll_run = PayrollRun.objects.create(
+            business=cls.business, month=date(2025, 8, 1), payroll_cycle=cls.cycle
+        )
+
+    def _plan(self, qs) -> str:
+        if connection.vendor == "postgresql":
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                return qs.explain()
+        return qs.explain()
+
+    def assertUsesIndex(self, qs, table: str, sorted_by_index: bool = False):
+        plan = self._plan(qs)
+        if connection.vendor == "postgresql":
+            self.assertNotIn(f"Seq Scan on {table}", plan, plan)
+            self.assertIn("Index", plan, plan)
+            if sorted_by_index:
+                self.assertNotRegex(plan, r"(?m)^\s*(->\s*)?Sort\s+\(", plan)
+        elif connection.vendor == "sqlite":
+            lines = [ln for ln in plan.splitlines() if table in ln]
+            self.assertTrue(lines, plan)
+            for ln in lines:
+                self.assertIn("USING", ln, plan)
+            if sorted_by_index:
+                self.assertNotIn("TEMP B-TREE", plan, plan)
+        else:
+            self.skipTest(f"No plan assertions for {connection.vendor}")
+
+    # ---- timekeeping ----
+    def test_timelog_cutoff_by_employee(self):
+        qs = TimeLog.objects.filter(employee=self.employee, date__range=(date(2025, 8, 1), date(2025, 8, 15)))
+        self.assertUsesIndex(qs, "timekeeping_timelog")
+
+    def test_timelog_range_across_employees(self):
+        qs = TimeLog.objects.filter(date__range=(date(2025, 8, 1), date(2025, 8, 31)))
+        self.assertUsesIndex(qs, "timekeeping_timelog")
+
+    def test_timelog_importer_key_lookup(self):
+        qs = TimeLog.objects.filter(employee_id__in=[self.employee.id], date__in=[date(2025, 8, 1)])
+        self.assertUsesIndex(qs, "timekeeping_timelog")
+
+    # ---- payroll records ----
+    def test_records_by_run(self):
+        qs = PayrollRecord.objects.filter(run=self.payroll_run)
+        self.assertUsesIndex(qs, "payroll_payrollrecord")
+
+    def test_records_for_payslip(self):
+        qs = PayrollRecord.objects.filter(employee=self.employee, month=date(2025, 8, 1), is_13th_month=False)
+        self.assertUsesIndex(qs, "payroll_payrollrecord")
+
+    def test_records_for_cycle_month(self):
+        qs = PayrollRecord.objects.filter(month=date(2025, 8, 1), payroll_cycle=self.cycle)
+        self.assertUsesIndex(qs, "payroll_payrollrecord")
+
+    def test_records_keyset_page(self):
+        qs = PayrollRecord.objects.filter(month__gte=date(2025, 8, 1)).order_by("month", "id")[:100]
+        self.assertUsesIndex(qs, "payroll_payrollrecord", sorted_by_index=True)
+
+    # ---- salary rates ----
+    def test_salary_rate_for_month(self):
+        qs = (
+            SalaryRate.objects
+            .filter(employee=self.employee, start_date__lte=date(2025, 8, 1))
+            .order_by("-start_date")[:1]
+        )
+        self.assertUsesIndex(qs, "payroll_salaryrate", sorted_by_index=True)
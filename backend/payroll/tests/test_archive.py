@@ -0,0 +1,147 @@
+# payroll/tests/test_archive.py
+"""Cold archive: archived years are still readable through payslip/register."""
+import gzip
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from payroll.models import (
+    PayrollArchive, PayrollCycle, PayrollInputChange, PayrollRecord, PayrollRun, SalaryComponent,
+)
+from payroll.services.archive import archivable_years, archive_year, archived_payroll_rows, archived_run_rows
+from payroll.services.payslip_snapshot import get_employee_payslip_snapshot
+from timekeeping.models import DailyAttendance, TimeLog
+
+
+class ColdArchiveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = Business.objects.create(name="Archive Co")
+        cls.branch = Branch.objects.create(business=cls.business, name="Main")
+        cls.employee = Employee.objects.create(
+            first_name="Ben", last_name="Reyes", hire_date=date(2020, 1, 1), branch=cls.branch
+        )
+        cls.cycle = PayrollCycle.objects.create(
+            business=cls.business, name="Monthly", cycle_type="MONTHLY", start_day=1, end_day=31
+        )
+        basic = SalaryComponent.objects.create(name="Basic Pay", code="BASIC", component_type="EARNING")
+        sss = SalaryComponent.objects.create(name="SSS", code="SSS", component_type="DEDUCTION")
+        cls.old_run = PayrollRun.objects.create(
+            business=cls.business, month=date(2022, 3, 1), payroll_cycle=cls.cycle
+        )
+        for comp, amount in ((basic, "20000.00"), (sss, "900.00")):
+            PayrollRecord.objects.create(
+                employee=cls.employee, month=date(2022, 3, 1), component=comp, amount=Decimal(amount),
+                payroll_cycle=cls.cycle, run=cls.old_run,
+            )
+        TimeLog.objects.create(employee=cls.employee, date=date(2022, 3, 2), ot_hours=Decimal("1.50"))
+        cls.user = get_user_model().objects.create_user(username="auditor", password="x")
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        override = override_settings(PAYROLL_ARCHIVE_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_archive_moves_rows_out_of_hot_tables(self):
+        self.assertEqual(archivable_years(self.business, horizon_years=2, today=date(2024, 1, 1)), [2022])
+        self.assertEqual(archivable_years(self.business, horizon_years=2, today=date(2023, 6, 1)), [])
+
+        result = archive_year(self.business, 2022)
+
+        self.assertEqual((result["records"], result["timelogs"]), (2, 1))
+        self.assertFalse(PayrollRecord.objects.filter(run=self.old_run).exists())
+        self.assertFalse(TimeLog.objects.filter(employee=self.employee).exists())
+        self.old_run.refresh_from_db()
+        self.assertEqual(self.old_run.status, "ARCHIVED")
+        archive = PayrollArchive.objects.get(business=self.business, year=2022)
+        self.assertEqual((archive.run_count, archive.record_count, archive.timelog_count), (1, 2, 1))
+
+    def test_snapshot_and_endpoints_read_from_archive(self):
+        before = get_employee_payslip_snapshot(self.employee.id, "2022-03")
+        archive_year(self.business, 2022)
+        after = get_employee_payslip_snapshot(self.employee.id, "2022-03")
+
+        self.assertEqual(after["totals"], before["totals"])
+        self.assertEqual(after["rows"], before["rows"])
+        self.assertEqual(after["payroll_cycle"], "MONTHLY")
+
+        client = self.client
+        params = {"employee_id": self.employee.id, "month": "2022-03"}
+        preview = client.get("/api/payslip/", params)
+        self.assertEqual(preview.status_code, 200, preview.content)
+        self.assertEqual(Decimal(str(preview.data["net_pay"])), Decimal("19100.00"))
+        self.assertEqual(len(preview.data["components"]), 2)
+
+        register = client.get("/api/summary/", {**params, "run": self.old_run.id})
+        self.assertEqual(register.status_code, 200, register.content)
+        self.assertEqual(Decimal(str(register.data["net_pay"])), Decimal("19100.00"))
+
+    def test_run_summary_and_records_count_read_from_archive(self):
+        before = self.client.get(f"/api/payroll-runs/{self.old_run.id}/summary/").data
+        self.assertEqual(self.client.get(f"/api/payroll-runs/{self.old_run.id}/").data["records_count"], 2)
+        archive_year(self.business, 2022)
+
+        summary = self.client.get(f"/api/payroll-runs/{self.old_run.id}/summary/")
+        self.assertEqual(summary.status_code, 200, summary.content)
+        self.assertEqual(summary.data["counts"], {"records": 2})
+        self.assertEqual(summary.data["totals"], before["totals"])
+        self.assertEqual(summary.data["totals"]["net"], "19100.00")
+
+        run = self.client.get(f"/api/payroll-runs/{self.old_run.id}/").data
+        self.assertEqual((run["status"], run["records_count"]), ("ARCHIVED", 2))
+
+    def test_archived_year_is_parsed_once_until_it_grows(self):
+        archive_year(self.business, 2022)
+        with mock.patch("payroll.services.archive.gzip.open", wraps=gzip.open) as opened:
+            for _ in range(3):
+                rows = archived_payroll_rows(self.business.id, self.employee.id, date(2022, 3, 1))
+                self.assertEqual(len(rows), 2)
+            self.assertEqual(len(archived_run_rows(self.old_run)), 2)
+            self.assertEqual(opened.call_count, 1)
+
+            # A late run appended to the archived year is picked up on the next read
+            late = PayrollRun.objects.create(business=self.business, month=date(2022, 5, 1), payroll_cycle=self.cycle)
+            PayrollRecord.objects.create(
+                employee=self.employee, month=date(2022, 5, 1), component=SalaryComponent.objects.get(code="BASIC"),
+                amount=Decimal("20000.00"), payroll_cycle=self.cycle, run=late,
+            )
+            archive_year(self.business, 2022)
+            opened.reset_mock()
+            self.assertEqual(len(archived_payroll_rows(self.business.id, self.employee.id, date(2022, 5, 1))), 1)
+            self.assertEqual(len(archived_payroll_rows(self.business.id, self.employee.id, date(2022, 3, 1))), 2)
+            self.assertEqual(opened.call_count, 1)
+
+    def test_missing_month_still_404s(self):
+        archive_year(self.business, 2022)
+        response = self.client.get("/api/payslip/", {"employee_id": self.employee.id, "month": "2022-04"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_archive_keeps_logs_of_unpaid_days_and_records_no_input_changes(self):
+        TimeLog.objects.create(employee=self.employee, date=date(2022, 4, 4), ot_hours=Decimal("1.00"))  # no run yet
+        PayrollRun.objects.create(business=self.business, month=date(2022, 5, 1), payroll_cycle=self.cycle, status="PENDING")
+        TimeLog.objects.create(employee=self.employee, date=date(2022, 5, 3), ot_hours=Decimal("2.00"))
+        self.assertTrue(DailyAttendance.objects.filter(date=date(2022, 3, 2)).exists())
+        changes = PayrollInputChange.objects.count()
+
+        result = archive_year(self.business, 2022)
+
+        self.assertEqual(result["timelogs"], 1)
+        self.assertEqual(
+            sorted(TimeLog.objects.filter(employee=self.employee).values_list("date", flat=True)),
+            [date(2022, 4, 4), date(2022, 5, 3)],
+        )
+        self.assertFalse(DailyAttendance.objects.filter(date=date(2022, 3, 2)).exists())
+        self.assertEqual(PayrollInputChange.objects.count(), changes)
@@ -0,0 +1,138 @@
+# payroll/tests/test_attendance.py
+"""Per-day attendance facts and their cutoff sums."""
+from datetime import date, time
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from employees.models import Employee
+from organization.models import Branch, Business, WorkSchedulePolicy
+from payroll.models import PayrollInputChange, PayrollPolicy
+from payroll.services.attendance import (
+    attendance_totals, blank_timelogs, expected_workdays, missing_workdays, prune_blank_timelogs,
+)
+from payroll.services.time_analysis import compute_time_based_components
+from payroll.services.work_schedule import invalidate as invalidate_schedules
+from timekeeping.models import DailyAttendance, Holiday, TimeLog
+from timekeeping.services.holiday_calendar import invalidate as invalidate_holiday_calendar
+
+
+class DailyAttendanceTests(TestCase):
+    """TimeLogs are analyzed once into DailyAttendance; a cutoff sums the facts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = Business.objects.create(name="Facts Co")
+        cls.branch = Branch.objects.create(business=cls.business, name="Main")
+        cls.employee = Employee.objects.create(
+            first_name="Dee", last_name="Lim", hire_date=date(2024, 1, 1), branch=cls.branch
+        )
+        cls.policy = PayrollPolicy.objects.create(
+            business=cls.business, late_penalty_per_minute=Decimal("2"), absent_penalty_per_day=Decimal("500"),
+        )
+
+    def setUp(self):
+        invalidate_holiday_calendar()
+        self.addCleanup(invalidate_holiday_calendar)
+        self.addCleanup(invalidate_schedules)  # a test's schedule is rolled back without signals
+        # Mon: 30 min late, Tue: no punches, Sat: rest day worked
+        self.late = TimeLog.objects.create(employee=self.employee, date=date(2025, 8, 4), time_in=time(9, 30), time_out=time(18))
+        TimeLog.objects.create(employee=self.employee, date=date(2025, 8, 5), is_absent=True)
+        TimeLog.objects.create(employee=self.employee, date=date(2025, 8, 9), time_in=time(9), time_out=time(18))
+
+    def _amounts(self):
+        rows = compute_time_based_components(self.employee, date(2025, 8, 4), date(2025, 8, 9), Decimal("17600"), self.policy)
+        return {r["component"].code: r["amount"] for r in rows}
+
+    def test_facts_follow_timelog_writes(self):
+        fact = DailyAttendance.objects.get(timelog=self.late)
+        self.assertEqual((fact.late_minutes, fact.is_rest_day), (Decimal("30.00"), False))
+        self.assertTrue(DailyAttendance.objects.get(date=date(2025, 8, 5)).is_absent)
+        self.assertEqual(DailyAttendance.objects.get(date=date(2025, 8, 9)).rest_ot_minutes, Decimal("480.00"))
+
+        self.late.time_in = time(9, 10)
+        self.late.save()
+        self.assertEqual(DailyAttendance.objects.get(timelog=self.late).late_minutes, Decimal("10.00"))
+
+    def test_cutoff_sums_facts_without_reanalyzing(self):
+        with CaptureQueriesContext(connection) as ctx:
+            amounts = self._amounts()
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "timekeeping_dailyattendance"')])
+        # 100/h: late 30 x 2, 30 short x 2, Tue blank + Wed-Fri unlogged absent, 8h rest day x 100 x 0.30
+        self.assertEqual(amounts, {
+            "LATE": Decimal("60.00"), "UNDERTIME": Decimal("60.00"),
+            "ABSENT": Decimal("2000.00"), "REST_OT": Decimal("240.00"),
+        })
+
+        totals = attendance_totals(self.employee, date(2025, 8, 1), date(2025, 8, 15))
+        self.assertEqual((totals["late_minutes"], totals["absent_days"]), (Decimal("30.00"), 1))
+
+    def test_amounts_are_rounded_per_day_then_summed(self):
+        # 20000 / (22 x 8h) -> 113.64/h; half an hour of OT on each of Mon-Wed
+        for day in (11, 12, 13):
+            TimeLog.objects.create(employee=self.employee, date=date(2025, 8, day), time_in=time(9), time_out=time(18, 30))
+        rows = compute_time_based_components(self.employee, date(2025, 8, 11), date(2025, 8, 13), Decimal("20000"), self.policy)
+        # 3 x round(0.5 x 113.64 x 1.25 = 71.025) = 3 x 71.03, not round(213.075) = 213.08
+        self.assertEqual({r["component"].code: r["amount"] for r in rows}, {"OT": Decimal("213.09")})
+
+    def test_rule_changes_drop_and_rebuild_facts(self):
+        WorkSchedulePolicy.objects.create(branch=self.branch, time_in=time(9, 30), time_out=time(18, 30))
+        self.assertFalse(DailyAttendance.objects.filter(employee=self.employee).exists())
+        self.assertNotIn("LATE", self._amounts())
+        self.assertEqual(DailyAttendance.objects.filter(employee=self.employee).count(), 3)
+
+        Holiday.objects.create(name="Ninoy Aquino Day", date=date(2025, 8, 5), type=Holiday.SPECIAL)
+        self.assertFalse(DailyAttendance.objects.filter(date=date(2025, 8, 5)).exists())
+        self.assertEqual(self._amounts()["ABSENT"], Decimal("1500.00"))
+        fact = DailyAttendance.objects.get(date=date(2025, 8, 5))
+        self.assertEqual((fact.is_holiday, fact.is_absent), (True, False))
+
+    def test_branch_move_drops_and_rebuilds_facts(self):
+        night = Branch.objects.create(business=self.business, name="Night")
+        WorkSchedulePolicy.objects.create(branch=night, time_in=time(9, 30), time_out=time(18, 30))
+        self.assertEqual(DailyAttendance.objects.filter(employee=self.employee).count(), 3)
+
+        self.employee.first_name = "Dee Dee"
+        self.employee.save()  # same branch: facts stay
+        self.assertEqual(DailyAttendance.objects.filter(employee=self.employee).count(), 3)
+
+        self.employee.branch = night
+        self.employee.save()
+        self.assertFalse(DailyAttendance.objects.filter(employee=self.employee).exists())
+        self.assertNotIn("LATE", self._amounts())  # rebuilt with the 9:30 schedule
+
+    def test_unlogged_workdays_are_absent(self):
+        # Blank absent rows on workdays add nothing the calendar does not already know
+        self.assertEqual(list(blank_timelogs().values_list("date", flat=True)), [date(2025, 8, 5)])
+        self.assertEqual(prune_blank_timelogs(dry_run=True), 1)
+        changes = PayrollInputChange.objects.count()
+        self.assertEqual(prune_blank_timelogs(), 1)
+        self.assertEqual(PayrollInputChange.objects.count(), changes)
+        self.assertFalse(DailyAttendance.objects.filter(date=date(2025, 8, 5)).exists())
+        self.assertEqual(self._amounts()["ABSENT"], Decimal("2000.00"))
+
+        Holiday.objects.create(name="Ninoy Aquino Day", date=date(2025, 8, 25), type=Holiday.SPECIAL)
+        self.employee.hire_date = date(2025, 8, 6)
+        # weekdays Wed 6 .. Fri 29 minus the holiday; the logged Mon 4 / Sat 9 are not in it
+        expected = expected_workdays(self.employee, date(2025, 8, 1), date(2025, 8, 31))
+        self.assertEqual((min(expected), len(expected)), (date(2025, 8, 6), 17))
+        missing = missing_workdays(self.employee, date(2025, 8, 1), date(2025, 8, 31))
+        self.assertEqual(missing, expected)
+        self.assertNotIn(date(2025, 8, 25), missing)
+        self.assertFalse(expected_workdays(self.employee, date(2099, 1, 1), date(2099, 1, 31)))  # not yet
+
+    def test_prune_keeps_rows_the_calendar_would_not_derive(self):
+        TimeLog.objects.create(employee=self.employee, date=date(2025, 8, 6), is_rest_day=True)   # swapped rest day
+        TimeLog.objects.create(employee=self.employee, date=date(2025, 8, 7))                     # not marked absent
+        TimeLog.objects.create(employee=self.employee, date=date(2025, 8, 10), is_absent=True)    # Sunday
+        TimeLog.objects.create(employee=self.employee, date=date(2023, 12, 29), is_absent=True)   # before hire
+        Holiday.objects.create(name="Ninoy Aquino Day", date=date(2025, 8, 25), type=Holiday.SPECIAL)
+        TimeLog.objects.create(employee=self.employee, date=date(2025, 8, 25), is_absent=True)
+
+        self.assertEqual(prune_blank_timelogs(batch_size=2), 1)
+        self.assertEqual(
+            sorted(TimeLog.objects.filter(time_in__isnull=True).values_list("date", flat=True)),
+            [date(2023, 12, 29), date(2025, 8, 6), date(2025, 8, 7), date(2025, 8, 10), date(2025, 8, 25)],
+        )
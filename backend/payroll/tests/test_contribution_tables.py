@@ -0,0 +1,76 @@
+# payroll/tests/test_contribution_tables.py
+"""Dated contribution tables."""
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import F
+from django.test import TestCase
+
+from payroll.models import CacheVersion, ContributionBracket, ContributionTable
+from payroll.services.cache_versions import CONTRIBUTION_TABLES, snapshot
+from payroll.services.contribution_tables import (
+    builtin_tables, contributions_on, invalidate as invalidate_contribution_tables, seed_contribution_tables,
+)
+from payroll.services.mandatories import compute_mandatories_monthly
+
+
+class ContributionTableTests(TestCase):
+    """Government schedules come from dated DB tables, looked up by bisect; PHRates fills the gaps."""
+
+    def setUp(self):
+        invalidate_contribution_tables()
+        self.addCleanup(invalidate_contribution_tables)
+
+    def test_empty_database_uses_builtin_rates(self):
+        self.assertEqual(compute_mandatories_monthly(Decimal("25000.00"), on=date(2025, 3, 1)), {
+            "SSS_EE": Decimal("1125.00"), "PHIC_EE": Decimal("625.00"),
+            "HDMF_EE": Decimal("100.00"), "TAX_WHT": Decimal("463.40"),  # 20% of (23,150 - 20,833)
+        })
+        self.assertIs(contributions_on(date(2025, 3, 1)).sss.effective_from, None)
+
+    def test_seeded_tables_by_effective_date(self):
+        self.assertEqual(seed_contribution_tables()["created"], 4)
+        self.assertEqual(seed_contribution_tables()["kept"], 4)
+
+        rates = contributions_on(date(2025, 3, 1))
+        sss = rates.sss
+        self.assertEqual(len(sss.bounds), 61)
+        for base, share in (("3000", "250.00"), ("5249.99", "250.00"), ("5250", "275.00"),
+                             ("20000", "1000.00"), ("34750", "1750.00"), ("90000", "1750.00")):
+            self.assertEqual(sss.amount(Decimal(base)), Decimal(share), base)
+        self.assertEqual(rates.pagibig.amount(Decimal("1500.00")), Decimal("15.00"))
+        self.assertEqual(rates.pagibig.amount(Decimal("1500.01")), Decimal("30.00"))
+        self.assertEqual(rates.pagibig.amount(Decimal("50000")), Decimal("200.00"))
+        self.assertEqual(rates.philhealth.amount(Decimal("150000")), Decimal("2500.00"))
+        self.assertEqual(rates.withholding_tax.amount(Decimal("40000")), Decimal("3208.40"))  # 1,875 + 20% of 6,667
+
+        # Before the stored versions took effect the built-in values still apply
+        old = contributions_on(date(2022, 6, 1))
+        self.assertEqual(old.withholding_tax, builtin_tables()["TAX"])
+        self.assertEqual(contributions_on(date(2024, 6, 1)).pagibig.effective_from, date(2024, 2, 1))
+
+        with snapshot():
+            contributions_on(date(2025, 3, 1))  # reads the cache version once
+            with self.assertNumQueries(0):
+                contributions_on(date(2025, 3, 1))
+
+    def test_new_version_needs_no_deploy(self):
+        seed_contribution_tables()
+        self.assertEqual(compute_mandatories_monthly(Decimal("20000"), on=date(2026, 1, 1))["SSS_EE"], Decimal("1000.00"))
+        table = ContributionTable.objects.create(kind=ContributionTable.SSS, effective_from=date(2026, 1, 1))
+        ContributionBracket.objects.create(table=table, lower_bound=0, rate=Decimal("0.06"))
+        self.assertEqual(compute_mandatories_monthly(Decimal("20000"), on=date(2026, 1, 1))["SSS_EE"], Decimal("1200.00"))
+        self.assertEqual(compute_mandatories_monthly(Decimal("20000"), on=date(2025, 12, 1))["SSS_EE"], Decimal("1000.00"))
+
+    def test_other_process_changes_reload_by_version(self):
+        seed_contribution_tables()
+        self.assertEqual(compute_mandatories_monthly(Decimal("20000"), on=date(2025, 3, 1))["SSS_EE"], Decimal("1000.00"))
+        # another worker rewrites the brackets: no signal reaches this process, only its version bump
+        table = ContributionTable.objects.get(kind=ContributionTable.SSS, effective_from__lte=date(2025, 3, 1))
+        ContributionBracket.objects.filter(table=table).update(fixed_amount=0, rate=Decimal("0.06"), excess_over=0)
+        with snapshot():
+            self.assertEqual(compute_mandatories_monthly(Decimal("20000"), on=date(2025, 3, 1))["SSS_EE"], Decimal("1000.00"))
+            CacheVersion.objects.filter(key=CONTRIBUTION_TABLES).update(version=F("version") + 1)
+            # a run keeps the versions it started with
+            self.assertEqual(compute_mandatories_monthly(Decimal("20000"), on=date(2025, 3, 1))["SSS_EE"], Decimal("1000.00"))
+        self.assertEqual(compute_mandatories_monthly(Decimal("20000"), on=date(2025, 3, 1))["SSS_EE"], Decimal("1200.00"))
@@ -0,0 +1,84 @@
+# payroll/tests/test_mandatories.py
+"""Vectorized mandatory contributions for a whole run."""
+import random
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from payroll.models import (
+    PayrollCycle, PayrollPolicy, PayrollRecord, SalaryComponent, SalaryRate, SalaryStructure,
+)
+from payroll.services.contribution_tables import (
+    invalidate as invalidate_contribution_tables, seed_contribution_tables,
+)
+from payroll.services.mandatories import (
+    allocate_to_cycle, compute_mandatories_batch, compute_mandatories_monthly,
+)
+from payroll.services.payroll_engine import generate_batch_payroll
+from payroll.services.position_structure import invalidate as invalidate_position_structure
+from positions.models import Position
+
+
+class MandatoriesBatchTests(TestCase):
+    """The vectorized batch matches the scalar computation to the centavo."""
+
+    def setUp(self):
+        invalidate_contribution_tables()
+        self.addCleanup(invalidate_contribution_tables)
+        self.addCleanup(invalidate_position_structure)
+
+    def _assert_matches_scalar(self, grosses, on):
+        batch = compute_mandatories_batch(grosses, on=on)
+        for i, gross in enumerate(grosses):
+            scalar = compute_mandatories_monthly(gross, on=on)
+            self.assertEqual({code: values[i] for code, values in batch.items()}, scalar, gross)
+
+    def test_matches_scalar(self):
+        rng = random.Random(42)
+        grosses = [Decimal(rng.randint(0, 30_000_000)) / 100 for _ in range(2000)]
+        grosses += [Decimal(v) for v in ("0", "1500.00", "1500.01", "4000", "20833.00", "20833.01", "80000", "666667.00")]
+        self._assert_matches_scalar(grosses, date(2025, 3, 1))   # built-in rates
+        seed_contribution_tables()
+        self._assert_matches_scalar(grosses, date(2025, 3, 1))   # stored 2025 tables
+        self.assertEqual(compute_mandatories_batch([]), {"SSS_EE": [], "PHIC_EE": [], "HDMF_EE": [], "TAX_WHT": []})
+
+    def test_sub_centavo_inputs_take_scalar_path(self):
+        with mock.patch("payroll.services.mandatories.mandatories_centavos") as vector:
+            self._assert_matches_scalar([Decimal("25000.005"), Decimal("31000.25")], date(2025, 3, 1))
+        vector.assert_not_called()
+
+    @override_settings(PAYROLL_USE_MANDATORIES=True)
+    def test_batch_engine_computes_mandatories_once(self):
+        business = Business.objects.create(name="Batch Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        PayrollPolicy.objects.create(business=business)
+        PayrollCycle.objects.create(business=business, name="1st half", cycle_type="SEMI_1", start_day=1, end_day=15)
+        position = Position.objects.create(name="Batch Clerk")
+        basic = SalaryComponent.objects.create(name="Basic", code="BASIC", component_type=SalaryComponent.EARNING)
+        SalaryStructure.objects.create(position=position, component=basic, amount=Decimal("100"), is_percentage=True)
+        for code in ("SSS_EE", "PHIC_EE", "HDMF_EE", "TAX_WHT"):
+            SalaryComponent.objects.create(name=code, code=code, component_type=SalaryComponent.DEDUCTION)
+        salaries = [Decimal("18000"), Decimal("35250.50"), Decimal("120000")]
+        employees = []
+        for i, amount in enumerate(salaries):
+            e = Employee.objects.create(first_name=f"B{i}", last_name="Atch", hire_date=date(2024, 1, 1), branch=branch, position=position)
+            SalaryRate.objects.create(employee=e, amount=Decimal("1"), start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+            SalaryRate.objects.create(employee=e, amount=amount, start_date=date(2025, 1, 1))
+            employees.append(e)
+
+        month = date(2025, 3, 1)
+        with mock.patch("payroll.services.payroll_engine.compute_mandatories_batch", wraps=compute_mandatories_batch) as batch, \
+                mock.patch("payroll.services.payroll_engine.compute_mandatories_monthly") as scalar:
+            results = generate_batch_payroll(month, "SEMI_1", [e.id for e in employees])
+        self.assertEqual(batch.call_count, 1)
+        scalar.assert_not_called()
+        self.assertEqual({r["status"] for r in results}, {"success"})
+
+        for e, amount in zip(employees, salaries):
+            expected = allocate_to_cycle(compute_mandatories_monthly(amount, on=month), "SEMI_1")
+            stored = dict(PayrollRecord.objects.filter(employee=e, component__code__in=expected).values_list("component__code", "amount"))
+            self.assertEqual(stored, expected)
@@ -0,0 +1,115 @@
+# payroll/tests/test_partitions.py
+"""Month partitions of PayrollRecord (PostgreSQL with PAYROLL_PARTITION_RECORDS)."""
+from datetime import date
+from unittest import mock, skipUnless
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+
+from employees.models import Employee
+from organization.models import Business
+from payroll.models import PayrollCycle, PayrollRecord, PayrollRun, SalaryComponent
+from payroll.services import partitions
+from payroll.services.partitions import (
+    drop_month_partition_if_empty, ensure_month_partition, is_partitioned, partitioning_enabled, upcoming_months,
+)
+
+
+class _FakeCursor:
+    """Answers the catalog lookups ensure_month_partition makes: partitioned parent, missing month."""
+
+    def __init__(self):
+        self.sql = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.sql.append(sql)
+
+    def fetchone(self):
+        return (None,) if self.sql[-1].startswith("SELECT to_regclass") else (1,)
+
+
+@override_settings(PAYROLL_PARTITION_RECORDS=True)
+class MonthPartitionBookkeepingTests(TestCase):
+    """Runs on every backend: the DDL goes to a fake PostgreSQL cursor."""
+
+    def setUp(self):
+        self.cursor = _FakeCursor()
+        fake = mock.Mock(vendor="postgresql", cursor=lambda: self.cursor)
+        fake.ops.quote_name = lambda name: f'"{name}"'
+        patcher = mock.patch.object(partitions, "connection", fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(partitions._known_months.clear)
+
+    def test_month_is_known_only_once_committed(self):
+        with transaction.atomic():
+            self.assertTrue(ensure_month_partition(date(2031, 2, 14)))
+            transaction.set_rollback(True)
+        self.assertNotIn(date(2031, 2, 1), partitions._known_months)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(ensure_month_partition(date(2031, 2, 14)))
+        self.assertIn(date(2031, 2, 1), partitions._known_months)
+        self.assertIn('CREATE TABLE "payroll_payrollrecord_y2031m02"', "\n".join(self.cursor.sql))
+
+        self.cursor.sql.clear()
+        self.assertFalse(ensure_month_partition(date(2031, 2, 1)))
+        self.assertEqual(self.cursor.sql, [])
+
+    def test_creating_a_run_runs_no_ddl(self):
+        business = Business.objects.create(name="Partition Co")
+        cycle = PayrollCycle.objects.create(business=business, name="Monthly", cycle_type="MONTHLY", start_day=1, end_day=31)
+        PayrollRun.objects.create(business=business, month=date(2031, 3, 1), payroll_cycle=cycle)
+        self.assertEqual(self.cursor.sql, [])
+
+    def test_upcoming_months(self):
+        self.assertEqual(
+            upcoming_months(2, today=date(2031, 11, 20)),
+            [date(2031, 11, 1), date(2031, 12, 1), date(2032, 1, 1)],
+        )
+
+
+@skipUnless(partitioning_enabled(), "PayrollRecord partitioning is PostgreSQL-only and off")
+class MonthPartitionTests(TestCase):
+
+    def test_drop_leaves_other_deferred_constraints_deferred(self):
+        self.assertTrue(is_partitioned())
+        ensure_month_partition(date(2031, 1, 1))
+        with transaction.atomic():
+            with connection.cursor() as cur:
+                # deferred FK violation elsewhere in the caller's transaction
+                cur.execute(
+                    "INSERT INTO timekeeping_timelog (employee_id, date, ot_hours, late_minutes, undertime_minutes,"
+                    " is_rest_day, is_absent, import_hash) VALUES (987654, '2031-01-02', 0, 0, 0, false, false, '')"
+                )
+            self.assertTrue(drop_month_partition_if_empty(date(2031, 1, 1)))
+            with self.assertRaises(IntegrityError), connection.cursor() as cur:
+                cur.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            transaction.set_rollback(True)
+
+    def test_upcoming_partitions_also_drain_default(self):
+        business = Business.objects.create(name="Drain Co")
+        cycle = PayrollCycle.objects.create(business=business, name="Monthly", cycle_type="MONTHLY", start_day=1, end_day=31)
+        employee = Employee.objects.create(first_name="Di", last_name="Ng", hire_date=date(2030, 1, 1))
+        component = SalaryComponent.objects.create(name="Basic", code="BASIC", component_type=SalaryComponent.EARNING)
+        record = PayrollRecord.objects.create(
+            employee=employee, month=date(2032, 5, 1), component=component, amount=1, payroll_cycle=cycle,
+        )
+        with connection.cursor() as cur:
+            cur.execute(f"SELECT count(*) FROM {partitions.DEFAULT_PARTITION} WHERE id = %s", [record.pk])
+            self.assertEqual(cur.fetchone()[0], 1)
+
+        self.assertGreaterEqual(partitions.ensure_upcoming_partitions(1, today=date(2033, 1, 1)), 3)
+        with connection.cursor() as cur:
+            cur.execute(f"SELECT count(*) FROM {partitions.partition_name(date(2032, 5, 1))} WHERE id = %s", [record.pk])
+            self.assertEqual(cur.fetchone()[0], 1)
+            for month in (date(2033, 1, 1), date(2033, 2, 1)):
+                cur.execute("SELECT to_regclass(%s)", [partitions.partition_name(month)])
+                self.assertIsNotNone(cur.fetchone()[0])
+
@@ -0,0 +1,81 @@
+# payroll/tests/test_position_structure.py
+"""Compiled salary structures per position."""
+from decimal import Decimal
+
+from django.db.models import F
+from django.test import TestCase
+
+from payroll.models import CacheVersion, SalaryComponent, SalaryStructure
+from payroll.services.cache_versions import POSITION_STRUCTURES, snapshot
+from payroll.services.helpers import compute_regular_monthly_gross
+from payroll.services.position_structure import (
+    invalidate as invalidate_position_structure, structure_for, structures_for,
+)
+from positions.models import Position
+
+
+class PositionStructureTests(TestCase):
+    """A position's SalaryStructure is compiled once; pricing a salary needs no query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.position = Position.objects.create(name="Structured Clerk")
+        cls.other = Position.objects.create(name="Bare Clerk")
+        cls.basic = SalaryComponent.objects.create(name="Basic", code="BASIC", component_type=SalaryComponent.EARNING)
+        cls.allowance = SalaryComponent.objects.create(name="Rice", code="RICE", component_type=SalaryComponent.EARNING)
+        cls.loan = SalaryComponent.objects.create(name="Loan", code="LOAN", component_type=SalaryComponent.DEDUCTION)
+        cls.cola = SalaryComponent.objects.create(name="COLA", code="COLA", component_type=SalaryComponent.EARNING)
+        SalaryStructure.objects.create(position=cls.position, component=cls.basic, amount=Decimal("100"), is_percentage=True)
+        SalaryStructure.objects.create(position=cls.position, component=cls.cola, amount=Decimal("2.50"), is_percentage=True)
+        SalaryStructure.objects.create(position=cls.position, component=cls.allowance, amount=Decimal("1500"))
+        SalaryStructure.objects.create(position=cls.position, component=cls.loan, amount=Decimal("800"))
+
+    def setUp(self):
+        invalidate_position_structure()
+        self.addCleanup(invalidate_position_structure)
+
+    def test_evaluates_without_queries(self):
+        with snapshot():
+            structure = structure_for(self.position.pk)
+            self.assertEqual(len(structure.fixed), 2)
+            self.assertEqual(len(structure.percentage), 2)
+            with self.assertNumQueries(0):
+                gross = compute_regular_monthly_gross(self.position, Decimal("20000.33"))
+                lines = {c.code: a for c, a in structure_for(self.position.pk).lines(Decimal("20000.33"), exclude={"LOAN"})}
+        # 20000.33 + 2.5% (500.00825) + 1500; the loan is a deduction
+        self.assertEqual(gross, Decimal("22000.34"))
+        self.assertEqual(lines, {"BASIC": Decimal("20000.33"), "COLA": Decimal("500.01"), "RICE": Decimal("1500.00")})
+
+    def test_many_positions_load_in_one_query(self):
+        with snapshot():
+            with self.assertNumQueries(2):  # the cache version, then every structure
+                found = structures_for([self.position.pk, self.other.pk])
+            self.assertEqual(found[self.other.pk].regular_gross(Decimal("30000")), Decimal("0.00"))
+            with self.assertNumQueries(0):
+                structures_for([self.position.pk, self.other.pk])
+        with self.assertNumQueries(1):  # outside a run: only the version check
+            structures_for([self.position.pk, self.other.pk])
+
+    def test_other_process_changes_reload_by_version(self):
+        self.assertEqual(structure_for(self.position.pk).regular_gross(Decimal("10000")), Decimal("11750.00"))
+        # another worker's write: no signal here, only its version bump
+        SalaryStructure.objects.filter(position=self.position, component=self.allowance).update(amount=Decimal("2000"))
+        self.assertEqual(structure_for(self.position.pk).regular_gross(Decimal("10000")), Decimal("11750.00"))
+        CacheVersion.objects.filter(key=POSITION_STRUCTURES).update(version=F("version") + 1)
+        self.assertEqual(structure_for(self.position.pk).regular_gross(Decimal("10000")), Decimal("12250.00"))
+
+    def test_structure_changes_invalidate(self):
+        self.assertEqual(structure_for(self.other.pk).regular_gross(Decimal("10000")), Decimal("0.00"))
+        bonus = SalaryComponent.objects.create(name="Bonus", code="BONUS", component_type=SalaryComponent.EARNING)
+        row = SalaryStructure.objects.create(position=self.other, component=bonus, amount=Decimal("250"))
+        self.assertEqual(structure_for(self.other.pk).regular_gross(Decimal("10000")), Decimal("250.00"))
+
+        self.assertEqual(structure_for(self.position.pk).regular_gross(Decimal("10000")), Decimal("11750.00"))
+        row.position = self.position
+        row.save()  # moved away: both positions change
+        self.assertEqual(structure_for(self.other.pk).regular_gross(Decimal("10000")), Decimal("0.00"))
+        self.assertEqual(structure_for(self.position.pk).regular_gross(Decimal("10000")), Decimal("12000.00"))
+
+        self.cola.component_type = SalaryComponent.DEDUCTION
+        self.cola.save()
+        self.assertEqual(structure_for(self.position.pk).regular_gross(Decimal("10000")), Decimal("11750.00"))
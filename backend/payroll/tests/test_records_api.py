@@ -0,0 +1,113 @@
+# payroll/tests/test_records_api.py
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from payroll.models import PayrollCycle, PayrollRecord, PayrollRun, SalaryComponent
+
+
+class PayrollRecordApiTests(TestCase):
+    """GET /api/records/: keyset pages, cursors, ?fields= and PayrollRecordFilter."""
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Records Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        cls.ana = Employee.objects.create(first_name="Ana", last_name="Cruz", hire_date=date(2020, 1, 1), branch=branch)
+        cls.ben = Employee.objects.create(first_name="Ben", last_name="Lim", hire_date=date(2020, 1, 1), branch=branch)
+        cls.monthly = PayrollCycle.objects.create(
+            business=business, name="Monthly", cycle_type="MONTHLY", start_day=1, end_day=31
+        )
+        cls.semi = PayrollCycle.objects.create(
+            business=business, name="1st Half", cycle_type="SEMI_1", start_day=1, end_day=15
+        )
+        cls.basic = SalaryComponent.objects.create(name="Basic Pay", code="BASIC", component_type="EARNING")
+        cls.sss = SalaryComponent.objects.create(name="SSS", code="SSS", component_type="DEDUCTION")
+        cls.march = PayrollRun.objects.create(business=business, month=date(2024, 3, 1), payroll_cycle=cls.monthly)
+
+        # Created out of month order, so (month, id) differs from insertion order
+        for month in (date(2024, 3, 1), date(2024, 1, 1), date(2024, 2, 1)):
+            for employee in (cls.ana, cls.ben):
+                for component, amount in ((cls.basic, "20000.00"), (cls.sss, "900.00")):
+                    PayrollRecord.objects.create(
+                        employee=employee, month=month, component=component, amount=Decimal(amount),
+                        payroll_cycle=cls.monthly, run=cls.march if month.month == 3 else None,
+                    )
+        PayrollRecord.objects.create(
+            employee=cls.ana, month=date(2024, 1, 1), component=cls.basic, amount=Decimal("10000.00"),
+            payroll_cycle=cls.semi,
+        )
+        PayrollRecord.objects.create(
+            employee=cls.ana, month=date(2024, 12, 1), component=cls.basic, amount=Decimal("20000.00"),
+            payroll_cycle=cls.monthly, is_13th_month=True,
+        )
+        cls.user = get_user_model().objects.create_user(username="records", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _ids(self, params=None):
+        response = self.client.get("/api/records/", params or {})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_next_walks_every_record_once_in_month_id_order(self):
+        expected = list(PayrollRecord.objects.order_by("month", "id").values_list("id", flat=True))
+        seen, url, pages = [], "/api/records/?page_size=5", 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 5)
+            seen += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+            pages += 1
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)  # 14 records: 5 + 5 + 4
+
+    def test_last_page_has_no_next(self):
+        response = self.client.get("/api/records/", {"page_size": PayrollRecord.objects.count()})
+        self.assertIsNone(response.data["next"])
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ("not-base64!", "WzFd", "WyJub3QtYS1kYXRlIiwgMV0="):  # garbage, [1], ["not-a-date", 1]
+            response = self.client.get("/api/records/", {"cursor": cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_fields_limits_the_serialized_keys(self):
+        response = self.client.get("/api/records/", {"fields": "id,amount", "page_size": 3})
+        self.assertEqual(response.status_code, 200)
+        for row in response.data["results"]:
+            self.assertEqual(set(row), {"id", "amount"})
+
+        full = self.client.get("/api/records/", {"page_size": 1}).data["results"][0]
+        self.assertIn("employee_name", full)
+        self.assertIn("component_name", full)
+
+    def test_filters(self):
+        def by(**kw):
+            return set(PayrollRecord.objects.filter(**kw).values_list("id", flat=True))
+
+        self.assertEqual(set(self._ids({"run": self.march.id})), by(run=self.march))
+        self.assertEqual(set(self._ids({"employee": self.ben.id})), by(employee=self.ben))
+        self.assertEqual(set(self._ids({"month": "2024-02"})), by(month=date(2024, 2, 1)))
+        self.assertEqual(set(self._ids({"month": "2024-02-14"})), by(month=date(2024, 2, 1)))
+        self.assertEqual(self._ids({"month": "February"}), [])
+        self.assertEqual(set(self._ids({"cycle": self.semi.id})), by(payroll_cycle=self.semi))
+        self.assertEqual(set(self._ids({"cycle_type": "semi_1"})), by(payroll_cycle=self.semi))
+        self.assertEqual(set(self._ids({"component": self.sss.id})), by(component=self.sss))
+        self.assertEqual(set(self._ids({"is_13th_month": "true"})), by(is_13th_month=True))
+
+    def test_filters_combine_with_the_cursor(self):
+        first = self.client.get("/api/records/", {"employee": self.ana.id, "page_size": 4})
+        second = self.client.get(first.data["next"])
+        ids = [row["id"] for row in first.data["results"] + second.data["results"]]
+        expected = list(
+            PayrollRecord.objects.filter(employee=self.ana).order_by("month", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
@@ -0,0 +1,217 @@
+# payroll/tests/test_retro.py
+"""Retroactive adjustments for corrections to paid runs."""
+from datetime import date, time
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from payroll.models import (
+    PayrollCycle, PayrollInputChange, PayrollRecord, PayrollRun, RetroAdjustment, SalaryComponent, SalaryRate,
+    SalaryStructure,
+)
+from payroll.services.payroll_engine import generate_batch_payroll
+from payroll.services.position_structure import invalidate as invalidate_position_structure
+from payroll.services.retro import RETRO_CODE, apply_retro, retry_failed_changes, simulate_run
+from payroll.services.work_schedule import invalidate as invalidate_schedules
+from positions.models import Position
+from timekeeping.models import TimeLog
+from timekeeping.signals import timelogs_written
+from timekeeping.services.holiday_calendar import invalidate as invalidate_holiday_calendar
+
+
+class RetroAdjustmentTests(TestCase):
+    """Corrections to paid periods are recomputed per employee-cycle and posted into the next open run."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = Business.objects.create(name="Retro Co")
+        branch = Branch.objects.create(business=cls.business, name="Main")
+        cycle = PayrollCycle.objects.create(business=cls.business, name="Month", cycle_type="MONTHLY", start_day=1, end_day=31)
+        position = Position.objects.create(name="Retro Clerk")
+        basic = SalaryComponent.objects.create(name="Basic", code="BASIC", component_type=SalaryComponent.EARNING)
+        SalaryStructure.objects.create(position=position, component=basic, amount=Decimal("100"), is_percentage=True)
+        cls.ana, cls.ben = [
+            Employee.objects.create(first_name=n, last_name="Retro", hire_date=date(2024, 1, 1), branch=branch, position=position)
+            for n in ("Ana", "Ben")
+        ]
+        cls.rate = SalaryRate.objects.create(employee=cls.ana, start_date=date(2024, 1, 1), amount=Decimal("20000"))
+        SalaryRate.objects.create(employee=cls.ben, start_date=date(2024, 1, 1), amount=Decimal("30000"))
+        cls.july = PayrollRun.objects.create(business=cls.business, month=date(2025, 7, 1), payroll_cycle=cycle)
+        cls.august = PayrollRun.objects.create(business=cls.business, month=date(2025, 8, 1), payroll_cycle=cycle, status="PENDING")
+
+    def setUp(self):
+        for invalidate in (invalidate_holiday_calendar, invalidate_schedules, invalidate_position_structure):
+            invalidate()
+            self.addCleanup(invalidate)
+        generate_batch_payroll(date(2025, 7, 1), "MONTHLY", [self.ana.pk, self.ben.pk], run=self.july)
+        self.july.paid_at = timezone.now()
+        self.july.save()
+        apply_retro()  # the setup's own changes: recomputing them changes nothing
+
+    def test_setup_changes_post_nothing(self):
+        self.assertFalse(RetroAdjustment.objects.exists())
+        self.assertFalse(PayrollInputChange.objects.filter(processed_at__isnull=True).exists())
+
+    def test_rate_correction_posts_difference_into_next_open_run(self):
+        # a raise effective July 16 was entered after July was paid
+        self.rate.end_date = date(2025, 7, 15)
+        self.rate.save()
+        SalaryRate.objects.create(employee=self.ana, start_date=date(2025, 7, 16), amount=Decimal("22000"))
+
+        result = apply_retro()
+        self.assertEqual(result.recomputed, 1)  # Ana's July only, not Ben
+        # July 2025: 11 of 23 workdays at 20000, 12 at 22000 -> 21043.48
+        self.assertEqual(result.adjustments, [{
+            "employee_id": self.ana.pk, "source_run_id": self.july.pk, "target_run_id": self.august.pk,
+            "amount": "1043.48", "detail": {"BASIC": "1043.48"},
+        }])
+        retro = PayrollRecord.objects.get(employee=self.ana, component__code=RETRO_CODE)
+        self.assertEqual((retro.run, retro.month, retro.amount), (self.august, date(2025, 8, 1), Decimal("1043.48")))
+        self.assertEqual(  # the paid run itself is untouched
+            PayrollRecord.objects.get(employee=self.ana, run=self.july, component__code="BASIC").amount, Decimal("20000.00")
+        )
+
+        # already adjusted: a new unrelated change recomputes July again but posts nothing
+        TimeLog.objects.create(employee=self.ana, date=date(2025, 6, 30))
+        self.rate.save()
+        self.assertEqual(apply_retro().adjustments, [])
+        self.assertEqual(RetroAdjustment.objects.count(), 1)
+
+    def test_generated_but_unpaid_run_is_not_adjusted(self):
+        self.july.paid_at = None
+        self.july.save()
+        self.rate.amount = Decimal("21000")
+        self.rate.save()
+        # regenerating the unpaid run picks the change up itself
+        generate_batch_payroll(date(2025, 7, 1), "MONTHLY", [self.ana.pk], run=self.july)
+
+        result = apply_retro()
+        self.assertEqual((result.recomputed, result.adjustments), (0, []))
+        self.assertFalse(RetroAdjustment.objects.exists())
+        self.assertEqual(
+            PayrollRecord.objects.get(employee=self.ana, run=self.july, component__code="BASIC").amount, Decimal("21000.00")
+        )
+
+    def test_paid_run_is_locked_against_regeneration(self):
+        with self.assertRaisesMessage(ValueError, "is paid"):
+            generate_batch_payroll(date(2025, 7, 1), "MONTHLY", [self.ana.pk], run=self.july)
+
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username="retro", password="x"))
+        response = client.post("/api/batch/", {
+            "employee_ids": [self.ana.pk], "month": "2025-07", "cycle_type": "MONTHLY", "run_id": self.july.pk,
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.july.refresh_from_db()
+        self.assertEqual(self.july.status, "COMPLETED")
+
+        self.assertEqual(client.post(f"/api/payroll-runs/{self.august.pk}/mark-paid/").status_code, 400)  # PENDING
+        self.august.status = "COMPLETED"
+        self.august.save()
+        response = client.post(f"/api/payroll-runs/{self.august.pk}/mark-paid/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data["paid_at"])
+
+    def test_rules_changed_since_payment_are_not_adjusted(self):
+        # after July was paid the position got a fixed allowance
+        allowance = SalaryComponent.objects.create(name="Rice", code="RICE", component_type=SalaryComponent.EARNING)
+        SalaryStructure.objects.create(position=self.ana.position, component=allowance, amount=Decimal("1500"))
+
+        # a July time log of Ben's recomputes his cycle but changes no time-based pay
+        TimeLog.objects.create(employee=self.ben, date=date(2025, 7, 7), time_in=time(8, 0), time_out=time(17, 0))
+        result = apply_retro()
+        self.assertEqual((result.recomputed, result.adjustments), (1, []))
+
+        # Ana's raise adjusts BASIC only, not the allowance July never paid
+        self.rate.end_date = date(2025, 7, 15)
+        self.rate.save()
+        SalaryRate.objects.create(employee=self.ana, start_date=date(2025, 7, 16), amount=Decimal("22000"))
+        result = apply_retro()
+        self.assertEqual([a["detail"] for a in result.adjustments], [{"BASIC": "1043.48"}])
+
+    def test_only_inputs_of_paid_periods_are_indexed(self):
+        PayrollInputChange.objects.all().delete()
+        TimeLog.objects.create(employee=self.ana, date=date(2025, 6, 30))   # before any paid run
+        TimeLog.objects.create(employee=self.ana, date=date(2025, 8, 4))    # August is still open
+        timelogs_written.send(sender=TimeLog, keys=[(self.ben.pk, date(2025, 8, 5)), (self.ben.pk, date(2025, 7, 31))])
+        cy = Employee.objects.create(first_name="Cy", last_name="Retro", hire_date=date(2025, 8, 1), branch=self.ana.branch)
+        SalaryRate.objects.create(employee=cy, start_date=date(2025, 8, 16), amount=Decimal("31000"))
+        self.assertEqual(
+            list(PayrollInputChange.objects.values_list("employee_id", "kind", "date_from", "date_to")),
+            [(self.ben.pk, PayrollInputChange.TIMELOG, date(2025, 7, 31), date(2025, 7, 31))],
+        )
+
+        # a rate reaching back into July is
+        SalaryRate.objects.create(employee=cy, start_date=date(2025, 7, 20), end_date=date(2025, 8, 15), amount=Decimal("30500"))
+        self.assertEqual(PayrollInputChange.objects.filter(kind=PayrollInputChange.SALARY_RATE).count(), 1)
+
+    def test_simulation_writes_no_records(self):
+        before = list(PayrollRecord.objects.order_by("id").values_list("id", "amount"))
+        self.rate.amount = Decimal("25000")
+        self.rate.save()
+        simulated = simulate_run(self.july, [self.ana.pk])
+        self.assertEqual(list(PayrollRecord.objects.order_by("id").values_list("id", "amount")), before)
+        basic = [line for line in simulated[self.ana.pk]["records_generated"] if line["code"] == "BASIC"]
+        self.assertEqual((basic[0]["amount"], basic[0]["record_id"]), ("25000.00", None))
+
+    def test_without_open_run_changes_stay_pending(self):
+        self.august.status = "COMPLETED"
+        self.august.save()
+        self.rate.amount = Decimal("21000")
+        self.rate.save()
+
+        out = StringIO()
+        call_command("apply_retro_adjustments", "--dry-run", stdout=out)
+        self.assertIn("0 adjustments would be posted", out.getvalue())
+
+        result = apply_retro()
+        self.assertEqual([u["reason"] for u in result.unresolved], ["no open run"])
+        self.assertTrue(PayrollInputChange.objects.filter(employee=self.ana, processed_at__isnull=True).exists())
+        self.assertFalse(RetroAdjustment.objects.exists())
+
+    def test_explicit_target_only_takes_earlier_runs(self):
+        june = PayrollRun.objects.create(
+            business=self.business, month=date(2025, 6, 1), payroll_cycle=self.july.payroll_cycle, status="PENDING"
+        )
+        self.rate.amount = Decimal("21000")
+        self.rate.save()
+
+        result = apply_retro(target_run=june)
+        self.assertEqual(result.adjustments, [])
+        self.assertEqual([u["reason"] for u in result.unresolved], [f"not before target run {june.pk}"])
+        self.assertTrue(PayrollInputChange.objects.filter(employee=self.ana, processed_at__isnull=True).exists())
+
+        result = apply_retro(target_run=self.august)
+        self.assertEqual([(a["source_run_id"], a["target_run_id"]) for a in result.adjustments], [(self.july.pk, self.august.pk)])
+        self.assertFalse(PayrollInputChange.objects.filter(processed_at__isnull=True).exists())
+
+    def test_recompute_error_is_reported_once_and_does_not_block(self):
+        cycle = self.july.payroll_cycle
+        cycle.is_active = False
+        cycle.save()
+        self.rate.amount = Decimal("21000")
+        self.rate.save()
+
+        result = apply_retro()
+        self.assertEqual(len(result.unresolved), 1)
+        self.assertEqual(result.unresolved[0]["run_id"], self.july.pk)
+        self.assertEqual(result.processed, 1)
+        failed = PayrollInputChange.objects.get(kind=PayrollInputChange.SALARY_RATE, processed_at__isnull=False, error__gt="")
+        self.assertIn(f"run {self.july.pk}:", failed.error)
+
+        result = apply_retro()  # nothing left to retry or report
+        self.assertEqual((result.changes, result.unresolved), (0, []))
+
+        cycle.is_active = True
+        cycle.save()
+        self.assertEqual(retry_failed_changes(), 1)
+        result = apply_retro()
+        self.assertEqual([a["amount"] for a in result.adjustments], ["1000.00"])
+        self.assertFalse(PayrollInputChange.objects.filter(processed_at__isnull=True).exists())
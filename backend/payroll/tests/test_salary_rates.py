@@ -0,0 +1,226 @@
+# payroll/tests/test_salary_rates.py
+"""SalaryRate lookups and cutoff pro-rating."""
+import csv
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from payroll.models import PayrollCycle, PayrollRecord, SalaryComponent, SalaryRate, SalaryStructure
+from payroll.serializers import SalaryRateSerializer
+from payroll.services.payroll_engine import generate_batch_payroll
+from payroll.services.position_structure import invalidate as invalidate_position_structure
+from payroll.services.salary_rates import (
+    RateSegment, SalaryResolver, cutoff_salaries, get_salary_for_month, overlapping_rates, resolved_periods,
+)
+from payroll.services.work_schedule import invalidate as invalidate_schedules
+from positions.models import Position
+from timekeeping.services.holiday_calendar import invalidate as invalidate_holiday_calendar
+
+
+class SalaryResolverTests(TestCase):
+    """Rates of many employees load in one query and resolve by bisect; periods may not overlap."""
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Rates Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        cls.employee = Employee.objects.create(first_name="Rae", last_name="Tes", hire_date=date(2023, 1, 1), branch=branch)
+        cls.other = Employee.objects.create(first_name="Oth", last_name="Er", hire_date=date(2023, 1, 1), branch=branch)
+        for start, end, amount in [
+            (date(2023, 1, 1), date(2023, 12, 31), "20000"),
+            (date(2024, 3, 1), date(2024, 12, 31), "22000"),  # Jan–Feb 2024 uncovered
+            (date(2025, 1, 1), None, "25000"),
+        ]:
+            SalaryRate.objects.create(employee=cls.employee, start_date=start, end_date=end, amount=Decimal(amount))
+        SalaryRate.objects.create(employee=cls.other, start_date=date(2024, 6, 1), amount=Decimal("30000"))
+
+    def test_matches_single_lookup(self):
+        with self.assertNumQueries(1):
+            resolver = SalaryResolver.for_employees([self.employee, self.other.pk])
+        days = [date(2022, 12, 31), date(2023, 1, 1), date(2023, 12, 31), date(2024, 1, 15), date(2024, 3, 1),
+                date(2024, 6, 1), date(2024, 12, 31), date(2025, 1, 1), date(2030, 5, 1)]
+        with self.assertNumQueries(0):
+            resolved = {(e.pk, d): resolver.amount_on(e.pk, d) for e in (self.employee, self.other) for d in days}
+        for (employee_id, day), amount in resolved.items():
+            try:
+                expected = get_salary_for_month(employee_id, day)
+            except ValueError:
+                expected = None
+            self.assertEqual(amount, expected, (employee_id, day))
+        self.assertIsNone(resolver.amount_on(999999, date(2025, 1, 1)))
+
+    def test_serializer_rejects_overlap(self):
+        data = {"employee": self.employee.pk, "amount": "21000", "start_date": "2024-01-01", "end_date": "2024-03-01"}
+        serializer = SalaryRateSerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("Overlaps the rate from 2024-03-01", str(serializer.errors))
+
+        data["end_date"] = "2024-02-29"  # fills the gap exactly
+        self.assertTrue(SalaryRateSerializer(data=data).is_valid())
+
+        rate = SalaryRate.objects.get(employee=self.employee, start_date=date(2025, 1, 1))
+        self.assertTrue(SalaryRateSerializer(rate, data={"amount": "26000"}, partial=True).is_valid())
+
+    def test_database_rejects_overlap_on_postgresql(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("exclusion constraint is PostgreSQL only")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            SalaryRate.objects.create(employee=self.employee, start_date=date(2025, 6, 1), amount=Decimal("1"))
+        # another employee's period is independent
+        SalaryRate.objects.create(employee=self.other, start_date=date(2023, 1, 1), end_date=date(2024, 5, 31), amount=Decimal("1"))
+
+
+class ProratedSalaryTests(TestCase):
+    """A cutoff is paid per rate segment, weighted by scheduled workdays (Aug 2025: 21 weekdays)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = Business.objects.create(name="Prorate Co")
+        cls.branch = Branch.objects.create(business=cls.business, name="Main")
+        PayrollCycle.objects.create(business=cls.business, name="Month", cycle_type="MONTHLY", start_day=1, end_day=31)
+        position = Position.objects.create(name="Prorated Clerk")
+        basic = SalaryComponent.objects.create(name="Basic", code="BASIC", component_type=SalaryComponent.EARNING)
+        SalaryStructure.objects.create(position=position, component=basic, amount=Decimal("100"), is_percentage=True)
+
+        def employee(name, hired):
+            return Employee.objects.create(first_name=name, last_name="Pro", hire_date=hired, branch=cls.branch, position=position)
+
+        cls.steady = employee("Steady", date(2024, 1, 1))
+        SalaryRate.objects.create(employee=cls.steady, start_date=date(2024, 1, 1), amount=Decimal("21000"))
+        cls.raised = employee("Raised", date(2024, 1, 1))
+        SalaryRate.objects.create(employee=cls.raised, start_date=date(2024, 1, 1), end_date=date(2025, 8, 15), amount=Decimal("20000"))
+        SalaryRate.objects.create(employee=cls.raised, start_date=date(2025, 8, 16), amount=Decimal("26000"))
+        cls.hired = employee("Hired", date(2025, 8, 13))
+        SalaryRate.objects.create(employee=cls.hired, start_date=date(2025, 1, 1), amount=Decimal("30000"))
+
+    def setUp(self):
+        for invalidate in (invalidate_holiday_calendar, invalidate_schedules, invalidate_position_structure):
+            invalidate()
+            self.addCleanup(invalidate)
+
+    def test_segments_and_proration(self):
+        with self.assertNumQueries(3):  # rates + cache versions + the branch schedule
+            salaries = cutoff_salaries([self.steady, self.raised, self.hired], date(2025, 8, 1), date(2025, 8, 31))
+
+        steady = salaries[self.steady.pk]
+        self.assertFalse(steady.is_prorated)
+        self.assertEqual(steady.prorated, Decimal("21000"))
+
+        raised = salaries[self.raised.pk]
+        self.assertEqual(raised.segments, (
+            RateSegment(date(2025, 8, 1), date(2025, 8, 15), Decimal("20000.00")),
+            RateSegment(date(2025, 8, 16), date(2025, 8, 31), Decimal("26000.00")),
+        ))
+        self.assertEqual(raised.rate, Decimal("26000"))
+        self.assertEqual(raised.prorated, (Decimal("20000") * 11 + Decimal("26000") * 10) / 21)
+
+        hired = salaries[self.hired.pk]
+        self.assertEqual(hired.segments, (RateSegment(date(2025, 8, 13), date(2025, 8, 31), Decimal("30000.00")),))
+        self.assertEqual(hired.prorated, Decimal("30000") * 13 / 21)
+
+        # a half-month cutoff entirely on one rate is not pro-rated
+        second_half = cutoff_salaries([self.raised], date(2025, 8, 16), date(2025, 8, 31))[self.raised.pk]
+        self.assertEqual((second_half.prorated, second_half.is_prorated), (Decimal("26000"), False))
+
+    def test_batch_engine_pays_segments_with_one_rate_query(self):
+        employees = [self.steady, self.raised, self.hired]
+        with CaptureQueriesContext(connection) as ctx:
+            results = generate_batch_payroll(date(2025, 8, 1), "MONTHLY", [e.pk for e in employees])
+        self.assertEqual({r["status"] for r in results}, {"success"})
+        rate_queries = [q for q in ctx.captured_queries if 'FROM "payroll_salaryrate"' in q["sql"]]
+        self.assertEqual(len(rate_queries), 1)
+
+        basic = dict(
+            PayrollRecord.objects.filter(component__code="BASIC", month=date(2025, 8, 1)).values_list("employee_id", "amount")
+        )
+        self.assertEqual(basic, {
+            self.steady.pk: Decimal("21000.00"),
+            self.raised.pk: Decimal("22857.14"),
+            self.hired.pk: Decimal("18571.43"),  # 13 of 21 workdays
+        })
+        by_employee = {r["employee_id"]: r for r in results}
+        self.assertEqual(by_employee[self.raised.pk]["base_salary_used"], "26000.00")
+        self.assertEqual(by_employee[self.raised.pk]["prorated_salary"], "22857.14")
+        self.assertNotIn("rate_segments", by_employee[self.steady.pk])
+
+
+class RateOverlapReconcileTests(TestCase):
+    """Legacy overlapping rates become the periods payroll already resolved them to."""
+
+    def test_resolved_periods(self):
+        d = date
+        self.assertEqual(  # already clean: unchanged
+            resolved_periods([(1, d(2023, 1, 1), d(2023, 12, 31)), (2, d(2024, 1, 1), None)]),
+            [(1, d(2023, 1, 1), d(2023, 12, 31)), (2, d(2024, 1, 1), None)],
+        )
+        self.assertEqual(  # open-ended rate overtaken by a later one: closed the day before
+            resolved_periods([(1, d(2023, 1, 1), None), (2, d(2024, 1, 1), None)]),
+            [(1, d(2023, 1, 1), d(2023, 12, 31)), (2, d(2024, 1, 1), None)],
+        )
+        self.assertEqual(  # a period inside another splits it
+            resolved_periods([(1, d(2023, 1, 1), None), (2, d(2023, 3, 1), d(2023, 4, 30))]),
+            [(1, d(2023, 1, 1), d(2023, 2, 28)), (2, d(2023, 3, 1), d(2023, 4, 30)), (1, d(2023, 5, 1), None)],
+        )
+        self.assertEqual(  # same start: the newer row wins, the other disappears
+            resolved_periods([(5, d(2023, 1, 1), None), (3, d(2023, 1, 1), d(2023, 6, 30))]),
+            [(5, d(2023, 1, 1), None)],
+        )
+
+    def test_command_reports_then_rewrites_without_changing_amounts(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("the exclusion constraint forbids the overlapping fixture")
+        branch = Branch.objects.create(business=Business.objects.create(name="Legacy Co"), name="Main")
+        employee = Employee.objects.create(first_name="Leg", last_name="Acy", hire_date=date(2022, 1, 1), branch=branch)
+        clean = Employee.objects.create(first_name="Cle", last_name="An", hire_date=date(2022, 1, 1), branch=branch)
+        SalaryRate.objects.bulk_create([
+            SalaryRate(employee=employee, start_date=start, end_date=end, amount=Decimal(amount))
+            for start, end, amount in [
+                (date(2022, 1, 1), None, "18000"),
+                (date(2023, 1, 1), None, "20000"),
+                (date(2023, 6, 1), date(2023, 6, 30), "21000"),
+            ]
+        ])
+        SalaryRate.objects.create(employee=clean, start_date=date(2022, 1, 1), amount=Decimal("15000"))
+        days = [date(2022, 1, 1) + timedelta(days=i) for i in range(0, 3 * 365, 7)]
+        before = SalaryResolver.for_employees([employee, clean])
+        paid = {(e.pk, day): before.amount_on(e.pk, day) for e in (employee, clean) for day in days}
+
+        out = StringIO()
+        call_command("reconcile_salary_rate_overlaps", stdout=out)
+        self.assertIn("1 employee(s) with overlapping rates; nothing changed", out.getvalue())
+        self.assertEqual(SalaryRate.objects.count(), 4)
+        with self.assertRaises(CommandError):
+            call_command("reconcile_salary_rate_overlaps", "--apply", stdout=StringIO())
+
+        export = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+        export.close()
+        self.addCleanup(os.unlink, export.name)
+        call_command("reconcile_salary_rate_overlaps", "--apply", "--export", export.name, stdout=StringIO())
+
+        rows = list(SalaryRate.objects.filter(employee=employee).order_by("start_date").values_list("start_date", "end_date"))
+        self.assertEqual(rows, [
+            (date(2022, 1, 1), date(2022, 12, 31)),
+            (date(2023, 1, 1), date(2023, 5, 31)),
+            (date(2023, 6, 1), date(2023, 6, 30)),
+            (date(2023, 7, 1), None),
+        ])
+        for start, end in rows:
+            self.assertFalse(overlapping_rates(employee, start, end).exclude(start_date=start).exists())
+        after = SalaryResolver.for_employees([employee, clean])
+        self.assertEqual({k: after.amount_on(*k) for k in paid}, paid)
+        with open(export.name, newline="", encoding="utf-8") as fh:
+            self.assertEqual([r[0] for r in csv.reader(fh)], ["action", "changed", "changed"])
+
+        out = StringIO()
+        call_command("reconcile_salary_rate_overlaps", stdout=out)
+        self.assertIn("No overlapping SalaryRate periods", out.getvalue())
@@ -0,0 +1,64 @@
+# payroll/tests/test_work_schedule.py
+"""Compiled work schedules."""
+from datetime import time
+from decimal import Decimal
+
+from django.db.models import F
+from django.test import TestCase
+
+from organization.models import Branch, Business, WorkSchedulePolicy
+from payroll.models import CacheVersion, PayrollPolicy
+from payroll.services.cache_versions import WORK_SCHEDULES, snapshot
+from payroll.services.work_schedule import (
+    compile_schedule, invalidate as invalidate_schedules, schedule_for_branch,
+)
+
+
+class CompiledScheduleTests(TestCase):
+    """Schedules are compiled once per branch and dropped from the cache on save."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = Business.objects.create(name="Shift Co")
+        cls.branch = Branch.objects.create(business=cls.business, name="Plant")
+        cls.bare = Branch.objects.create(business=cls.business, name="Kiosk")
+        PayrollPolicy.objects.create(business=cls.business, grace_minutes=5)
+        cls.schedule = WorkSchedulePolicy.objects.create(
+            branch=cls.branch, time_in=time(22, 0), time_out=time(6, 30),
+            break_hours=Decimal("0.50"), regular_work_days="0,2,4,5",
+        )
+
+    def setUp(self):
+        invalidate_schedules()
+        self.addCleanup(invalidate_schedules)
+
+    def test_other_process_changes_reload_by_version(self):
+        self.assertEqual(schedule_for_branch(self.branch.id).grace_minutes, 0)
+        # another worker's write: no signal here, only its version bump
+        WorkSchedulePolicy.objects.filter(pk=self.schedule.pk).update(grace_minutes=15)
+        self.assertEqual(schedule_for_branch(self.branch.id).grace_minutes, 0)
+        CacheVersion.objects.filter(key=WORK_SCHEDULES).update(version=F("version") + 1)
+        self.assertEqual(schedule_for_branch(self.branch.id).grace_minutes, 15)
+
+    def test_compile(self):
+        compiled = compile_schedule(self.schedule)
+        self.assertEqual(compiled.work_day_mask, 0b110101)
+        self.assertEqual(compiled.get_work_days(), {0, 2, 4, 5})
+        self.assertFalse(compiled.is_work_day(1))
+        self.assertEqual((compiled.start_minute, compiled.span_minutes, compiled.end_minute), (1320, 510, 1830))
+        self.assertEqual((compiled.expected_daily_hours, compiled.expected_minutes), (Decimal("8.00"), Decimal("480.00")))
+        self.assertEqual(compile_schedule(None, grace_minutes=5).get_work_days(), {0, 1, 2, 3, 4})
+
+    def test_cache_per_branch(self):
+        with self.assertNumQueries(2):
+            plant = schedule_for_branch(self.branch.id)
+        with self.assertNumQueries(1):  # only the version check
+            self.assertIs(schedule_for_branch(self.branch.id), plant)
+        with self.assertNumQueries(1), snapshot():  # a run reads the versions once
+            self.assertIs(schedule_for_branch(self.branch.id), plant)
+            self.assertIs(schedule_for_branch(self.branch.id), plant)
+        self.assertEqual(schedule_for_branch(self.bare.id).grace_minutes, 5)  # default schedule, policy grace
+
+        self.schedule.grace_minutes = 10
+        self.schedule.save()
+        self.assertEqual(schedule_for_branch(self.branch.id).grace_minutes, 10)
@@ -5,6 +5,7 @@ from rest_framework import status
 from django.shortcuts import get_object_or_404
 from decimal import Decimal, InvalidOperation
 from django.db import transaction
+from django.utils import timezone
 from payroll.utils import _period_bounds_for_month
 from timekeeping.models import TimeLog
 from .models import PayrollCycle, PayrollPolicy, PayrollRun, SalaryComponent, SalaryRate, SalaryStructure, PayrollRecord
@@ -16,11 +17,15 @@ from drf_spectacular.utils import extend_schema
 from payroll.services.mandatories import compute_mandatories_monthly, allocate_to_cycle
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
-from common.filters import PayrollCycleFilter
+from common.filters import PayrollCycleFilter, PayrollRecordFilter
+from common.pagination import PayrollRecordPagination
 from payroll.services.payroll_engine import generate_payroll_for_employee, generate_batch_payroll
 from payroll.services.helpers import normalize_month
+from payroll.services.archive import ARCHIVED, archived_payroll_rows, archived_run_rows
+from payroll.services.retro import apply_retro as apply_retro_adjustments
 from payroll.utils import _date_in_cycle
 
+PAID_RUN_LOCKED = "PayrollRun is paid; corrections to it are posted as retro adjustments."
 
 
 @extend_schema(tags=["Payroll"])
@@ -47,7 +52,7 @@ def upsert_mandatories(employee, month, cycle_type, gross_monthly: Decimal, poli
     and upsert them as PayrollRecord rows using component codes.
     """
     from payroll.models import PayrollRecord, SalaryComponent
-    monthly = compute_mandatories_monthly(gross_monthly, policy)
+    monthly = compute_mandatories_monthly(gross_monthly, policy, on=month)
     per_cycle = allocate_to_cycle(monthly, cycle_type, split=(Decimal("0.50"), Decimal("0.50")))
     comp_map = {c.code: c for c in SalaryComponent.objects.filter(code__in=per_cycle.keys())}
 
@@ -120,6 +125,8 @@ class GeneratePayrollView(APIView):
                 run = PayrollRun.objects.get(pk=run_id)
             except PayrollRun.DoesNotExist:
                 return Response({"detail": "PayrollRun not found."}, status=status.HTTP_404_NOT_FOUND)
+            if run.paid_at:
+                return Response({"detail": PAID_RUN_LOCKED}, status=status.HTTP_400_BAD_REQUEST)
         else:
             run = PayrollRun.objects.create(
                 business=business,
@@ -205,7 +212,22 @@ class PayrollSummaryView(APIView):
         deductions = qs.filter(component__component_type='DEDUCTION').aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
 
         # Uses your existing serializer
-        serializer = PayrollSummarySerializer(qs, many=True)
+        details = PayrollSummarySerializer(qs, many=True).data
+
+        # Fall back to the cold archive for months moved out of the hot tables
+        if not details:
+            archived = archived_payroll_rows(
+                employee.branch.business_id, employee.id, month,
+                run_id=int(run_id) if run_id else None,
+                cycle_type=str(cycle_type).upper() if cycle_type else None,
+                include_13th=include_13th,
+            ) or []
+            details = [
+                {"component_name": a["component"], "component_type": a["type"], "amount": str(a["amount"])}
+                for a in archived
+            ]
+            earnings = sum((a["amount"] for a in archived if a["type"] == 'EARNING'), Decimal('0.00'))
+            deductions = sum((a["amount"] for a in archived if a["type"] == 'DEDUCTION'), Decimal('0.00'))
 
         return Response({
             "employee": f"{employee.first_name} {employee.last_name}",
@@ -215,7 +237,7 @@ class PayrollSummaryView(APIView):
             "earnings": earnings,
             "deductions": deductions,
             "net_pay": earnings - deductions,
-            "details": serializer.data,
+            "details": details,
         }, status=status.HTTP_200_OK)
 
 @extend_schema(tags=["Payroll"])
@@ -410,14 +432,37 @@ class PayslipPreviewView(APIView):
                 )
             used_cycle_type = distinct.first() if count == 1 else None
 
-        # If nothing matched → 404 (avoid empty payslip)
-        if not qs.exists():
-            return Response({"detail": "No payroll records found for this employee/month/cycle."}, status=status.HTTP_404_NOT_FOUND)
-
-        earnings = qs.filter(component__component_type="EARNING").aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
-        deductions = qs.filter(component__component_type="DEDUCTION").aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
-
-        serializer = PayslipComponentSerializer(qs, many=True)
+        if qs.exists():
+            earnings = qs.filter(component__component_type="EARNING").aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
+            deductions = qs.filter(component__component_type="DEDUCTION").aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
+            components = PayslipComponentSerializer(qs, many=True).data
+        else:
+            # Not in the hot tables → try the cold archive before giving up
+            archived = archived_payroll_rows(
+                business.id, employee.id, month,
+                run_id=int(run_id) if run_id else None,
+                cycle_type=used_cycle_type,
+                include_13th=include_13th,
+            )
+            # If nothing matched → 404 (avoid empty payslip)
+            if not archived:
+                return Response({"detail": "No payroll records found for this employee/month/cycle."}, status=status.HTTP_404_NOT_FOUND)
+            if used_cycle_type is None:
+                cycles = {a["cycle_type"] for a in archived}
+                if len(cycles) > 1:
+                    return Response(
+                        {"error": "Multiple cycles found for this month. Provide ?run=<id> or &cycle_type=SEMI_1/SEMI_2/MONTHLY."},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                used_cycle_type = cycles.pop()
+            # Preview orders DEDUCTION before EARNING (component_type, name)
+            archived.sort(key=lambda a: (a["type"], a["component"]))
+            components = [
+                {"name": a["component"], "type": a["type"], "amount": str(a["amount"]), "is_13th_month": a["is_13th_month"]}
+                for a in archived
+            ]
+            earnings = sum((a["amount"] for a in archived if a["type"] == "EARNING"), Decimal("0.00"))
+            deductions = sum((a["amount"] for a in archived if a["type"] == "DEDUCTION"), Decimal("0.00"))
 
         return Response({
             "employee": {
@@ -429,7 +474,7 @@ class PayslipPreviewView(APIView):
             "month": month,
             "run": int(run_id) if run_id else None,
             "cycle_type": used_cycle_type,
-            "components": serializer.data,
+            "components": components,
             "total_earnings": earnings,
             "total_deductions": deductions,
             "net_pay": earnings - deductions,
@@ -502,6 +547,8 @@ class BatchPayrollGenerationView(APIView):
                 run = PayrollRun.objects.get(pk=run_id)
             except PayrollRun.DoesNotExist:
                 return Response({"detail": "PayrollRun not found."}, status=404)
+            if run.paid_at:
+                return Response({"detail": PAID_RUN_LOCKED}, status=400)
         else:
             # Infer business from first employee
             try:
@@ -666,8 +713,48 @@ class PayrollPolicyViewSet(viewsets.ModelViewSet):
 
 @extend_schema(tags=["Payroll"])
 class PayrollRecordViewSet(viewsets.ModelViewSet):
-    queryset = PayrollRecord.objects.all()
+    """
+    GET /records/?run=&employee=&month=YYYY-MM&cycle=&cycle_type=&component=&fields=id,amount,...
+
+    Keyset-paginated on (month, id): follow `next` for the following page.
+    """
+    queryset = PayrollRecord.objects.select_related("employee", "component").all()
     serializer_class = PayrollRecordSerializer
+    pagination_class = PayrollRecordPagination
+
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PayrollRecordFilter
+
+    # Columns the serializer can touch; trimmed further when ?fields= is given
+    _SPARSE_COLUMNS = {
+        "id": ("id",),
+        "employee": ("employee_id",),
+        "employee_name": ("employee__first_name", "employee__last_name"),
+        "month": ("month",),
+        "component": ("component_id",),
+        "component_name": ("component__name",),
+        "component_type": ("component__component_type",),
+        "amount": ("amount",),
+        "is_13th_month": ("is_13th_month",),
+        "payroll_cycle": ("payroll_cycle_id",),
+    }
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action != "list":
+            return qs
+
+        raw = self.request.query_params.get("fields")
+        wanted = {f.strip() for f in (raw or "").split(",") if f.strip()} & set(self._SPARSE_COLUMNS)
+        if not wanted:
+            wanted = set(self._SPARSE_COLUMNS)
+
+        # Only join what the requested fields need, and only load those columns
+        columns = {"id", "month"}  # keyset ordering
+        for name in wanted:
+            columns.update(self._SPARSE_COLUMNS[name])
+        related = [rel for rel in ("employee", "component") if any(c.startswith(f"{rel}__") for c in columns)]
+        return qs.select_related(None).select_related(*related).only(*columns)
 
 @extend_schema(tags=["Payroll"])
 class SalaryRateViewSet(viewsets.ModelViewSet):
@@ -701,16 +788,24 @@ class PayrollRunViewSet(viewsets.ModelViewSet):
         Quick totals for a run: earnings, deductions, net, and record count.
         """
         run = self.get_object()
-        records = PayrollRecord.objects.select_related("component").filter(run=run)
+        if run.status == ARCHIVED:
+            # the run's records live in the cold archive now
+            lines = [(a["type"], a["amount"]) for a in archived_run_rows(run)]
+        else:
+            # month filter lets PostgreSQL prune to the run's partition
+            lines = list(
+                PayrollRecord.objects.filter(run=run, month=run.month)
+                .values_list("component__component_type", "amount")
+            )
 
         total_earnings = Decimal("0.00")
         total_deductions = Decimal("0.00")
 
-        for r in records:
-            if r.component.component_type == "EARNING":
-                total_earnings += r.amount
+        for component_type, amount in lines:
+            if component_type == "EARNING":
+                total_earnings += amount
             else:
-                total_deductions += r.amount
+                total_deductions += amount
 
         data = {
             "run_id": run.id,
@@ -722,7 +817,7 @@ class PayrollRunViewSet(viewsets.ModelViewSet):
                 "type": run.payroll_cycle.cycle_type,
             },
             "counts": {
-                "records": records.count(),
+                "records": len(lines),
             },
             "totals": {
                 "earnings": str(total_earnings),
@@ -730,4 +825,40 @@ class PayrollRunViewSet(viewsets.ModelViewSet):
                 "net": str(total_earnings - total_deductions),
             },
         }
-        return Response(data)
\ No newline at end of file
+        return Response(data)
+
+    @action(detail=True, methods=["post"], url_path="mark-paid")
+    def mark_paid(self, request, pk=None):
+        """
+        Finalise a COMPLETED run as paid. Paid runs are locked against
+        regeneration and are the only runs retro adjustments recompute.
+        """
+        run = self.get_object()
+        if run.status != "COMPLETED":
+            return Response({"detail": "Only a COMPLETED run can be marked paid."}, status=400)
+        if run.paid_at is None:
+            run.paid_at = timezone.now()
+            run.save(update_fields=["paid_at"])
+        return Response(self.get_serializer(run).data)
+
+    @action(detail=True, methods=["post"], url_path="apply-retro")
+    def apply_retro(self, request, pk=None):
+        """
+        Post retroactive adjustments for the business's pending input changes
+        into this (PENDING) run as RETRO_ADJ records.
+        Body: { "dry_run": true } to only compute them.
+        """
+        run = self.get_object()
+        if run.status != "PENDING":
+            return Response({"detail": "Retro adjustments can only be posted into a PENDING run."}, status=400)
+        dry_run = str(request.data.get("dry_run", "false")).lower() in ("1", "true", "yes")
+        result = apply_retro_adjustments(business=run.business, target_run=run, dry_run=dry_run)
+        return Response({
+            "run_id": run.id,
+            "dry_run": result.dry_run,
+            "changes": result.changes,
+            "recomputed": result.recomputed,
+            "processed": result.processed,
+            "adjustments": result.adjustments,
+            "unresolved": result.unresolved,
+        })
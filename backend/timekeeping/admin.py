@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Holiday, TimeLog
+from .models import DailyAttendance, Holiday, PunchEvent, TimeLog, TimeLogImportJob
 
 admin.site.register(TimeLog)
 @admin.register(Holiday)
@@ -7,3 +7,24 @@ class HolidayAdmin(admin.ModelAdmin):
     list_display = ('name', 'date', 'type', 'is_national')
     list_filter = ('type', 'is_national')
     search_fields = ('name',)
+
+
+@admin.register(TimeLogImportJob)
+class TimeLogImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'filename', 'status', 'processed_rows', 'estimated_rows', 'skipped_count', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+
+@admin.register(PunchEvent)
+class PunchEventAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'punched_at', 'direction', 'device_id', 'source', 'paired_at')
+    list_filter = ('direction', 'source')
+    readonly_fields = ('ingested_at', 'paired_at')
+
+
+@admin.register(DailyAttendance)
+class DailyAttendanceAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'date', 'late_minutes', 'undertime_minutes', 'ot_minutes', 'is_absent', 'is_holiday')
+    list_filter = ('is_absent', 'is_holiday', 'is_rest_day')
+    readonly_fields = ('computed_at',)
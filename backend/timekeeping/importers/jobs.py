@@ -0,0 +1,191 @@
+# timekeeping/importers/jobs.py
+"""
+Background timelog imports.
+
+The API stores the upload as a TimeLogImportJob (status PENDING); the worker
+(`manage.py process_timelog_imports`) claims jobs one at a time, runs
+`import_timelogs` without an outer transaction so every chunk commits and
+progress is visible while it runs, and streams every row error to a CSV
+report attached to the job.
+
+A running job refreshes `heartbeat_at` with its progress. If a worker dies
+mid-import, the next `process_pending` finds the stale heartbeat and queues
+the job again (imports are upserts, so a rerun is safe); after
+TIMELOG_IMPORT_MAX_ATTEMPTS it is marked FAILED instead.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import tempfile
+import time
+from dataclasses import fields
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from timekeeping.importers.timelog_importer import ImportOptions, _is_excel, import_timelogs
+from timekeeping.models import TimeLogImportJob
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_SAVE_INTERVAL = 1.0  # seconds between progress writes
+_OPTION_NAMES = {f.name for f in fields(ImportOptions)}
+
+
+def enqueue_import(upload, options: dict, user=None) -> TimeLogImportJob:
+    """Store the upload and queue it; `options` holds ImportOptions fields."""
+    opts = {k: v for k, v in options.items() if k in _OPTION_NAMES}
+    job = TimeLogImportJob(
+        filename=upload.name,
+        options=opts,
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+    job.estimated_rows = estimate_rows(upload, upload.name, opts.get("has_header", True))
+    job.file.save(upload.name, upload, save=False)
+    job.save()
+    return job
+
+
+def estimate_rows(file_obj, filename: str, has_header: bool = True) -> int:
+    """Cheap row count for percent complete: newlines for CSV, sheet dimension for Excel."""
+    header = 1 if has_header else 0
+    try:
+        file_obj.seek(0)
+        if _is_excel(filename):
+            import openpyxl
+            wb = openpyxl.load_workbook(file_obj, read_only=True)
+            rows = wb.active.max_row or 0
+            wb.close()
+        else:
+            rows, last = 0, b""
+            for block in iter(lambda: file_obj.read(1024 * 1024), b""):
+                rows += block.count(b"\n")
+                last = block
+            if last and not last.endswith(b"\n"):
+                rows += 1
+        return max(0, rows - header)
+    except Exception:  # estimate only; the import itself reports real errors
+        logger.exception("Could not estimate rows for %s", filename)
+        return 0
+    finally:
+        file_obj.seek(0)
+
+
+def reclaim_stale_jobs(now=None) -> int:
+    """
+    RUNNING jobs whose heartbeat is older than TIMELOG_IMPORT_STALE_AFTER
+    seconds: back to PENDING, or FAILED once they used every attempt.
+    Returns the number of jobs reclaimed.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, "TIMELOG_IMPORT_STALE_AFTER", 600))
+    max_attempts = getattr(settings, "TIMELOG_IMPORT_MAX_ATTEMPTS", 3)
+    stale = TimeLogImportJob.objects.filter(status=TimeLogImportJob.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=TimeLogImportJob.FAILED,
+        message=f"Worker stopped responding ({max_attempts} attempts).",
+        finished_at=now,
+    )
+    requeued = stale.filter(attempts__lt=max_attempts).update(status=TimeLogImportJob.PENDING)
+    if failed or requeued:
+        logger.warning("Reclaimed stale timelog import jobs: %s requeued, %s failed", requeued, failed)
+    return failed + requeued
+
+
+def claim_next_job() -> Optional[TimeLogImportJob]:
+    """Atomically move the oldest PENDING job to RUNNING (safe with several workers on PostgreSQL)."""
+    with transaction.atomic():
+        job = (
+            TimeLogImportJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=TimeLogImportJob.PENDING)
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = TimeLogImportJob.RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.attempts = F("attempts") + 1
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "attempts"])
+        job.refresh_from_db(fields=["attempts"])
+    return job
+
+
+def run_job(job: TimeLogImportJob) -> TimeLogImportJob:
+    options = ImportOptions(**{k: v for k, v in job.options.items() if k in _OPTION_NAMES})
+    started = time.perf_counter()
+    last_save = 0.0
+
+    def _save_progress(counts, force=False):
+        nonlocal last_save
+        now = time.perf_counter()
+        if not force and now - last_save < PROGRESS_SAVE_INTERVAL:
+            return
+        last_save = now
+        elapsed = now - started
+        job.processed_rows = counts.total
+        job.created_count = counts.created
+        job.updated_count = counts.updated
+        job.unchanged_count = counts.unchanged
+        job.skipped_count = counts.skipped
+        job.rows_per_second = round(counts.total / elapsed, 1) if elapsed else 0.0
+        job.heartbeat_at = timezone.now()
+        job.save(update_fields=[
+            "processed_rows", "created_count", "updated_count", "unchanged_count",
+            "skipped_count", "rows_per_second", "heartbeat_at",
+        ])
+
+    with tempfile.TemporaryFile(mode="w+", newline="", encoding="utf-8") as report:
+        writer = csv.writer(report)
+        writer.writerow(["row", "error"])
+        try:
+            with job.file.open("rb") as fh:
+                result = import_timelogs(
+                    fh, job.filename, options,
+                    atomic=False,
+                    progress=_save_progress,
+                    error_sink=lambda line, message: writer.writerow([line, message]),
+                )
+        except Exception as e:
+            logger.exception("Timelog import job %s failed", job.pk)
+            job.status = TimeLogImportJob.FAILED
+            job.message = str(e)
+        else:
+            job.status = TimeLogImportJob.DONE
+            job.message = "Dry run complete." if options.dry_run else "Import complete."
+            job.processed_rows = result.total_rows
+            job.created_count = result.created
+            job.updated_count = result.updated
+            job.unchanged_count = result.unchanged
+            job.skipped_count = result.skipped
+            job.rows_per_second = result.rows_per_second
+
+        if job.skipped_count:
+            report.seek(0)
+            job.errors_file.save(f"job_{job.pk}_errors.csv", File(report), save=False)
+
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def process_pending(max_jobs: Optional[int] = None) -> int:
+    """Run queued jobs until the queue is empty (or `max_jobs` ran). Returns jobs run."""
+    reclaim_stale_jobs()
+    ran = 0
+    while max_jobs is None or ran < max_jobs:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
@@ -0,0 +1,192 @@
+# timekeeping/importers/punches.py
+"""
+Append-only ingestion of raw device punches into PunchEvent.
+
+Two dump formats are accepted:
+
+  CSV (header required)   employee_id|email, timestamp | date + time,
+                          [direction], [device_id]
+  ZKTeco attlog (.dat)    tab separated, no header:
+                          <user id> <YYYY-MM-DD HH:MM:SS> <verify> <state> ...
+
+Device user ids are the payroll Employee ids (that is what gets enrolled on
+the terminals). Device timestamps are local wall-clock time and are stored in
+settings.TIME_ZONE. Rows are inserted with ON CONFLICT DO NOTHING on
+(employee, punched_at), so re-sending a whole dump only adds what is new.
+Nothing here touches TimeLog: `timekeeping.services.punch_pairing` folds the
+new punches into TimeLogs afterwards.
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.utils import timezone
+
+from timekeeping.importers.timelog_importer import (
+    CSV_BLOCK_SIZE, _chunks, _iter_csv_lines, _resolve_employees,
+)
+from timekeeping.models import PunchEvent
+
+# ZKTeco punch states: check-in/out, break-out/in, overtime-in/out
+ZK_STATES = {"0": PunchEvent.IN, "1": PunchEvent.OUT, "2": PunchEvent.OUT,
+             "3": PunchEvent.IN, "4": PunchEvent.IN, "5": PunchEvent.OUT}
+DIRECTIONS = {"in": PunchEvent.IN, "i": PunchEvent.IN, "0": PunchEvent.IN,
+              "out": PunchEvent.OUT, "o": PunchEvent.OUT, "1": PunchEvent.OUT}
+TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M")
+
+
+@dataclass
+class PunchIngestOptions:
+    employee_field: str = "employee_id"    # CSV only: "employee_id" | "email"
+    device_id: str = ""                    # stamped on rows that do not carry one (.dat dumps never do)
+    chunk_size: int = 5000
+    block_size: int = CSV_BLOCK_SIZE
+
+
+@dataclass
+class PunchIngestResult:
+    total_rows: int = 0
+    inserted: int = 0
+    duplicates: int = 0                    # already stored (or repeated within the dump)
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+
+def is_attlog(filename: str) -> bool:
+    low = filename.lower()
+    return low.endswith(".dat") or low.endswith(".txt")
+
+
+def _parse_timestamp(raw: str) -> datetime:
+    raw = raw.strip()
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            value = datetime.strptime(raw, fmt)
+            break
+        except ValueError:
+            continue
+    else:
+        try:
+            value = datetime.fromisoformat(raw)
+        except ValueError:
+            raise ValueError(f"Invalid timestamp '{raw}'")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _parse_direction(raw: Optional[str]) -> str:
+    raw = (raw or "").strip().lower()
+    if not raw:
+        return PunchEvent.UNKNOWN
+    if raw not in DIRECTIONS:
+        raise ValueError(f"Invalid direction '{raw}'")
+    return DIRECTIONS[raw]
+
+
+# ─────────────────────────────────────────────────────────
+# Row parsers: each yields (line, key, punched_at, direction, device_id) or (line, error)
+# ─────────────────────────────────────────────────────────
+def _attlog_rows(lines: Iterator[str], opts: PunchIngestOptions):
+    for line_no, text in enumerate(lines, start=1):
+        text = text.strip()
+        if not text:
+            continue
+        parts = [p.strip() for p in text.split("\t")]
+        try:
+            if len(parts) < 2:
+                raise ValueError("Expected <user id> TAB <timestamp>")
+            key = int(parts[0])
+            punched_at = _parse_timestamp(parts[1])
+            direction = ZK_STATES.get(parts[3], PunchEvent.UNKNOWN) if len(parts) > 3 else PunchEvent.UNKNOWN
+        except ValueError as e:
+            yield line_no, str(e)
+            continue
+        yield line_no, key, punched_at, direction, opts.device_id
+
+
+def _csv_rows(lines: Iterator[str], opts: PunchIngestOptions):
+    reader = csv.DictReader(lines)
+    columns = {str(c).strip() for c in reader.fieldnames or []}
+    if opts.employee_field not in columns:
+        raise ValueError(f"Missing column for employee_field: {opts.employee_field}")
+    if "timestamp" not in columns and not {"date", "time"} <= columns:
+        raise ValueError("Missing required column: timestamp (or date and time)")
+
+    for line_no, raw in enumerate(reader, start=2):
+        row = {str(k).strip(): (v or "").strip() for k, v in raw.items() if k is not None}
+        try:
+            key = row.get(opts.employee_field, "")
+            if opts.employee_field == "employee_id":
+                key = int(key)
+            elif opts.employee_field == "email":
+                key = key.lower()
+            stamp = row.get("timestamp") or f"{row.get('date', '')} {row.get('time', '')}"
+            punched_at = _parse_timestamp(stamp)
+            direction = _parse_direction(row.get("direction"))
+        except ValueError as e:
+            yield line_no, str(e)
+            continue
+        yield line_no, key, punched_at, direction, row.get("device_id") or opts.device_id
+
+
+# ─────────────────────────────────────────────────────────
+# Entry point
+# ─────────────────────────────────────────────────────────
+def _insert_chunk(rows: List[tuple], employee_field: str, source: str, result: PunchIngestResult) -> None:
+    employees = _resolve_employees({r[1] for r in rows if len(r) == 5}, employee_field)
+    pending: Dict[Tuple[int, datetime], PunchEvent] = {}
+    for row in rows:
+        if len(row) == 2:
+            result.skipped += 1
+            result.errors.append(f"Row {row[0]}: {row[1]}")
+            continue
+        line, key, punched_at, direction, device_id = row
+        emp_id = employees.get(key)
+        if emp_id is None:
+            result.skipped += 1
+            result.errors.append(f"Row {line}: Employee matching query does not exist.")
+            continue
+        if (emp_id, punched_at) in pending:
+            result.duplicates += 1
+            continue
+        pending[(emp_id, punched_at)] = PunchEvent(
+            employee_id=emp_id, punched_at=punched_at, direction=direction,
+            device_id=device_id[:50], source=source,
+        )
+    if not pending:
+        return
+
+    stored = set(
+        PunchEvent.objects
+        .filter(employee_id__in={k[0] for k in pending}, punched_at__in={k[1] for k in pending})
+        .values_list("employee_id", "punched_at")
+    )
+    new = [p for k, p in pending.items() if k not in stored]
+    result.duplicates += len(pending) - len(new)
+    # Still ON CONFLICT DO NOTHING: a concurrent ingest of the same dump must not fail
+    PunchEvent.objects.bulk_create(new, batch_size=1000, ignore_conflicts=True)
+    result.inserted += len(new)
+
+
+def ingest_punches(file_obj, filename: str, options: Optional[PunchIngestOptions] = None) -> PunchIngestResult:
+    """
+    Append the punches of one device dump. Returns counts; rows that cannot be
+    parsed or name an unknown employee are reported and skipped. The file is
+    streamed and written in chunks of `chunk_size`.
+    """
+    opts = options or PunchIngestOptions()
+    result = PunchIngestResult()
+    lines = _iter_csv_lines(file_obj, opts.block_size)
+    if is_attlog(filename):
+        rows, employee_field, source = _attlog_rows(lines, opts), "employee_id", "dat"
+    else:
+        rows, employee_field, source = _csv_rows(lines, opts), opts.employee_field, "csv"
+
+    for chunk in _chunks(rows, max(1, opts.chunk_size)):
+        result.total_rows += len(chunk)
+        _insert_chunk(chunk, employee_field, source, result)
+    return result
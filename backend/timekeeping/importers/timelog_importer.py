@@ -1,17 +1,22 @@
 # timekeeping/importers/timelog_importer.py
 from __future__ import annotations
 
+import codecs
 import csv
 import io
-from dataclasses import dataclass
-from datetime import datetime, time
+import time as _time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
 from decimal import Decimal
-from typing import Iterable, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from django.db import transaction
-from django.utils.timezone import make_naive
+from django.db import DatabaseError, transaction
+from django.db.models.functions import Lower
+from django.utils.timezone import is_aware, make_naive
 
-from timekeeping.models import TimeLog, Holiday
+from timekeeping.models import TimeLog, Holiday, timelog_content_hash
+from timekeeping.services.holiday_calendar import get_calendar
+from timekeeping.signals import timelogs_written
 from employees.models import Employee
 
 
@@ -22,6 +27,12 @@ class ImportOptions:
     time_format: str = "%H:%M"             # e.g. "09:00"
     has_header: bool = True
     dry_run: bool = False                  # don't write to DB
+    mode: str = "row"                      # "row" (per-row upsert) | "bulk" (chunked, set-based)
+    chunk_size: int = 2000                 # rows per chunk in bulk mode
+    block_size: int = 64 * 1024            # bytes read per step when streaming CSV
+    preview_limit: int = 200               # dry run: rows included in the diff preview
+    workers: int = 0                       # bulk/dry run: parse chunks in this many processes (0/1 = in-process)
+    engine: str = "python"                 # "python" (streaming rows) | "pandas" (columnar, see importers.columnar)
     default_ot_hours: Decimal = Decimal("0.00")
     default_late_minutes: int = 0
     default_undertime_minutes: int = 0
@@ -34,6 +45,14 @@ class ImportResult:
     updated: int
     skipped: int
     errors: list
+    elapsed_seconds: float = 0.0
+    unchanged: int = 0                     # rows identical to what is stored (not written)
+    preview: list = field(default_factory=list)  # dry run only: per-row diff, capped at preview_limit
+    ids: list = field(default_factory=list)  # upsert_timelog_rows only: TimeLog id per distinct (employee, date)
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.total_rows / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
 
 
 REQUIRED_COLUMNS = {
@@ -77,7 +96,10 @@ def _parse_time(value: Optional[str], time_format: str) -> Optional[time]:
 def _parse_decimal(value: Optional[str], default: Decimal) -> Decimal:
     if value is None or str(value).strip() == "":
         return default
-    return Decimal(str(value))
+    amount = Decimal(str(value))
+    if not amount.is_finite():
+        raise ValueError(f"Not a finite number: {value}")
+    return amount
 
 
 def _parse_int(value: Optional[str], default: int) -> int:
@@ -96,22 +118,6 @@ def _get_employee(row: dict, employee_field: str) -> Employee:
     raise ValueError("Unsupported employee_field")
 
 
-def _get_holiday(row: dict) -> Optional[Holiday]:
-    code = (row.get("holiday_code") or "").strip()
-    name = (row.get("holiday_name") or "").strip()
-    if code:
-        try:
-            return Holiday.objects.get(code=code)
-        except Holiday.DoesNotExist:
-            return None
-    if name:
-        try:
-            return Holiday.objects.get(name__iexact=name)
-        except Holiday.DoesNotExist:
-            return None
-    return None
-
-
 def _normalize_row_keys(keys: Iterable[str]) -> set:
     return {str(k).strip() for k in keys}
 
@@ -121,7 +127,61 @@ def _is_excel(upload_name: str) -> bool:
     return low.endswith(".xlsx") or low.endswith(".xlsm") or low.endswith(".xls")
 
 
-def _iter_rows_from_file(file_obj, filename: str, has_header: bool) -> Tuple[Iterable[dict], set]:
+CSV_BLOCK_SIZE = 64 * 1024
+
+
+def _latin1_fallback(err: UnicodeDecodeError):
+    """Decode bytes that are not valid UTF-8 as latin-1 instead of failing mid-stream."""
+    return err.object[err.start:err.end].decode("latin-1"), err.end
+
+
+codecs.register_error("timelog_latin1", _latin1_fallback)
+
+
+def _detect_decoder(first_block: bytes):
+    """
+    Pick the encoding from the first block, like the old whole-file decode did:
+    UTF-8 (a BOM is dropped) if the block decodes, latin-1 otherwise. A block cut
+    in the middle of a multi-byte character still counts as UTF-8.
+    """
+    probe = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        probe.decode(first_block, final=False)
+    except UnicodeDecodeError:
+        return codecs.getincrementaldecoder("latin-1")()
+    return codecs.getincrementaldecoder("utf-8-sig")(errors="timelog_latin1")
+
+
+def _iter_csv_lines(file_obj, block_size: int = CSV_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Yield text lines (with their newline) from a binary or text file object,
+    reading `block_size` bytes at a time through an incremental decoder.
+    Quoted fields spanning lines are reassembled by csv.reader itself.
+    """
+    decoder = None
+    pending = ""
+    while True:
+        block = file_obj.read(block_size)
+        if isinstance(block, str):
+            text = block
+        else:
+            if decoder is None:
+                decoder = _detect_decoder(block)
+            text = decoder.decode(block, final=not block)
+        if text:
+            parts = (pending + text).split("\n")
+            pending = parts.pop()
+            for part in parts:
+                yield part + "\n"
+        if not block:
+            break
+    if pending:
+        yield pending
+
+
+def _iter_rows_from_file(
+    file_obj, filename: str, has_header: bool, block_size: int = CSV_BLOCK_SIZE
+) -> Tuple[Iterable[dict], set]:
     """
     Yields rows as dicts with string keys. Returns (iterator, columns_set).
     Supports CSV and Excel. Prefers openpyxl for Excel; falls back to pandas if available.
@@ -174,27 +234,17 @@ def _iter_rows_from_file(file_obj, filename: str, has_header: bool) -> Tuple[Ite
             except ImportError:
                 raise RuntimeError("Excel file detected but no engine available. Install either 'openpyxl' or 'pandas'.")
     
-    # ---- CSV path ----
+    # ---- CSV path (streamed: memory bounded by block_size + one chunk of rows) ----
     file_obj.seek(0)
-    raw = file_obj.read()
-    if isinstance(raw, bytes):
-        try:
-            text = raw.decode("utf-8")
-        except UnicodeDecodeError:
-            text = raw.decode("latin-1")
-    else:
-        text = raw
-
-    import io, csv
-    sio = io.StringIO(text)
+    lines = _iter_csv_lines(file_obj, block_size)
 
     if has_header:
-        reader = csv.DictReader(sio)
+        reader = csv.DictReader(lines)
         columns = _normalize(reader.fieldnames or [])
         return reader, columns
 
     # No header: synthesize column names
-    r = csv.reader(sio)
+    r = csv.reader(lines)
     first = next(r)
     headers = [f"col_{i+1}" for i in range(len(first))]
     columns = _normalize(headers)
@@ -207,94 +257,628 @@ def _iter_rows_from_file(file_obj, filename: str, has_header: bool) -> Tuple[Ite
     return _csv_gen(), columns
 
 
+# ─────────────────────────────────────────────────────────
+# Row parsing (no DB access)
+# ─────────────────────────────────────────────────────────
+TIMELOG_VALUE_FIELDS = (
+    "time_in", "time_out", "ot_hours", "late_minutes", "undertime_minutes",
+    "is_rest_day", "is_absent", "holiday",
+)
 
-@transaction.atomic
-def import_timelogs(
-    file_obj,
-    filename: str,
-    options: Optional[ImportOptions] = None
-) -> ImportResult:
-    """
-    Import timelogs from CSV/Excel. Upserts by (employee, date).
-    """
-    opts = options or ImportOptions()
-    rows_iter, columns = _iter_rows_from_file(file_obj, filename, opts.has_header)
 
-    # Validate minimal columns
+@dataclass
+class ParsedRow:
+    """One input row with every column parsed; employee/holiday still unresolved."""
+    line: int
+    employee_key: object
+    date: date
+    time_in: Optional[time]
+    time_out: Optional[time]
+    ot_hours: Decimal
+    late_minutes: int
+    undertime_minutes: int
+    is_rest_day: bool
+    is_absent: bool
+    absent_given: bool
+    holiday_code: str = ""
+    holiday_name: str = ""
+
+
+def _employee_key(row: dict, employee_field: str):
+    if employee_field == "employee_id":
+        return int(row.get("employee_id"))
+    if employee_field == "employee_number":
+        return str(row.get("employee_number")).strip()
+    if employee_field == "email":
+        return str(row.get("email")).strip().lower()
+    raise ValueError("Unsupported employee_field")
+
+
+def _parse_date(raw_date, date_format: str) -> date:
+    # Date may be python date/datetime (Excel) or string
+    if isinstance(raw_date, datetime):
+        return (make_naive(raw_date) if is_aware(raw_date) else raw_date).date()
+    if isinstance(raw_date, date):
+        return raw_date
+    return datetime.strptime(str(raw_date).strip(), date_format).date()
+
+
+def _parse_row(row: dict, line: int, opts: ImportOptions) -> ParsedRow:
+    late_minutes = _parse_int(row.get("late_minutes"), opts.default_late_minutes)
+    undertime_minutes = _parse_int(row.get("undertime_minutes"), opts.default_undertime_minutes)
+    if late_minutes < 0 or undertime_minutes < 0:
+        raise ValueError("late_minutes and undertime_minutes must not be negative")
+    return ParsedRow(
+        line=line,
+        employee_key=_employee_key(row, opts.employee_field),
+        date=_parse_date(row.get("date"), opts.date_format),
+        time_in=_parse_time(row.get("time_in"), opts.time_format),
+        time_out=_parse_time(row.get("time_out"), opts.time_format),
+        ot_hours=_parse_decimal(row.get("ot_hours"), opts.default_ot_hours),
+        late_minutes=late_minutes,
+        undertime_minutes=undertime_minutes,
+        is_rest_day=_to_bool(row.get("is_rest_day")),
+        is_absent=_to_bool(row.get("is_absent")),
+        absent_given="is_absent" in row and str(row.get("is_absent") or "").strip() != "",
+        holiday_code=str(row.get("holiday_code") or "").strip(),
+        holiday_name=str(row.get("holiday_name") or "").strip(),
+    )
+
+
+def _timelog_values(p: ParsedRow, holiday: Optional[Holiday]) -> dict:
+    is_absent = p.is_absent
+    # If both time_in and time_out empty and not a rest day/holiday, consider absent
+    # (only when is_absent was not explicitly provided)
+    if p.time_in is None and p.time_out is None and not p.is_rest_day and holiday is None and not p.absent_given:
+        is_absent = True
+    return dict(
+        time_in=p.time_in,
+        time_out=p.time_out,
+        ot_hours=p.ot_hours,
+        late_minutes=p.late_minutes,
+        undertime_minutes=p.undertime_minutes,
+        is_rest_day=p.is_rest_day,
+        is_absent=is_absent,
+        holiday=holiday,
+    )
+
+
+def _validate_columns(columns: set) -> None:
     if not any(k in columns for k in ["employee_id", "employee_number", "email"]):
         raise ValueError("Missing one of required employee columns: employee_id | employee_number | email")
     if "date" not in columns:
         raise ValueError("Missing required column: date")
 
-    total = created = updated = skipped = 0
-    errors: list = []
 
+# ─────────────────────────────────────────────────────────
+# Set-based resolution (bulk mode): one IN query per chunk
+# ─────────────────────────────────────────────────────────
+def _resolve_employees(keys: set, employee_field: str) -> Dict[object, int]:
+    """Map employee key -> employee id for every key that exists."""
+    if not keys:
+        return {}
+    if employee_field == "employee_id":
+        return {pk: pk for pk in Employee.objects.filter(id__in=keys).order_by().values_list("id", flat=True)}
+    if employee_field == "email":
+        pairs = (
+            Employee.objects.order_by().annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=keys)
+            .values_list("email_lower", "id")
+        )
+        return dict(pairs)
+    # Any other key column must exist on Employee (same error as the row path otherwise)
+    return dict(Employee.objects.order_by().filter(**{f"{employee_field}__in": keys}).values_list(employee_field, "id"))
+
+
+def _resolve_holidays(names: set, days: Iterable[date]) -> Dict[str, List[Holiday]]:
+    """Map lower-cased holiday name -> holidays with that name in the years of `days` (holiday calendar)."""
+    years = {d.year for d in days}
+    if not names or not years:
+        return {}
+    calendar = get_calendar(min(years), max(years))
+    return {name: found for name in names if (found := calendar.named(name))}
+
+
+def _pick_holiday(code: str, name: str, day: date, by_name: Dict[str, List[Holiday]]) -> Optional[Holiday]:
+    if code:
+        raise ValueError("holiday_code is not supported; use holiday_name")
+    if not name:
+        return None
+    candidates = by_name.get(name.lower(), [])
+    # Recurring names (e.g. "New Year's Day") exist once per year: prefer the row's date
+    for h in candidates:
+        if h.date == day:
+            return h
+    if len(candidates) == 1:
+        return candidates[0]
+    if len(candidates) > 1:
+        raise ValueError(f"Multiple holidays named '{name}'")
+    return None
+
+
+def _chunks(rows_iter: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
     for row in rows_iter:
-        total += 1
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+ERRORS_KEPT_WITH_SINK = 100
+
+
+@dataclass
+class _Counts:
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    unchanged: int = 0
+    errors: list = field(default_factory=list)
+    preview: list = field(default_factory=list)
+    preview_limit: int = 0
+    progress: Optional[Callable[["_Counts"], None]] = None
+    error_sink: Optional[Callable[[int, str], None]] = None
+
+    def error(self, line: int, exc) -> None:
+        self.skipped += 1
+        if self.error_sink is not None:
+            # the sink gets every error; keep only a sample in memory
+            self.error_sink(line, str(exc))
+            if len(self.errors) < ERRORS_KEPT_WITH_SINK:
+                self.errors.append(f"Row {line}: {exc}")
+        else:
+            self.errors.append(f"Row {line}: {exc}")
+        self.add_preview({"row": line, "action": "error", "error": str(exc)})
+
+    def tick(self) -> None:
+        if self.progress is not None:
+            self.progress(self)
+
+    def add_preview(self, entry: dict) -> None:
+        if len(self.preview) < self.preview_limit:
+            self.preview.append(entry)
+
+
+def _write_chunk(
+    logs: Dict[Tuple[int, date], TimeLog],
+    members: Dict[Tuple[int, date], List[Tuple[int, bool]]],
+    counts: _Counts,
+) -> None:
+    """
+    Upsert a chunk on (employee, date). If the chunk is rejected by the database,
+    fall back to per-row writes so only the offending rows are reported.
+    `members` maps each key to the (line, was_created) pairs that produced it.
+    """
+    try:
+        with transaction.atomic():
+            TimeLog.objects.bulk_create(
+                list(logs.values()),
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=["employee", "date"],
+                update_fields=list(TIMELOG_VALUE_FIELDS) + ["import_hash"],
+            )
+        # bulk_create skips post_save: tell derived data (e.g. DailyAttendance) which days changed
+        timelogs_written.send(sender=TimeLog, keys=list(logs))
+        return
+    except DatabaseError:
+        pass
+
+    for key, obj in logs.items():
         try:
-            # Map basic fields
-            employee = _get_employee(row, opts.employee_field)
+            with transaction.atomic():
+                TimeLog.objects.update_or_create(
+                    employee_id=obj.employee_id,
+                    date=obj.date,
+                    defaults={f: getattr(obj, f) for f in TIMELOG_VALUE_FIELDS},
+                )
+        except DatabaseError as e:
+            for line, was_created in members[key]:
+                if was_created:
+                    counts.created -= 1
+                else:
+                    counts.updated -= 1
+                counts.error(line, e)
+
+
+def _parse_chunk(rows: List[dict], first_line: int, opts: ImportOptions) -> Tuple[List[ParsedRow], List[Tuple[int, str]]]:
+    """Parse one chunk of raw rows. Pure function, safe to run in a worker process."""
+    parsed: List[ParsedRow] = []
+    errors: List[Tuple[int, str]] = []
+    for offset, row in enumerate(rows):
+        line = first_line + offset
+        try:
+            parsed.append(_parse_row(row, line, opts))
+        except Exception as e:
+            errors.append((line, str(e)))
+    return parsed, errors
 
-            # Date may be python date, excel serial, or string
-            raw_date = row.get("date")
-            if isinstance(raw_date, datetime):
-                date_val = make_naive(raw_date).date()
-            elif hasattr(raw_date, "date") and callable(raw_date.date):
-                date_val = raw_date.date()
+
+def _init_parse_worker() -> None:
+    # Workers started with "spawn" import this module from scratch
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _parsed_chunks(
+    rows_iter: Iterable[dict], opts: ImportOptions, counts: _Counts
+) -> Iterator[List[ParsedRow]]:
+    """
+    Yield parsed chunks in file order. With opts.workers > 1, chunks (row ranges)
+    are parsed in a process pool while this process keeps reading the file; at
+    most 2 × workers chunks are in flight, so memory stays bounded.
+    Parse errors are recorded on `counts`.
+    """
+    size = max(1, opts.chunk_size)
+
+    def _consume(result) -> List[ParsedRow]:
+        parsed, errors = result
+        for line, message in errors:
+            counts.error(line, message)
+        return parsed
+
+    if opts.workers <= 1:
+        for chunk in _chunks(rows_iter, size):
+            first_line = counts.total + 1
+            counts.total += len(chunk)
+            yield _consume(_parse_chunk(chunk, first_line, opts))
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=opts.workers, initializer=_init_parse_worker) as pool:
+        pending = deque()
+        for chunk in _chunks(rows_iter, size):
+            first_line = counts.total + 1
+            counts.total += len(chunk)
+            pending.append(pool.submit(_parse_chunk, chunk, first_line, opts))
+            if len(pending) >= 2 * opts.workers:
+                yield _consume(pending.popleft().result())
+        while pending:
+            yield _consume(pending.popleft().result())
+
+
+# A resolved row, ready for the writer: (line, employee id, date, TimeLog field values)
+ResolvedRow = Tuple[int, int, date, dict]
+
+
+def _resolved_chunks(
+    rows_iter: Iterable[dict], opts: ImportOptions, counts: _Counts
+) -> Iterator[List[ResolvedRow]]:
+    """
+    Resolve employees/holidays for each parsed chunk with one IN query each.
+    Yields (line, employee id, date, TimeLog field values) for every row that
+    resolved; rows that did not are recorded as errors on `counts`.
+    """
+    for parsed in _parsed_chunks(rows_iter, opts, counts):
+        try:
+            employees = _resolve_employees({p.employee_key for p in parsed}, opts.employee_field)
+        except Exception as e:
+            for p in parsed:
+                counts.error(p.line, e)
+            continue
+        holidays = _resolve_holidays(
+            {p.holiday_name.lower() for p in parsed if p.holiday_name},
+            {p.date for p in parsed if p.holiday_name},
+        )
+
+        resolved = []
+        for p in parsed:
+            try:
+                emp_id = employees.get(p.employee_key)
+                if emp_id is None:
+                    raise Employee.DoesNotExist("Employee matching query does not exist.")
+                holiday = _pick_holiday(p.holiday_code, p.holiday_name, p.date, holidays)
+            except Exception as e:
+                counts.error(p.line, e)
+                continue
+            resolved.append((p.line, emp_id, p.date, _timelog_values(p, holiday)))
+        if resolved:
+            yield resolved
+
+
+def _import_bulk(chunks: Iterable[List[ResolvedRow]], counts: _Counts) -> None:
+    for resolved in chunks:
+        # Stored hashes decide created / updated / unchanged; unchanged rows are not written
+        stored = {
+            (emp_id, day): digest
+            for emp_id, day, digest in TimeLog.objects
+            .filter(employee_id__in={r[1] for r in resolved}, date__in={r[2] for r in resolved})
+            .values_list("employee_id", "date", "import_hash")
+        }
+
+        logs: Dict[Tuple[int, date], TimeLog] = {}
+        members: Dict[Tuple[int, date], List[Tuple[int, bool]]] = {}
+        staged: Dict[Tuple[int, date], str] = {}  # hash each key will hold after this chunk
+        for line, emp_id, day, values in resolved:
+            key = (emp_id, day)
+            digest = timelog_content_hash(values)
+            # A repeated key within the file is compared with its earlier occurrence
+            current = staged.get(key, stored.get(key))
+            staged[key] = digest
+            if current == digest:
+                counts.unchanged += 1
+                continue
+            was_created = current is None
+            logs[key] = TimeLog(employee_id=emp_id, date=day, import_hash=digest, **values)  # last row wins
+            members.setdefault(key, []).append((line, was_created))
+            if was_created:
+                counts.created += 1
             else:
-                date_val = datetime.strptime(str(raw_date).strip(), opts.date_format).date()
-
-            time_in = _parse_time(row.get("time_in"), opts.time_format)
-            time_out = _parse_time(row.get("time_out"), opts.time_format)
-
-            ot_hours = _parse_decimal(row.get("ot_hours"), opts.default_ot_hours)
-            late_minutes = _parse_int(row.get("late_minutes"), opts.default_late_minutes)
-            undertime_minutes = _parse_int(row.get("undertime_minutes"), opts.default_undertime_minutes)
-            is_rest_day = _to_bool(row.get("is_rest_day"))
-            is_absent = _to_bool(row.get("is_absent"))
-            holiday = _get_holiday(row)
-
-            # If both time_in and time_out empty and not a rest day/holiday, you may consider absent
-            if time_in is None and time_out is None and not is_rest_day and holiday is None:
-                # Only set absent if not explicitly provided
-                if "is_absent" not in row or str(row.get("is_absent")).strip() == "":
-                    is_absent = True
-
-            # Upsert by unique key (employee, date)
-            obj, was_created = TimeLog.objects.update_or_create(
-                employee=employee,
-                date=date_val,
-                defaults=dict(
-                    time_in=time_in,
-                    time_out=time_out,
-                    ot_hours=ot_hours,
-                    late_minutes=late_minutes,
-                    undertime_minutes=undertime_minutes,
-                    is_rest_day=is_rest_day,
-                    is_absent=is_absent,
-                    holiday=holiday,
-                ),
-            )
+                counts.updated += 1
+
+        if logs:
+            _write_chunk(logs, members, counts)
+        counts.tick()
+
+
+# ─────────────────────────────────────────────────────────
+# Validation only (dry run): no writes, diff against stored rows
+# ─────────────────────────────────────────────────────────
+COMPARE_FIELDS = tuple("holiday_id" if f == "holiday" else f for f in TIMELOG_VALUE_FIELDS)
+
+
+def _comparable(values: dict) -> tuple:
+    holiday = values["holiday"]
+    return tuple(
+        (holiday.id if holiday else None) if f == "holiday_id" else values[f]
+        for f in COMPARE_FIELDS
+    )
+
+
+def _preview_value(v):
+    return v.isoformat() if hasattr(v, "isoformat") else (str(v) if isinstance(v, Decimal) else v)
+
+
+def _validate_rows(chunks: Iterable[List[ResolvedRow]], counts: _Counts) -> None:
+    """
+    Classify every row as create / update / unchanged / error against the stored
+    TimeLogs without writing anything. Rows repeated within the file are compared
+    with the value the earlier occurrence would have written.
+    """
+    staged: Dict[Tuple[int, date], tuple] = {}  # keys seen in this file -> values they would leave behind
+    for resolved in chunks:
+        stored = {
+            (row[0], row[1]): tuple(row[2:])
+            for row in TimeLog.objects
+            .filter(employee_id__in={r[1] for r in resolved}, date__in={r[2] for r in resolved})
+            .values_list("employee_id", "date", *COMPARE_FIELDS)
+        }
+
+        for line, emp_id, day, values in resolved:
+            key = (emp_id, day)
+            new = _comparable(values)
+            old = staged.get(key, stored.get(key))
+            staged[key] = new
+
+            entry = {"row": line, "employee_id": emp_id, "date": day.isoformat()}
+            if old is None:
+                counts.created += 1
+                entry["action"] = "create"
+            elif old == new:
+                counts.unchanged += 1
+                entry["action"] = "unchanged"
+            else:
+                counts.updated += 1
+                entry["action"] = "update"
+                entry["changes"] = {
+                    f: [_preview_value(o), _preview_value(n)]
+                    for f, o, n in zip(COMPARE_FIELDS, old, new) if o != n
+                }
+            counts.add_preview(entry)
+        counts.tick()
 
-            if opts.dry_run:
-                # Rollback at the end by raising to trigger atomic rollback
-                pass
 
-            created += 1 if was_created else 0
-            updated += 0 if was_created else 1
+def _import_rows(rows_iter: Iterable[dict], opts: ImportOptions, counts: _Counts) -> None:
+    for row in rows_iter:
+        counts.total += 1
+        try:
+            p = _parse_row(row, counts.total, opts)
+            employee = _get_employee(row, opts.employee_field)
+            by_name = _resolve_holidays({p.holiday_name.lower()}, {p.date}) if p.holiday_name else {}
+            holiday = _pick_holiday(p.holiday_code, p.holiday_name, p.date, by_name)
+            values = _timelog_values(p, holiday)
+
+            # Same content as stored → nothing to write
+            stored = TimeLog.objects.filter(employee=employee, date=p.date).values_list("import_hash", flat=True).first()
+            if stored == timelog_content_hash(values):
+                counts.unchanged += 1
+            else:
+                # Upsert by unique key (employee, date)
+                _obj, was_created = TimeLog.objects.update_or_create(
+                    employee=employee,
+                    date=p.date,
+                    defaults=values,
+                )
+                counts.created += 1 if was_created else 0
+                counts.updated += 0 if was_created else 1
 
         except Exception as e:
-            skipped += 1
-            errors.append(f"Row {total}: {e}")
+            counts.error(counts.total, e)
+
+        if counts.total % max(1, opts.chunk_size) == 0:
+            counts.tick()
+
+
+def import_timelogs(
+    file_obj,
+    filename: str,
+    options: Optional[ImportOptions] = None,
+    *,
+    atomic: bool = True,
+    progress: Optional[Callable[[_Counts], None]] = None,
+    error_sink: Optional[Callable[[int, str], None]] = None,
+) -> ImportResult:
+    """
+    Import timelogs from CSV/Excel. Upserts by (employee, date).
+
+    mode="row"  : one lookup + update_or_create per row.
+    mode="bulk" : rows are parsed in chunks of `chunk_size`; each chunk resolves
+                  employees/holidays with one IN query each and is written with
+                  a single INSERT ... ON CONFLICT (employee, date) DO UPDATE.
+    Both modes report the same created/updated/unchanged/skipped counts; rows
+    whose content hash matches TimeLog.import_hash are counted as unchanged
+    and not written at all.
+
+    workers > 1 (bulk mode and dry runs) parses row-range chunks in a process
+    pool; resolution and writes stay in this process, in file order.
+
+    engine="pandas" parses whole columns at once (always written in bulk);
+    see timekeeping.importers.columnar.
+
+    dry_run=True never writes: rows are validated and diffed against the stored
+    TimeLogs (create / update / unchanged / error), see `ImportResult.preview`.
+
+    Background jobs pass atomic=False (each chunk commits on its own, so
+    progress is visible to other connections), a `progress` callback invoked
+    after every chunk, and an `error_sink` that receives every (row, message);
+    with a sink, `ImportResult.errors` only keeps the first 100.
+    """
+    if atomic:
+        with transaction.atomic():
+            return _import_timelogs(file_obj, filename, options, progress, error_sink, atomic)
+    return _import_timelogs(file_obj, filename, options, progress, error_sink, atomic)
+
+
+def _import_timelogs(file_obj, filename, options, progress, error_sink, atomic) -> ImportResult:
+    opts = options or ImportOptions()
+    started = _time.perf_counter()
+    counts = _Counts(
+        preview_limit=opts.preview_limit if opts.dry_run else 0,
+        progress=progress,
+        error_sink=error_sink,
+    )
+
+    if opts.engine == "pandas":
+        from timekeeping.importers.columnar import resolved_chunks
+        chunks = resolved_chunks(file_obj, filename, opts, counts)
+    else:
+        rows_iter, columns = _iter_rows_from_file(file_obj, filename, opts.has_header, opts.block_size)
+        _validate_columns(columns)
+        if opts.mode == "row" and not opts.dry_run:
+            _import_rows(rows_iter, opts, counts)
+            chunks = iter(())
+        else:
+            chunks = _resolved_chunks(rows_iter, opts, counts)
 
     if opts.dry_run:
-        # force rollback of everything in this atomic block
-        transaction.set_rollback(True)
+        _validate_rows(chunks, counts)
+        if atomic:
+            # nothing was written; make sure nothing ever could be
+            transaction.set_rollback(True)
+    else:
+        _import_bulk(chunks, counts)
+    counts.tick()
+
+    return ImportResult(
+        total_rows=counts.total,
+        created=counts.created,
+        updated=counts.updated,
+        skipped=counts.skipped,
+        errors=counts.errors,
+        unchanged=counts.unchanged,
+        preview=sorted(counts.preview, key=lambda e: e["row"]),
+        elapsed_seconds=round(_time.perf_counter() - started, 3),
+    )
+
+
+# ─────────────────────────────────────────────────────────
+# Decoded rows (JSON API): validate everything, then write in bulk
+# ─────────────────────────────────────────────────────────
+# What the bulk endpoint takes (TimeLogSerializer's writable fields). Other
+# columns keep their stored value, or the model default for a new log; there
+# is no absence inference.
+API_VALUE_FIELDS = ("time_in", "time_out")
+
+
+def _stored_values(keys: set) -> Dict[Tuple[int, date], dict]:
+    """TIMELOG_VALUE_FIELDS (holiday as holiday_id) of the stored logs among these (employee, date) keys."""
+    if not keys:
+        return {}
+    return {
+        (row[0], row[1]): dict(zip(COMPARE_FIELDS, row[2:]))
+        for row in TimeLog.objects
+        .filter(employee_id__in={k[0] for k in keys}, date__in={k[1] for k in keys})
+        .values_list("employee_id", "date", *COMPARE_FIELDS)
+    }
+
+
+def upsert_timelog_rows(rows: List[dict], options: Optional[ImportOptions] = None) -> ImportResult:
+    """
+    Upsert rows that are already decoded (e.g. a JSON payload; "employee" is
+    accepted as the employee_id column). Only "date" and API_VALUE_FIELDS are
+    read; a row updates just those on an existing log.
+
+    All-or-nothing: every row is parsed and every employee is resolved with
+    one IN query before anything is written. If any row fails, nothing is
+    written and the result only carries the errors; otherwise rows go through
+    the bulk writer (same created / updated / unchanged counts as a bulk
+    import) and `ids` lists the TimeLog ids in input order.
+    """
+    opts = options or ImportOptions(time_format="%H:%M:%S")
+    started = _time.perf_counter()
+    counts = _Counts()
+    counts.total = len(rows)
+
+    parsed: List[ParsedRow] = []
+    for line, row in enumerate(rows, start=1):
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("Expected an object")
+            if "employee" in row and opts.employee_field not in row:
+                row = {**row, opts.employee_field: row["employee"]}
+            row = {k: row.get(k) for k in (opts.employee_field, "date", *API_VALUE_FIELDS)}
+            parsed.append(_parse_row(row, line, opts))
+        except Exception as e:
+            counts.error(line, e)
+
+    employees = _resolve_employees({p.employee_key for p in parsed}, opts.employee_field)
+    keyed: List[Tuple[int, int, ParsedRow]] = []
+    for p in parsed:
+        emp_id = employees.get(p.employee_key)
+        if emp_id is None:
+            counts.error(p.line, Employee.DoesNotExist("Employee matching query does not exist."))
+            continue
+        keyed.append((p.line, emp_id, p))
+
+    stored = _stored_values({(emp_id, p.date) for _, emp_id, p in keyed})
+    defaults = {
+        f: TimeLog._meta.get_field("holiday" if f == "holiday_id" else f).get_default() for f in COMPARE_FIELDS
+    }
+    resolved: List[ResolvedRow] = []
+    for line, emp_id, p in keyed:
+        values = dict(stored.get((emp_id, p.date), defaults))
+        values.update({f: getattr(p, f) for f in API_VALUE_FIELDS})
+        resolved.append((line, emp_id, p.date, values))
+
+    ids: list = []
+    if not counts.errors:
+        size = max(1, opts.chunk_size)
+        with transaction.atomic():
+            _import_bulk((resolved[i:i + size] for i in range(0, len(resolved), size)), counts)
+        keys = list(dict.fromkeys((emp_id, day) for _, emp_id, day, _ in resolved))
+        stored = {
+            (emp_id, day): pk
+            for pk, emp_id, day in TimeLog.objects
+            .filter(employee_id__in={k[0] for k in keys}, date__in={k[1] for k in keys})
+            .values_list("id", "employee_id", "date")
+        }
+        ids = [stored[k] for k in keys if k in stored]
 
     return ImportResult(
-        total_rows=total,
-        created=created,
-        updated=updated,
-        skipped=skipped,
-        errors=errors,
+        total_rows=counts.total,
+        created=counts.created,
+        updated=counts.updated,
+        skipped=counts.skipped,
+        errors=counts.errors,
+        unchanged=counts.unchanged,
+        elapsed_seconds=round(_time.perf_counter() - started, 3),
+        ids=ids,
     )
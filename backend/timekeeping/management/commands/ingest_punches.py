@@ -0,0 +1,36 @@
+# timekeeping/management/commands/ingest_punches.py
+from django.core.management.base import BaseCommand, CommandError
+
+from timekeeping.importers.punches import PunchIngestOptions, ingest_punches
+from timekeeping.services.punch_pairing import pair_punches
+
+
+class Command(BaseCommand):
+    help = "Append raw punches from device dumps (CSV or ZKTeco attlog .dat), then pair them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", help="Dump files to ingest")
+        parser.add_argument("--employee-field", default="employee_id", choices=["employee_id", "email"])
+        parser.add_argument("--device-id", default="", help="Device id stamped on rows without one")
+        parser.add_argument("--no-pair", action="store_true", help="Only ingest; pair later with pair_punches")
+
+    def handle(self, *args, **opts):
+        for path in opts["files"]:
+            options = PunchIngestOptions(employee_field=opts["employee_field"], device_id=opts["device_id"])
+            try:
+                with open(path, "rb") as fh:
+                    result = ingest_punches(fh, path, options=options)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"{path}: {e}")
+            self.stdout.write(
+                f"{path}: {result.inserted} new, {result.duplicates} duplicate, {result.skipped} skipped"
+            )
+            for err in result.errors[:20]:
+                self.stdout.write(self.style.WARNING(f"  {err}"))
+
+        if not opts["no_pair"]:
+            paired = pair_punches()
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Paired {paired.punches} punches: {paired.created} created, "
+                f"{paired.updated} updated, {paired.unchanged} unchanged"
+            ))
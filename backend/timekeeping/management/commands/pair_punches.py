@@ -0,0 +1,28 @@
+# timekeeping/management/commands/pair_punches.py
+from django.core.management.base import BaseCommand
+
+from timekeeping.services.punch_pairing import PairingOptions, pair_punches
+
+
+class Command(BaseCommand):
+    help = "Fold punches that have not been paired yet into TimeLogs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dedupe-seconds", type=int, default=120)
+        parser.add_argument("--max-shift-hours", type=int, default=16)
+        parser.add_argument("--break-gap-hours", type=int, default=4)
+        parser.add_argument("--max-batches", type=int, default=None)
+
+    def handle(self, *args, **opts):
+        options = PairingOptions(
+            batch_size=opts["batch_size"],
+            dedupe_seconds=opts["dedupe_seconds"],
+            max_shift_hours=opts["max_shift_hours"],
+            break_gap_hours=opts["break_gap_hours"],
+        )
+        result = pair_punches(options, max_batches=opts["max_batches"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Paired {result.punches} punches in {result.batches} batch(es): "
+            f"{result.created} created, {result.updated} updated, {result.unchanged} unchanged"
+        ))
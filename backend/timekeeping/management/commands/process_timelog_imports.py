@@ -0,0 +1,29 @@
+# timekeeping/management/commands/process_timelog_imports.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from timekeeping.importers.jobs import process_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued timelog import jobs. Polls forever unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds between polls when idle")
+        parser.add_argument("--max-jobs", type=int, default=None, help="Stop after this many jobs")
+
+    def handle(self, *args, **opts):
+        total = 0
+        while True:
+            remaining = None if opts["max_jobs"] is None else opts["max_jobs"] - total
+            ran = process_pending(max_jobs=remaining)
+            total += ran
+            if ran:
+                self.stdout.write(f"Processed {ran} import job(s)")
+            if opts["once"] or (opts["max_jobs"] is not None and total >= opts["max_jobs"]):
+                break
+            if not ran:
+                time.sleep(opts["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Import jobs processed: {total}"))
@@ -0,0 +1,66 @@
+# timekeeping/management/commands/reconcile_timelog_duplicates.py
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from timekeeping.models import TimeLog
+
+
+class Command(BaseCommand):
+    help = (
+        "List (employee, date) pairs with more than one TimeLog, which block "
+        "timekeeping migration 0003. With --apply, keep one log per pair and delete "
+        "the others after writing them to --export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep", choices=("newest", "oldest"), default="newest",
+                            help="Which log of a pair survives (by id). Default: newest.")
+        parser.add_argument("--apply", action="store_true", help="Delete the other logs (default: report only).")
+        parser.add_argument("--export", help="CSV file receiving every deleted row; required with --apply.")
+
+    def handle(self, *args, **opts):
+        if opts["apply"] and not opts["export"]:
+            raise CommandError("--apply needs --export so the deleted logs are kept somewhere.")
+        # plain SQL: this runs before the migrations that add the later TimeLog columns
+        table = connection.ops.quote_name(TimeLog._meta.db_table)
+        keep = "MAX(id)" if opts["keep"] == "newest" else "MIN(id)"
+
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.execute(
+                f"SELECT employee_id, date, COUNT(*), {keep} FROM {table} "
+                f"GROUP BY employee_id, date HAVING COUNT(*) > 1 ORDER BY employee_id, date"
+            )
+            groups = cur.fetchall()
+            if not groups:
+                self.stdout.write(self.style.SUCCESS("✅ No duplicate TimeLogs."))
+                return
+            for employee_id, day, count, kept in groups:
+                self.stdout.write(f"employee {employee_id} on {day}: {count} logs, keeping id {kept}")
+            if not opts["apply"]:
+                self.stdout.write(self.style.WARNING(
+                    f"{len(groups)} duplicate pair(s); nothing changed. Re-run with --apply --export FILE."
+                ))
+                return
+
+            cur.execute(
+                f"SELECT t.* FROM {table} t JOIN ("
+                f"  SELECT employee_id, date, {keep} AS kept FROM {table} GROUP BY employee_id, date HAVING COUNT(*) > 1"
+                f") d ON t.employee_id = d.employee_id AND t.date = d.date "
+                f"WHERE t.id <> d.kept ORDER BY t.id"
+            )
+            columns = [c[0] for c in cur.description]
+            rows = cur.fetchall()
+            with open(opts["export"], "w", newline="", encoding="utf-8") as fh:
+                writer = csv.writer(fh)
+                writer.writerow(columns)
+                writer.writerows(rows)
+            ids = [r[columns.index("id")] for r in rows]
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                cur.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Deleted {len(ids)} duplicate TimeLog(s) across {len(groups)} pair(s); rows saved to {opts['export']}."
+        ))
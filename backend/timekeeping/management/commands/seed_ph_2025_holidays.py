@@ -64,6 +64,7 @@ class Command(BaseCommand):
             for name, d, htype in HOLIDAYS_2025:
                 obj, was_created = Holiday.objects.update_or_create(
                     date=d,
+                    branch=None,
                     defaults={
                         "name": name,
                         "type": htype,
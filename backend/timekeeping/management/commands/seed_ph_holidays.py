@@ -0,0 +1,26 @@
+# timekeeping/management/commands/seed_ph_holidays.py
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from timekeeping.services.ph_holidays import seed_ph_holidays
+
+
+class Command(BaseCommand):
+    help = "Seed Philippine holidays for a range of years from the bundled rules (offline, idempotent)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", type=int, default=None, help="First year (default: this year)")
+        parser.add_argument("--to", dest="end", type=int, default=None, help="Last year (default: first year + 9)")
+        parser.add_argument("--refresh", action="store_true", help="Also merge dates from the online holiday API")
+
+    def handle(self, *args, **opts):
+        start = opts["start"] or timezone.localdate().year
+        end = opts["end"] or start + 9
+        try:
+            result = seed_ph_holidays(start, end, refresh=opts["refresh"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Seeded Philippine holidays {start}-{end} (rules {result['dataset_version']}). "
+            f"Created: {len(result['created_dates'])}, Skipped: {len(result['skipped_existing_dates'])}"
+        ))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:36
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_employee_days(apps, schema_editor):
+    """
+    The unique constraint needs one TimeLog per (employee, date). Duplicates
+    are payroll inputs, so they are reported instead of being dropped here:
+    reconcile them with `manage.py reconcile_timelog_duplicates` and migrate again.
+    """
+    TimeLog = apps.get_model("timekeeping", "TimeLog")
+    dupes = (
+        TimeLog.objects.values("employee_id", "date")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .order_by("employee_id", "date")
+    )
+    total = dupes.count()
+    if not total:
+        return
+    listed = ", ".join(f"employee {d['employee_id']} on {d['date']} ({d['n']} logs)" for d in dupes[:20])
+    more = f" and {total - 20} more" if total > 20 else ""
+    raise RuntimeError(
+        f"{total} (employee, date) pairs have more than one TimeLog: {listed}{more}. "
+        "Run `python manage.py reconcile_timelog_duplicates` to review and resolve them, then migrate again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0009_delete_workschedulepolicy'),
+        ('timekeeping', '0002_holiday_multiplier'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_employee_days, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='timelog',
+            index=models.Index(fields=['date'], name='timelog_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelog',
+            constraint=models.UniqueConstraint(fields=('employee', 'date'), name='uniq_timelog_employee_date'),
+        ),
+    ]
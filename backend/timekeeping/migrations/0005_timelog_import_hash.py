@@ -0,0 +1,54 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:54
+
+import hashlib
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# Frozen copies of timekeeping.models.TIMELOG_HASHED_FIELDS and
+# timelog_content_hash as of this migration, so later edits to the model
+# module cannot change what this backfill writes.
+TIMELOG_HASHED_FIELDS = (
+    "time_in", "time_out", "ot_hours", "late_minutes", "undertime_minutes",
+    "is_rest_day", "is_absent", "holiday_id",
+)
+
+
+def timelog_content_hash(values):
+    parts = []
+    for name in TIMELOG_HASHED_FIELDS:
+        v = values.get(name)
+        if name == "ot_hours":
+            v = Decimal(v or 0).quantize(Decimal("0.01"))
+        parts.append("" if v is None else (v.isoformat() if hasattr(v, "isoformat") else str(v)))
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def backfill_import_hash(apps, schema_editor):
+    """Hash existing rows so the first re-import of old data is already write-free."""
+    TimeLog = apps.get_model("timekeeping", "TimeLog")
+    batch = []
+    for log in TimeLog.objects.only("id", *TIMELOG_HASHED_FIELDS).iterator(chunk_size=2000):
+        log.import_hash = timelog_content_hash({f: getattr(log, f) for f in TIMELOG_HASHED_FIELDS})
+        batch.append(log)
+        if len(batch) >= 2000:
+            TimeLog.objects.bulk_update(batch, ["import_hash"])
+            batch = []
+    if batch:
+        TimeLog.objects.bulk_update(batch, ["import_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timekeeping', '0004_timelog_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timelog',
+            name='import_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.RunPython(backfill_import_hash, migrations.RunPython.noop),
+    ]
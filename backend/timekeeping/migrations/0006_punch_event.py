@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 07:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0009_delete_workschedulepolicy'),
+        ('timekeeping', '0005_timelog_import_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PunchEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('punched_at', models.DateTimeField()),
+                ('direction', models.CharField(blank=True, choices=[('IN', 'In'), ('OUT', 'Out'), ('', 'Unknown')], default='', max_length=3)),
+                ('device_id', models.CharField(blank=True, default='', max_length=50)),
+                ('source', models.CharField(blank=True, default='', max_length=10)),
+                ('ingested_at', models.DateTimeField(auto_now_add=True)),
+                ('paired_at', models.DateTimeField(blank=True, null=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='punches', to='employees.employee')),
+            ],
+            options={
+                'ordering': ['employee_id', 'punched_at'],
+                'indexes': [models.Index(condition=models.Q(('paired_at__isnull', True)), fields=['employee', 'punched_at'], name='punch_unpaired_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'punched_at'), name='uniq_punch_employee_time')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organization', '0003_workschedulepolicy'),
+        ('timekeeping', '0006_punch_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='holiday',
+            name='branch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='organization.branch'),
+        ),
+        migrations.AlterField(
+            model_name='holiday',
+            name='date',
+            field=models.DateField(),
+        ),
+        migrations.AddConstraint(
+            model_name='holiday',
+            constraint=models.UniqueConstraint(condition=models.Q(('branch__isnull', True)), fields=('date',), name='uniq_holiday_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='holiday',
+            constraint=models.UniqueConstraint(condition=models.Q(('branch__isnull', False)), fields=('branch', 'date'), name='uniq_holiday_branch_date'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0009_delete_workschedulepolicy'),
+        ('timekeeping', '0007_holiday_branch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('worked_minutes', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('late_minutes', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('undertime_minutes', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('ot_minutes', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('rest_ot_minutes', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('holiday_premium_minutes', models.DecimalField(decimal_places=3, default=0, max_digits=9)),
+                ('is_rest_day', models.BooleanField(default=False)),
+                ('is_holiday', models.BooleanField(default=False)),
+                ('is_absent', models.BooleanField(default=False)),
+                ('timelog_hash', models.CharField(blank=True, default='', max_length=32)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance', to='employees.employee')),
+                ('holiday', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='timekeeping.holiday')),
+                ('timelog', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='attendance', to='timekeeping.timelog')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['employee', 'date'], name='attendance_employee_date_idx')],
+            },
+        ),
+    ]
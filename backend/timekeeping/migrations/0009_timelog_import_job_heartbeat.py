@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timekeeping', '0008_daily_attendance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timelogimportjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='timelogimportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
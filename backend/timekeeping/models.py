@@ -1,3 +1,6 @@
+import hashlib
+
+from django.conf import settings
 from django.db import models
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -13,15 +16,55 @@ class Holiday(models.Model):
     ]
 
     name = models.CharField(max_length=100)
-    date = models.DateField(unique=True)
+    date = models.DateField()
     type = models.CharField(max_length=10, choices=HOLIDAY_TYPES)
     multiplier = models.DecimalField(default=2.0, max_digits=4, decimal_places=2)
     is_national = models.BooleanField(default=True)  # Optional: future local holidays
+    # Local holidays (e.g. a city's charter day) apply to one branch only
+    branch = models.ForeignKey(
+        'organization.Branch', null=True, blank=True, on_delete=models.CASCADE, related_name='holidays',
+    )
+
+    class Meta:
+        constraints = [
+            # One nationwide holiday per date, and one local holiday per branch-date
+            models.UniqueConstraint(
+                fields=['date'], condition=models.Q(branch__isnull=True), name='uniq_holiday_date',
+            ),
+            models.UniqueConstraint(
+                fields=['branch', 'date'], condition=models.Q(branch__isnull=False), name='uniq_holiday_branch_date',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.date} ({self.get_type_display()})"
 
 
+# Fields an import can set; their canonical form is hashed into TimeLog.import_hash
+TIMELOG_HASHED_FIELDS = (
+    "time_in", "time_out", "ot_hours", "late_minutes", "undertime_minutes",
+    "is_rest_day", "is_absent", "holiday_id",
+)
+
+
+def timelog_content_hash(values: dict) -> str:
+    """
+    Stable digest of a TimeLog's imported fields. `values` maps TIMELOG_HASHED_FIELDS
+    (or "holiday" as an instance) to Python values; ot_hours is normalized to
+    the stored 2 decimal places so "1.5" and "1.50" hash alike.
+    """
+    if "holiday_id" not in values and "holiday" in values:
+        holiday = values["holiday"]
+        values = {**values, "holiday_id": holiday.pk if holiday else None}
+    parts = []
+    for name in TIMELOG_HASHED_FIELDS:
+        v = values.get(name)
+        if name == "ot_hours":
+            v = Decimal(v or 0).quantize(Decimal("0.01"))
+        parts.append("" if v is None else (v.isoformat() if hasattr(v, "isoformat") else str(v)))
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
 class TimeLog(models.Model):
     employee = models.ForeignKey('employees.Employee', on_delete=models.CASCADE)
     date = models.DateField()
@@ -34,10 +77,33 @@ class TimeLog(models.Model):
     is_rest_day = models.BooleanField(default=False)
     is_absent = models.BooleanField(default=False)
     holiday = models.ForeignKey('timekeeping.Holiday', null=True, blank=True, on_delete=models.SET_NULL)
+    # Digest of the fields above; lets re-imports skip rows that did not change
+    import_hash = models.CharField(max_length=32, blank=True, default="", editable=False)
+
+    class Meta:
+        constraints = [
+            # One log per employee-day; importers upsert on this key
+            models.UniqueConstraint(
+                fields=["employee", "date"],
+                name="uniq_timelog_employee_date",
+            )
+        ]
+        indexes = [
+            # Cutoff / export scans across all employees
+            models.Index(fields=["date"], name="timelog_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.employee} - {self.date}"
-    
+
+    def save(self, *args, **kwargs):
+        # Keep the hash in sync with whatever wrote the row (API, admin, importer)
+        self.import_hash = timelog_content_hash({f: getattr(self, f) for f in TIMELOG_HASHED_FIELDS})
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "import_hash" not in update_fields:
+            kwargs["update_fields"] = list(update_fields) + ["import_hash"]
+        super().save(*args, **kwargs)
+
     def duration_hours(self):
         if self.time_in and self.time_out:
             t_in = datetime.combine(self.date, self.time_in)
@@ -49,4 +115,140 @@ class TimeLog(models.Model):
 
             hours = Decimal(t_out.timestamp() - t_in.timestamp()) / Decimal(3600)
             return round(hours, 2)
-        return Decimal("0.00")
\ No newline at end of file
+        return Decimal("0.00")
+
+class DailyAttendance(models.Model):
+    """
+    A TimeLog as analyzed for payroll (late, undertime, OT, rest-day / holiday
+    premiums), one row per log. Kept in sync by payroll.services.attendance;
+    payroll sums these over a cutoff instead of re-analyzing every log.
+    Minutes are decimal: the analyzer works in 0.01 minute / 0.01 hour steps.
+    """
+    timelog = models.OneToOneField(TimeLog, on_delete=models.CASCADE, related_name='attendance')
+    employee = models.ForeignKey('employees.Employee', on_delete=models.CASCADE, related_name='attendance')
+    date = models.DateField()
+
+    worked_minutes = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    late_minutes = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    undertime_minutes = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    ot_minutes = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    rest_ot_minutes = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    # worked minutes weighted by (holiday multiplier - 1): the premium in "regular minutes"
+    holiday_premium_minutes = models.DecimalField(max_digits=9, decimal_places=3, default=0)
+
+    is_rest_day = models.BooleanField(default=False)
+    is_holiday = models.BooleanField(default=False)
+    is_absent = models.BooleanField(default=False)
+    holiday = models.ForeignKey(Holiday, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+
+    # TimeLog.import_hash this row was computed from; a mismatch means stale
+    timelog_hash = models.CharField(max_length=32, blank=True, default="")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['employee', 'date'], name='attendance_employee_date_idx')]
+
+    def __str__(self):
+        return f"{self.employee} {self.date}"
+
+
+class PunchEvent(models.Model):
+    """
+    Raw clock punch as emitted by a biometric device (append-only).
+    Re-ingesting a dump is idempotent: (employee, punched_at) is unique.
+    `paired_at` is set once the pairing job has folded the punch into a TimeLog.
+    """
+    IN = 'IN'
+    OUT = 'OUT'
+    UNKNOWN = ''
+
+    DIRECTION_CHOICES = [
+        (IN, 'In'),
+        (OUT, 'Out'),
+        (UNKNOWN, 'Unknown'),
+    ]
+
+    employee = models.ForeignKey('employees.Employee', on_delete=models.CASCADE, related_name='punches')
+    punched_at = models.DateTimeField()
+    direction = models.CharField(max_length=3, choices=DIRECTION_CHOICES, blank=True, default=UNKNOWN)
+    device_id = models.CharField(max_length=50, blank=True, default="")
+    source = models.CharField(max_length=10, blank=True, default="")  # "csv" | "dat"
+    ingested_at = models.DateTimeField(auto_now_add=True)
+    paired_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['employee_id', 'punched_at']
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'punched_at'], name='uniq_punch_employee_time'),
+        ]
+        indexes = [
+            # the pairing job only ever scans punches it has not seen yet
+            models.Index(
+                fields=['employee', 'punched_at'],
+                condition=models.Q(paired_at__isnull=True),
+                name='punch_unpaired_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} {self.direction or '?'} {self.punched_at}"
+
+
+class TimeLogImportJob(models.Model):
+    """
+    A stored upload processed by `manage.py process_timelog_imports`.
+    Progress counters are refreshed after every chunk; the full per-row
+    error report is written to `errors_file` as CSV (row, error).
+    """
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    file = models.FileField(upload_to='timelog_imports/%Y/%m/')
+    filename = models.CharField(max_length=255)
+    options = models.JSONField(default=dict, blank=True)  # ImportOptions fields
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+
+    estimated_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    unchanged_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    rows_per_second = models.FloatField(default=0)
+    errors_file = models.FileField(upload_to='timelog_imports/errors/', blank=True)
+    message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed with progress while RUNNING; a stale one means the worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # worker polls for the oldest pending job
+            models.Index(fields=['status', 'id'], name='timelog_import_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Import #{self.pk} {self.filename} ({self.status})"
+
+    @property
+    def percent_complete(self) -> float:
+        if self.status == self.DONE:
+            return 100.0
+        if not self.estimated_rows:
+            return 0.0
+        return round(min(99.0, 100.0 * self.processed_rows / self.estimated_rows), 1)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from timekeeping.models import TimeLog, Holiday
+from rest_framework.reverse import reverse
+from timekeeping.models import TimeLog, Holiday, TimeLogImportJob
 from common.constants import (
     PH_DEFAULT_MULTIPLIERS,
 )
@@ -51,3 +52,35 @@ class TimeLogImportSerializer(serializers.Serializer):
     time_format = serializers.CharField(required=False, default="%H:%M")
     has_header = serializers.BooleanField(required=False, default=True)
     dry_run = serializers.BooleanField(required=False, default=False)
+    mode = serializers.ChoiceField(choices=["row", "bulk"], required=False, default="row")
+    chunk_size = serializers.IntegerField(required=False, default=2000, min_value=1, max_value=50000)
+    workers = serializers.IntegerField(required=False, default=0, min_value=0, max_value=16)
+    engine = serializers.ChoiceField(choices=["python", "pandas"], required=False, default="python")
+
+
+class PunchUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    employee_field = serializers.ChoiceField(choices=["employee_id", "email"], default="employee_id")
+    device_id = serializers.CharField(required=False, allow_blank=True, default="", max_length=50)
+    pair = serializers.BooleanField(required=False, default=True)
+
+
+class TimeLogImportJobSerializer(serializers.ModelSerializer):
+    percent_complete = serializers.FloatField(read_only=True)
+    errors_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TimeLogImportJob
+        fields = [
+            "id", "filename", "options", "status", "message",
+            "estimated_rows", "processed_rows", "percent_complete", "rows_per_second",
+            "created_count", "updated_count", "unchanged_count", "skipped_count",
+            "errors_url", "created_at", "started_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_errors_url(self, obj):
+        if not obj.errors_file:
+            return None
+        return reverse("timelog-import-jobs-errors", kwargs={"pk": obj.pk}, request=self.context.get("request"))
+
@@ -0,0 +1,113 @@
+# timekeeping/services/holiday_calendar.py
+"""
+In-memory holiday calendar.
+
+`get_calendar(2025)` (or a year range) returns a HolidayCalendar: every holiday
+of those years indexed by date, nationwide ones and branch-local ones apart,
+so "is this date a holiday for this employee?" is a dict lookup instead of a
+query (or a TimeLog FK that an import may not have set).
+
+Years are loaded with one query and kept per process until saving or
+deleting a Holiday invalidates them (timekeeping.signals): here at once, in
+every other worker through the HOLIDAY_CALENDAR cache version
+(payroll.services.cache_versions). Bulk writes that skip signals
+(QuerySet.update / bulk_create) should call `invalidate()` themselves.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from payroll.services import cache_versions
+from timekeeping.models import Holiday
+
+_lock = threading.Lock()
+_years: Dict[int, Tuple[int, List[Holiday]]] = {}  # year -> (cache version, holidays)
+_generation = 0  # bumped by invalidate()
+
+
+class HolidayCalendar:
+    """Date-keyed index over the holidays of [start_year, end_year]."""
+
+    def __init__(self, holidays: Iterable[Holiday], start_year: int, end_year: int):
+        self.start_year = start_year
+        self.end_year = end_year
+        self._national: Dict[date, Holiday] = {}
+        self._local: Dict[Tuple[int, date], Holiday] = {}
+        self._by_id: Dict[int, Holiday] = {}
+        self._by_name: Dict[str, List[Holiday]] = {}
+        for h in holidays:
+            if h.branch_id is None:
+                self._national[h.date] = h
+            else:
+                self._local[(h.branch_id, h.date)] = h
+            self._by_id[h.pk] = h
+            self._by_name.setdefault(h.name.lower(), []).append(h)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def covers(self, day: date) -> bool:
+        return self.start_year <= day.year <= self.end_year
+
+    def get(self, day: date, branch_id: Optional[int] = None) -> Optional[Holiday]:
+        """The holiday observed on `day`; a branch's local holiday wins over the national one."""
+        if branch_id is not None:
+            local = self._local.get((int(branch_id), day))
+            if local is not None:
+                return local
+        return self._national.get(day)
+
+    def is_holiday(self, day: date, branch_id: Optional[int] = None) -> bool:
+        return self.get(day, branch_id) is not None
+
+    def between(self, start: date, end: date, branch_id: Optional[int] = None) -> List[Holiday]:
+        """Holidays observed in [start, end], one per date, by date."""
+        days = {d for d in self._national if start <= d <= end}
+        if branch_id is not None:
+            days.update(d for (b, d) in self._local if b == int(branch_id) and start <= d <= end)
+        return [self.get(d, branch_id) for d in sorted(days)]
+
+    def by_id(self, pk: Optional[int]) -> Optional[Holiday]:
+        return self._by_id.get(pk) if pk is not None else None
+
+    def named(self, name: str) -> List[Holiday]:
+        """Holidays with this name (case-insensitive), any branch."""
+        return list(self._by_name.get(name.strip().lower(), []))
+
+
+def get_calendar(start_year: int, end_year: Optional[int] = None) -> HolidayCalendar:
+    """Calendar for one year or an inclusive year range; missing/outdated years load in one query."""
+    end_year = start_year if end_year is None else end_year
+    wanted = range(start_year, end_year + 1)
+    version = cache_versions.current(cache_versions.HOLIDAY_CALENDAR)
+
+    with _lock:
+        cached = {y: _years[y][1] for y in wanted if y in _years and _years[y][0] == version}
+        generation = _generation
+    stale = [y for y in wanted if y not in cached]
+    if stale:
+        loaded: Dict[int, List[Holiday]] = {y: [] for y in stale}
+        for h in Holiday.objects.filter(date__year__in=stale).order_by("date", "id"):
+            loaded[h.date.year].append(h)
+        with _lock:
+            # an invalidate() while we were loading means this result may already be stale
+            if generation == _generation:
+                _years.update({y: (version, holidays) for y, holidays in loaded.items()})
+        cached.update(loaded)
+
+    holidays = [h for y in wanted for h in cached[y]]
+    return HolidayCalendar(holidays, start_year, end_year)
+
+
+def calendar_for(start: date, end: date) -> HolidayCalendar:
+    return get_calendar(start.year, end.year)
+
+
+def invalidate() -> None:
+    global _generation
+    with _lock:
+        _years.clear()
+        _generation += 1
+    cache_versions.bump(cache_versions.HOLIDAY_CALENDAR)
@@ -0,0 +1,64 @@
+# timekeeping/services/ph_holidays.py
+"""
+Seed nationwide Philippine holidays from the bundled rules dataset
+(common/data/ph_holiday_rules.json): no network needed, any number of years
+in one INSERT. Existing nationwide rows are never touched, so hand-edited
+names, types or multipliers survive a re-seed.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Optional
+
+from common.constants import PH_DEFAULT_MULTIPLIERS
+from common.utils_ph_holidays import get_ph_recurring_holidays, rules_version
+from timekeeping.models import Holiday
+from timekeeping.services.holiday_calendar import invalidate
+from timekeeping.signals import holidays_written
+
+MAX_SEED_YEARS = 50
+
+
+def seed_ph_holidays(start_year: int, end_year: Optional[int] = None, refresh: bool = False) -> Dict:
+    """
+    Insert the holidays of [start_year, end_year] that are not stored yet.
+    refresh=True also merges what the online holiday API knows (see
+    common.utils_ph_holidays.get_ph_recurring_holidays); offline it is a no-op.
+    Returns {"created_dates", "skipped_existing_dates", "dataset_version"}.
+    """
+    end_year = start_year if end_year is None else end_year
+    if end_year < start_year or end_year - start_year >= MAX_SEED_YEARS:
+        raise ValueError(f"Year range must be ascending and at most {MAX_SEED_YEARS} years")
+
+    existing = set(
+        Holiday.objects
+        .filter(branch__isnull=True, date__range=(date(start_year, 1, 1), date(end_year, 12, 31)))
+        .values_list("date", flat=True)
+    )
+    new, skipped = [], []
+    for year in range(start_year, end_year + 1):
+        for htype, entries in get_ph_recurring_holidays(year, refresh=refresh).items():
+            for name, d in entries:
+                if d in existing:
+                    skipped.append(d)
+                    continue
+                existing.add(d)
+                new.append(Holiday(
+                    name=name,
+                    date=d,
+                    type=htype,
+                    multiplier=PH_DEFAULT_MULTIPLIERS[htype],
+                    is_national=True,
+                ))
+
+    # One statement; a concurrent seed of the same dates is absorbed by the unique constraint
+    Holiday.objects.bulk_create(new, ignore_conflicts=True)
+    # bulk_create sends no post_save: drop the cached calendar and the attendance facts of those dates
+    invalidate()
+    if new:
+        holidays_written.send(sender=Holiday, dates=[h.date for h in new])
+    return {
+        "created_dates": sorted(str(h.date) for h in new),
+        "skipped_existing_dates": sorted(str(d) for d in skipped),
+        "dataset_version": rules_version(),
+    }
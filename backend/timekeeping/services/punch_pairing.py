@@ -0,0 +1,236 @@
+# timekeeping/services/punch_pairing.py
+"""
+Batch pairing of raw PunchEvents into TimeLogs (one per employee-day).
+
+Each run only looks at punches that have not been paired yet (`paired_at IS
+NULL`, served by a partial index). For the employees they belong to, the
+punches around them are re-read so that a late IN or a missed OUT re-shapes the
+whole shift, the affected days are rebuilt and upserted in one statement, and
+the new punches are stamped `paired_at`. Days that were not touched by a new
+punch are never rewritten, so a run over a quiet device is a couple of queries.
+
+Pairing rules (per employee, punches in time order):
+  * punches within `dedupe_seconds` of the previous one with the same (or an
+    unknown) direction are double taps and dropped;
+  * an IN opens a session, unless the current session started less than
+    `max_shift_hours` ago and its last OUT was less than `break_gap_hours` ago
+    (coming back from a break);
+  * an OUT closes the current session if it started less than
+    `max_shift_hours` ago, otherwise it is an orphan OUT (time_out only);
+  * a punch without direction is an OUT while a session is open, else an IN;
+  * a session belongs to the local date it started on, so a 22:00 → 06:00
+    shift lands on the first day (TimeLog.duration_hours handles overnight).
+A day's TimeLog gets the earliest IN and the latest OUT of its sessions;
+everything else on an existing TimeLog (holiday, OT, rest day) is kept.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from timekeeping.models import (
+    PunchEvent, TIMELOG_HASHED_FIELDS, TimeLog, timelog_content_hash,
+)
+from timekeeping.signals import timelogs_written
+
+PAIRED_FIELDS = ["time_in", "time_out", "is_absent", "import_hash"]
+
+
+@dataclass
+class PairingOptions:
+    batch_size: int = 5000                 # unpaired punches claimed per transaction
+    dedupe_seconds: int = 120
+    max_shift_hours: int = 16
+    break_gap_hours: int = 4
+
+
+@dataclass
+class PairingResult:
+    punches: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    batches: int = 0
+
+
+@dataclass
+class _Session:
+    start: Optional[datetime]              # None for an orphan OUT
+    end: Optional[datetime] = None
+    open: bool = True
+
+    @property
+    def anchor(self) -> datetime:
+        return self.start or self.end
+
+
+# ─────────────────────────────────────────────────────────
+# Pure pairing
+# ─────────────────────────────────────────────────────────
+def _dedupe(punches: Iterable[Tuple[datetime, str]], window: timedelta) -> List[Tuple[datetime, str]]:
+    kept: List[Tuple[datetime, str]] = []
+    for at, direction in punches:
+        if kept:
+            last_at, last_dir = kept[-1]
+            same = not direction or not last_dir or direction == last_dir
+            if same and at - last_at <= window:
+                continue
+        kept.append((at, direction))
+    return kept
+
+
+def build_sessions(punches: Iterable[Tuple[datetime, str]], opts: PairingOptions) -> List[_Session]:
+    """Collapse time-ordered (punched_at, direction) pairs into work sessions."""
+    max_shift = timedelta(hours=opts.max_shift_hours)
+    break_gap = timedelta(hours=opts.break_gap_hours)
+    sessions: List[_Session] = []
+    current: Optional[_Session] = None
+
+    for at, direction in _dedupe(punches, timedelta(seconds=opts.dedupe_seconds)):
+        in_shift = current is not None and current.start is not None and at - current.start <= max_shift
+        if not direction:
+            direction = PunchEvent.OUT if in_shift and current.open else PunchEvent.IN
+
+        if direction == PunchEvent.IN:
+            back_from_break = in_shift and (current.open or at - current.end <= break_gap)
+            if not back_from_break:
+                current = _Session(start=at)
+                sessions.append(current)
+            current.open = True
+        elif in_shift:
+            current.end, current.open = at, False
+        else:
+            sessions.append(_Session(start=None, end=at, open=False))
+            current = None
+    return sessions
+
+
+def day_times(sessions: Iterable[_Session]) -> Dict[date, Tuple[Optional[datetime], Optional[datetime]]]:
+    """Work date -> (earliest IN, latest OUT) as aware datetimes."""
+    days: Dict[date, Tuple[Optional[datetime], Optional[datetime]]] = {}
+    for s in sessions:
+        day = timezone.localdate(s.anchor)
+        first, last = days.get(day, (None, None))
+        if s.start is not None and (first is None or s.start < first):
+            first = s.start
+        if s.end is not None and (last is None or s.end > last):
+            last = s.end
+        days[day] = (first, last)
+    return days
+
+
+# ─────────────────────────────────────────────────────────
+# Batch job
+# ─────────────────────────────────────────────────────────
+def _local_time(value: Optional[datetime]):
+    return timezone.localtime(value).time().replace(microsecond=0) if value else None
+
+
+def _pair_batch(opts: PairingOptions, result: PairingResult) -> int:
+    max_shift = timedelta(hours=opts.max_shift_hours)
+    with transaction.atomic():
+        claimed = list(
+            PunchEvent.objects
+            .filter(paired_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .order_by("employee_id", "punched_at")
+            .values_list("id", "employee_id", "punched_at")[: opts.batch_size]
+        )
+        if not claimed:
+            return 0
+
+        new_by_emp: Dict[int, List[datetime]] = {}
+        for _, emp_id, at in claimed:
+            new_by_emp.setdefault(emp_id, []).append(at)
+
+        # One read of every punch that can share a shift with a new one
+        lo = min(at for _, _, at in claimed) - 2 * max_shift
+        hi = max(at for _, _, at in claimed) + max_shift
+        window: Dict[int, List[Tuple[datetime, str]]] = {}
+        for emp_id, at, direction in (
+            PunchEvent.objects
+            .filter(employee_id__in=new_by_emp.keys(), punched_at__range=(lo, hi))
+            .order_by("employee_id", "punched_at")
+            .values_list("employee_id", "punched_at", "direction")
+        ):
+            window.setdefault(emp_id, []).append((at, direction))
+
+        # Days to rebuild: those of the sessions a new punch ended up in
+        wanted: Dict[Tuple[int, date], Tuple] = {}
+        for emp_id, new_times in new_by_emp.items():
+            sessions = build_sessions(window.get(emp_id, []), opts)
+            touched = set()
+            for s in sessions:
+                first, last = s.start or s.end, s.end or s.start
+                if any(first <= at <= last for at in new_times):
+                    touched.add(timezone.localdate(s.anchor))
+            # a new punch dropped as a double tap still marks its day for a refresh
+            touched.update(timezone.localdate(at) for at in new_times)
+            for day, (first, last) in day_times(sessions).items():
+                if day in touched:
+                    wanted[(emp_id, day)] = (_local_time(first), _local_time(last))
+
+        _write_days(wanted, result)
+
+        PunchEvent.objects.filter(id__in=[pk for pk, _, _ in claimed]).update(paired_at=timezone.now())
+    result.punches += len(claimed)
+    result.batches += 1
+    return len(claimed)
+
+
+def _write_days(wanted: Dict[Tuple[int, date], Tuple], result: PairingResult) -> None:
+    if not wanted:
+        return
+    existing = {
+        (log.employee_id, log.date): log
+        for log in TimeLog.objects.filter(
+            employee_id__in={k[0] for k in wanted}, date__in={k[1] for k in wanted},
+        )
+    }
+    logs: List[TimeLog] = []
+    for (emp_id, day), (time_in, time_out) in wanted.items():
+        stored = existing.get((emp_id, day))
+        created = stored is None
+        # Only PAIRED_FIELDS are written; the hash covers the fields the row keeps
+        log = TimeLog(employee_id=emp_id, date=day)
+        for f in TIMELOG_HASHED_FIELDS:
+            if stored is not None:
+                setattr(log, f, getattr(stored, f))
+        log.time_in, log.time_out, log.is_absent = time_in, time_out, False
+        log.import_hash = timelog_content_hash({f: getattr(log, f) for f in TIMELOG_HASHED_FIELDS})
+        if not created and log.import_hash == stored.import_hash:
+            result.unchanged += 1
+            continue
+        logs.append(log)
+        if created:
+            result.created += 1
+        else:
+            result.updated += 1
+
+    TimeLog.objects.bulk_create(
+        logs,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["employee", "date"],
+        update_fields=PAIRED_FIELDS,
+    )
+    if logs:
+        timelogs_written.send(sender=TimeLog, keys=[(log.employee_id, log.date) for log in logs])
+
+
+def pair_punches(options: Optional[PairingOptions] = None, max_batches: Optional[int] = None) -> PairingResult:
+    """
+    Pair every unpaired punch, `batch_size` punches per transaction. Safe to run
+    from several workers at once: claimed punches are row-locked and skipped by
+    the others (PostgreSQL; elsewhere runs are simply serialized).
+    """
+    opts = options or PairingOptions()
+    result = PairingResult()
+    while max_batches is None or result.batches < max_batches:
+        if not _pair_batch(opts, result):
+            break
+    return result
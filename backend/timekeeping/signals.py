@@ -0,0 +1,20 @@
+# timekeeping/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from timekeeping.models import Holiday
+from timekeeping.services.holiday_calendar import invalidate
+
+# Sent after TimeLogs are upserted in bulk (no post_save per row).
+# kwargs: keys = [(employee_id, date), ...]
+timelogs_written = Signal()
+
+# Sent after Holidays are inserted in bulk (no post_save per row).
+# kwargs: dates = [date, ...]
+holidays_written = Signal()
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def invalidate_holiday_calendar(sender, instance, **kwargs):
+    invalidate()
@@ -0,0 +1,6 @@
+# timekeeping/tests/helpers.py
+import io
+
+
+def csv_bytes(lines) -> io.BytesIO:
+    return io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
@@ -0,0 +1,88 @@
+# timekeeping/tests/test_bulk_upload.py
+"""Bulk TimeLog endpoint."""
+from datetime import date, time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from timekeeping.models import Holiday, TimeLog
+from timekeeping.services.holiday_calendar import invalidate as invalidate_holiday_calendar
+
+
+class BulkTimeLogUploadTests(TestCase):
+    """The JSON bulk endpoint upserts in batches and answers with counts and ids."""
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Bulk Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        cls.emp = Employee.objects.create(first_name="Bo", last_name="Uy", hire_date=date(2024, 1, 1), branch=branch)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("clock", password="x"))
+        self.addCleanup(invalidate_holiday_calendar)  # test holidays are rolled back without signals
+
+    def _logs(self, days, time_out="17:00:00"):
+        return [
+            {"employee": self.emp.id, "date": f"2025-10-{d:02d}", "time_in": "08:00", "time_out": time_out}
+            for d in days
+        ]
+
+    def test_upsert_counts_and_ids(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/timelogs/bulk/", {"logs": self._logs(range(1, 31))}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual((response.data["created"], response.data["updated"]), (30, 0))
+        self.assertEqual(sorted(response.data["ids"]), sorted(TimeLog.objects.values_list("id", flat=True)))
+        self.assertNotIn("data", response.data)
+        inserts = [q for q in ctx.captured_queries if q["sql"].lstrip().startswith('INSERT INTO "timekeeping_timelog"')]
+        self.assertEqual(len(inserts), 1)  # one batch for all 30 logs
+
+        response = self.client.post(
+            "/api/timelogs/bulk/?include=logs", {"logs": self._logs([1, 2], time_out="18:00")}, format="json",
+        )
+        self.assertEqual((response.data["created"], response.data["updated"]), (0, 2))
+        self.assertEqual([row["time_out"] for row in response.data["data"]], ["18:00:00", "18:00:00"])
+        self.assertEqual(TimeLog.objects.count(), 30)
+
+    def test_invalid_rows_write_nothing(self):
+        logs = self._logs([1]) + [{"employee": 999999, "date": "2025-10-02"}, {"employee": self.emp.id, "date": "bad"}]
+        response = self.client.post("/api/timelogs/bulk/", {"logs": logs}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data["errors"]), 2)
+        self.assertFalse(TimeLog.objects.exists())
+
+    def test_rows_only_set_times(self):
+        holiday = Holiday.objects.create(name="Town Fiesta", date=date(2025, 10, 3), type="SPECIAL")
+        TimeLog.objects.create(
+            employee=self.emp, date=date(2025, 10, 3), time_in=time(8, 0), time_out=time(17, 0),
+            ot_hours=Decimal("2.00"), late_minutes=15, holiday=holiday,
+        )
+        logs = [
+            {"employee": self.emp.id, "date": "2025-10-03", "time_in": "09:00", "time_out": "18:00",
+             "ot_hours": "bogus", "is_absent": True},
+            {"employee": self.emp.id, "date": "2025-10-04"},  # no punches, no is_absent
+        ]
+        response = self.client.post("/api/timelogs/bulk/", {"logs": logs}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual((response.data["created"], response.data["updated"]), (1, 1))
+
+        updated = TimeLog.objects.get(employee=self.emp, date=date(2025, 10, 3))
+        self.assertEqual((updated.time_in, updated.time_out), (time(9, 0), time(18, 0)))
+        self.assertEqual((updated.ot_hours, updated.late_minutes, updated.holiday_id), (Decimal("2.00"), 15, holiday.id))
+        self.assertFalse(updated.is_absent)
+
+        blank = TimeLog.objects.get(employee=self.emp, date=date(2025, 10, 4))
+        self.assertEqual((blank.time_in, blank.time_out, blank.is_absent), (None, None, False))
+        self.assertEqual((blank.ot_hours, blank.late_minutes, blank.holiday_id), (Decimal("0.00"), 0, None))
+
+        # Same times again: nothing to write
+        response = self.client.post("/api/timelogs/bulk/", {"logs": logs}, format="json")
+        self.assertEqual((response.data["created"], response.data["updated"], response.data["unchanged"]), (0, 0, 2))
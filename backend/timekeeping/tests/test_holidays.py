@@ -0,0 +1,138 @@
+# timekeeping/tests/test_holidays.py
+"""Holiday calendar and PH holiday seeding."""
+from datetime import date, time
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from common.utils_ph_holidays import compute_ph_holidays, easter_sunday, nth_weekday
+from employees.models import Employee
+from organization.models import Branch, Business
+from payroll.models import CacheVersion
+from payroll.services.attendance import ensure_attendance, missing_workdays
+from payroll.services.cache_versions import HOLIDAY_CALENDAR
+from payroll.services.time_analysis import compute_time_based_components
+from timekeeping.models import DailyAttendance, Holiday, TimeLog
+from timekeeping.services.holiday_calendar import get_calendar, invalidate as invalidate_holiday_calendar
+from timekeeping.services.ph_holidays import seed_ph_holidays
+
+
+class HolidayCalendarTests(TestCase):
+    """Holidays are looked up in a cached date index, scoped by branch, and refreshed on save."""
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Cal Co")
+        cls.main = Branch.objects.create(business=business, name="Main")
+        cls.cebu = Branch.objects.create(business=business, name="Cebu")
+        cls.emp = Employee.objects.create(first_name="Cy", last_name="Sy", hire_date=date(2024, 1, 1), branch=cls.cebu)
+        Holiday.objects.create(name="Labor Day", date=date(2025, 5, 1), type=Holiday.REGULAR)
+        Holiday.objects.create(
+            name="Cebu Charter Day", date=date(2025, 2, 24), type=Holiday.SPECIAL,
+            multiplier=Decimal("1.30"), is_national=False, branch=cls.cebu,
+        )
+
+    def setUp(self):
+        invalidate_holiday_calendar()
+
+    @classmethod
+    def tearDownClass(cls):
+        invalidate_holiday_calendar()
+        super().tearDownClass()
+
+    def test_branch_scope_and_cache(self):
+        calendar = get_calendar(2025)
+        self.assertEqual(calendar.get(date(2025, 5, 1)).name, "Labor Day")
+        self.assertIsNone(calendar.get(date(2025, 2, 24)))
+        self.assertEqual(calendar.get(date(2025, 2, 24), self.cebu.id).name, "Cebu Charter Day")
+        self.assertIsNone(calendar.get(date(2025, 2, 24), self.main.id))
+        self.assertEqual(len(calendar.between(date(2025, 1, 1), date(2025, 12, 31), self.cebu.id)), 2)
+
+        with self.assertNumQueries(1):  # only the version check
+            get_calendar(2025)
+
+        Holiday.objects.create(name="Independence Day", date=date(2025, 6, 12), type=Holiday.REGULAR)
+        self.assertTrue(get_calendar(2025).is_holiday(date(2025, 6, 12)))
+
+        # another worker's write: no signal here, only its version bump
+        Holiday.objects.bulk_create([Holiday(name="Bonifacio Day", date=date(2025, 11, 30), type=Holiday.REGULAR)])
+        self.assertFalse(get_calendar(2025).is_holiday(date(2025, 11, 30)))
+        CacheVersion.objects.filter(key=HOLIDAY_CALENDAR).update(version=F("version") + 1)
+        self.assertTrue(get_calendar(2025).is_holiday(date(2025, 11, 30)))
+
+    def test_on_endpoint(self):
+        client = APIClient()
+        self.assertFalse(client.get("/api/holidays/on/2025-02-24/").data["is_holiday"])
+        response = client.get(f"/api/holidays/on/2025-02-24/?branch={self.cebu.id}")
+        self.assertEqual(response.data["holiday"]["name"], "Cebu Charter Day")
+
+    def test_time_analysis_uses_calendar_date(self):
+        # Worked the local holiday but the log carries no holiday FK: premium, no penalties
+        TimeLog.objects.create(employee=self.emp, date=date(2025, 2, 24), time_in=time(9), time_out=time(18))
+        TimeLog.objects.create(employee=self.emp, date=date(2025, 5, 1))  # holiday, no punches: not absent
+        policy = SimpleNamespace(
+            grace_minutes=0, standard_working_days=Decimal("22"), late_penalty_per_minute=Decimal("0"),
+            undertime_penalty_per_minute=Decimal("0"), absent_penalty_per_day=Decimal("500"),
+            ot_multiplier=Decimal("1.25"), rest_day_multiplier=Decimal("1.30"),
+        )
+        rows = compute_time_based_components(self.emp, date(2025, 2, 1), date(2025, 5, 31), Decimal("17600"), policy)
+        codes = {r["component"].code: r["amount"] for r in rows}
+        # only the unlogged workdays are absent: neither the holiday nor the day worked
+        missing = missing_workdays(self.emp, date(2025, 2, 1), date(2025, 5, 31))
+        self.assertNotIn(date(2025, 5, 1), missing)
+        self.assertEqual(codes["ABSENT"], len(missing) * Decimal("500"))
+        self.assertEqual(codes["HOLIDAY_PREMIUM"], Decimal("240.00"))  # 8h x 100/h x 0.30
+
+
+class PhHolidaySeedTests(TestCase):
+    """Holidays are computed from the bundled rules and seeded without the network."""
+
+    def tearDown(self):
+        invalidate_holiday_calendar()
+
+    def test_movable_feasts(self):
+        self.assertEqual(easter_sunday(2025), date(2025, 4, 20))
+        self.assertEqual(easter_sunday(2024), date(2024, 3, 31))
+        self.assertEqual(nth_weekday(2025, 8, 0, -1), date(2025, 8, 25))
+        self.assertEqual(nth_weekday(2026, 8, 0, -1), date(2026, 8, 31))
+        regular = dict(compute_ph_holidays(2025)["REGULAR"])
+        self.assertEqual(regular["Maundy Thursday"], date(2025, 4, 17))
+        self.assertEqual(regular["Good Friday"], date(2025, 4, 18))
+        self.assertEqual(regular["National Heroes Day"], date(2025, 8, 25))
+
+    def test_decade_seeded_offline_in_one_insert(self):
+        Holiday.objects.create(name="Custom New Year", date=date(2025, 1, 1), type=Holiday.REGULAR)
+        with mock.patch("common.fetch_holidays.requests.get", side_effect=AssertionError("network used")):
+            with CaptureQueriesContext(connection) as ctx:
+                result = seed_ph_holidays(2025, 2034)
+        inserts = [q for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("INSERT")]
+        # one statement (SQLite splits it at 999 bind parameters)
+        self.assertEqual(len(inserts), 1 if connection.vendor == "postgresql" else 2)
+        self.assertEqual(result["skipped_existing_dates"], ["2025-01-01"])
+        self.assertEqual(Holiday.objects.filter(date__year=2025).count(), 19)
+        self.assertEqual(Holiday.objects.get(date=date(2025, 1, 1)).name, "Custom New Year")
+        self.assertTrue(get_calendar(2030).is_holiday(date(2030, 4, 19)))  # Good Friday 2030
+
+        again = seed_ph_holidays(2025, 2034)
+        self.assertEqual(again["created_dates"], [])
+
+    def test_seed_drops_attendance_facts_of_seeded_dates(self):
+        branch = Branch.objects.create(business=Business.objects.create(name="Seed Co"), name="Main")
+        emp = Employee.objects.create(first_name="Lea", last_name="Go", hire_date=date(2024, 1, 1), branch=branch)
+        heroes = TimeLog.objects.create(employee=emp, date=date(2025, 8, 25))   # National Heroes Day, no punches
+        other = TimeLog.objects.create(employee=emp, date=date(2025, 8, 26))
+        self.assertTrue(DailyAttendance.objects.get(timelog=heroes).is_absent)
+
+        seed_ph_holidays(2025)
+
+        self.assertFalse(DailyAttendance.objects.filter(timelog=heroes).exists())
+        self.assertTrue(DailyAttendance.objects.filter(timelog=other).exists())
+        ensure_attendance(emp, date(2025, 8, 1), date(2025, 8, 31))
+        fact = DailyAttendance.objects.get(timelog=heroes)
+        self.assertEqual((fact.is_holiday, fact.is_absent), (True, False))
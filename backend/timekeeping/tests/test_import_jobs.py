@@ -0,0 +1,116 @@
+# timekeeping/tests/test_import_jobs.py
+"""Background import jobs."""
+import csv
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from timekeeping.importers.jobs import claim_next_job, enqueue_import, process_pending, reclaim_stale_jobs
+from timekeeping.models import TimeLog, TimeLogImportJob
+
+
+class TimeLogImportJobTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Job Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        cls.emp = Employee.objects.create(first_name="Dan", last_name="Uy", hire_date=date(2024, 1, 1), branch=branch)
+        cls.user = get_user_model().objects.create_user(username="hr", password="x")
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_upload_is_queued_then_processed_with_full_error_report(self):
+        e = self.emp.id
+        lines = ["employee_id,date,time_in,time_out"]
+        lines += [f"{e},2025-06-{d:02d},08:00,17:00" for d in range(1, 31)]
+        lines += [f"{e},bad-date-{i},08:00,17:00" for i in range(150)]  # more than the in-memory cap
+        upload = SimpleUploadedFile("logs.csv", ("\n".join(lines) + "\n").encode(), content_type="text/csv")
+
+        response = self.client.post("/api/timelog-import-jobs/", {"file": upload, "mode": "bulk", "chunk_size": 50}, format="multipart")
+        self.assertEqual(response.status_code, 202, response.content)
+        self.assertEqual(response.data["status"], "PENDING")
+        self.assertEqual(response.data["estimated_rows"], 180)
+        self.assertFalse(TimeLog.objects.exists())
+
+        self.assertEqual(process_pending(), 1)
+
+        job = self.client.get(f"/api/timelog-import-jobs/{response.data['id']}/").data
+        self.assertEqual(job["status"], TimeLogImportJob.DONE)
+        self.assertEqual(job["percent_complete"], 100.0)
+        self.assertEqual((job["processed_rows"], job["created_count"], job["skipped_count"]), (180, 30, 150))
+        self.assertEqual(TimeLog.objects.count(), 30)
+
+        report = self.client.get(job["errors_url"])
+        self.assertEqual(report.status_code, 200)
+        rows = list(csv.reader(io.StringIO(b"".join(report.streaming_content).decode())))
+        self.assertEqual(rows[0], ["row", "error"])
+        self.assertEqual(len(rows) - 1, 150)
+        self.assertEqual(rows[1][0], "31")
+
+    def _queue(self, user=None):
+        body = f"employee_id,date,time_in,time_out\n{self.emp.id},2025-06-02,08:00,17:00\n"
+        upload = SimpleUploadedFile("logs.csv", body.encode(), content_type="text/csv")
+        return enqueue_import(upload, {"mode": "bulk"}, user=user or self.user)
+
+    def test_stale_running_job_is_requeued_then_failed(self):
+        job = self._queue()
+        self.assertEqual(claim_next_job().pk, job.pk)  # the worker dies here
+        self.assertEqual(process_pending(), 0)  # heartbeat still fresh
+
+        later = timezone.now() + timedelta(seconds=601)
+        with self.assertLogs("timekeeping.importers.jobs", "WARNING"):
+            self.assertEqual(reclaim_stale_jobs(now=later), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (TimeLogImportJob.PENDING, 1))
+
+        with override_settings(TIMELOG_IMPORT_MAX_ATTEMPTS=2):
+            self.assertEqual(claim_next_job().attempts, 2)  # dies again
+            with self.assertLogs("timekeeping.importers.jobs", "WARNING"):
+                self.assertEqual(reclaim_stale_jobs(now=later + timedelta(seconds=601)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, TimeLogImportJob.FAILED)
+        self.assertIn("stopped responding", job.message)
+        self.assertEqual(process_pending(), 0)
+        self.assertFalse(TimeLog.objects.exists())
+
+    def test_requeued_job_runs_to_completion(self):
+        job = self._queue()
+        claim_next_job()
+        TimeLogImportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        with self.assertLogs("timekeeping.importers.jobs", "WARNING"):
+            self.assertEqual(process_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.created_count), (TimeLogImportJob.DONE, 2, 1))
+
+    def test_users_only_see_their_own_jobs(self):
+        mine = self._queue()
+        other = get_user_model().objects.create_user(username="other", password="x")
+        theirs = self._queue(user=other)
+        TimeLogImportJob.objects.filter(pk=theirs.pk).update(errors_file="timelog_imports/errors/x.csv")
+
+        listed = self.client.get("/api/timelog-import-jobs/").data
+        rows = listed["results"] if isinstance(listed, dict) else listed
+        self.assertEqual([row["id"] for row in rows], [mine.id])
+        self.assertEqual(self.client.get(f"/api/timelog-import-jobs/{theirs.id}/").status_code, 404)
+        self.assertEqual(self.client.get(f"/api/timelog-import-jobs/{theirs.id}/errors/").status_code, 404)
+
+        admin = get_user_model().objects.create_user(username="admin", password="x", is_staff=True)
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.get(f"/api/timelog-import-jobs/{theirs.id}/").status_code, 200)
@@ -0,0 +1,295 @@
+# timekeeping/tests/test_importer.py
+"""TimeLog importer: modes, streaming CSV, dry runs and re-imports."""
+import csv
+import importlib
+import io
+import tempfile
+import tracemalloc
+from datetime import date, time
+from decimal import Decimal
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from payroll.services.work_schedule import invalidate as invalidate_schedules
+from timekeeping.importers.timelog_importer import ImportOptions, _iter_rows_from_file, import_timelogs
+from timekeeping.models import Holiday, TimeLog
+from timekeeping.services.holiday_calendar import invalidate as invalidate_holiday_calendar
+from timekeeping.tests.helpers import csv_bytes
+
+
+class TimeLogImporterModeTests(TestCase):
+    """The bulk importer must produce the same rows and counts as the per-row path."""
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Import Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        cls.ana = Employee.objects.create(first_name="Ana", last_name="Cruz", hire_date=date(2024, 1, 1), branch=branch)
+        cls.ben = Employee.objects.create(first_name="Ben", last_name="Reyes", hire_date=date(2024, 1, 1), branch=branch)
+        cls.holiday = Holiday.objects.create(name="Ninoy Aquino Day", date=date(2025, 8, 21), type=Holiday.SPECIAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        invalidate_holiday_calendar()  # class data is rolled back without signals
+        super().tearDownClass()
+
+    def _file(self):
+        a, b = self.ana.id, self.ben.id
+        return csv_bytes([
+            "employee_id,date,time_in,time_out,ot_hours,late_minutes,holiday_name",
+            f"{a},2025-08-20,08:00,17:00,1.5,5,",
+            f"{a},2025-08-21,,,,,ninoy aquino day",
+            f"{b},2025-08-20,09:00,18:00,,,",
+            f"{b},2025-08-20,09:15,18:00,,15,",   # duplicate key: updates the row above
+            f"{b},2025-08-22,,,,,",               # no times → absent
+            "999999,2025-08-20,08:00,17:00,,,",   # unknown employee
+            f"{a},20-08-2025,08:00,17:00,,,",     # bad date
+        ])
+
+    def _snapshot(self):
+        return sorted(
+            TimeLog.objects.values_list(
+                "employee_id", "date", "time_in", "time_out", "ot_hours",
+                "late_minutes", "is_absent", "holiday_id",
+            )
+        )
+
+    def _run(self, mode, **kwargs):
+        return import_timelogs(self._file(), "logs.csv", ImportOptions(mode=mode, **kwargs))
+
+    def test_bulk_matches_row_mode(self):
+        TimeLog.objects.create(employee=self.ana, date=date(2025, 8, 20), time_in=time(7, 0))
+        row = self._run("row")
+        row_state = self._snapshot()
+
+        TimeLog.objects.all().delete()
+        TimeLog.objects.create(employee=self.ana, date=date(2025, 8, 20), time_in=time(7, 0))
+        bulk = self._run("bulk", chunk_size=3)
+
+        self.assertEqual(
+            (bulk.total_rows, bulk.created, bulk.updated, bulk.skipped),
+            (row.total_rows, row.created, row.updated, row.skipped),
+        )
+        self.assertEqual((bulk.created, bulk.updated, bulk.skipped), (3, 2, 2))
+        self.assertEqual(self._snapshot(), row_state)
+
+        late = TimeLog.objects.get(employee=self.ben, date=date(2025, 8, 20))
+        self.assertEqual((late.time_in, late.late_minutes), (time(9, 15), 15))
+        self.assertTrue(TimeLog.objects.get(employee=self.ben, date=date(2025, 8, 22)).is_absent)
+        self.assertEqual(TimeLog.objects.get(employee=self.ana, date=date(2025, 8, 21)).holiday, self.holiday)
+        self.assertEqual(TimeLog.objects.get(employee=self.ana, date=date(2025, 8, 20)).ot_hours, Decimal("1.50"))
+
+    def test_bulk_query_count_is_per_chunk(self):
+        lines = ["employee_id,date,time_in,time_out"] + [
+            f"{self.ana.id},2025-07-{d:02d},08:00,17:00" for d in range(1, 31)
+        ]
+        invalidate_holiday_calendar()
+        invalidate_schedules()
+        # outer atomic (2) + the cold calendar and branch schedule (2) + per chunk: employees,
+        # existing keys, savepoint, upsert, release, then the DailyAttendance refresh: cache
+        # versions, logs, fact upsert; and the paid runs the retro index checks
+        with self.assertNumQueries(2 + 2 + 9 * 2):
+            result = import_timelogs(csv_bytes(lines), "logs.csv", ImportOptions(mode="bulk", chunk_size=15))
+        self.assertEqual((result.created, result.skipped), (30, 0))
+        self.assertGreater(result.rows_per_second, 0)
+
+    def test_parallel_parsing_matches_in_process(self):
+        serial = self._run("bulk", chunk_size=2, dry_run=True)
+        parallel = self._run("bulk", chunk_size=2, dry_run=True, workers=2)
+        self.assertEqual(parallel.errors, serial.errors)
+        self.assertEqual(parallel.preview, serial.preview)
+
+        result = self._run("bulk", chunk_size=2, workers=2)
+        self.assertEqual((result.created, result.updated, result.skipped), (4, 1, 2))
+        self.assertEqual(TimeLog.objects.count(), 4)
+
+    def test_pandas_engine_matches_python_engine(self):
+        python = self._run("bulk", dry_run=True)
+        pandas = self._run("bulk", dry_run=True, engine="pandas")
+        self.assertEqual([p["row"] for p in pandas.preview], [p["row"] for p in python.preview])
+        self.assertEqual(
+            [p["action"] for p in pandas.preview], [p["action"] for p in python.preview]
+        )
+
+        result = self._run("bulk", engine="pandas", chunk_size=2)
+        self.assertEqual((result.created, result.updated, result.skipped), (4, 1, 2))
+        imported = self._snapshot()
+        TimeLog.objects.all().delete()
+        self._run("bulk")
+        self.assertEqual(self._snapshot(), imported)
+
+    def test_engines_agree_on_the_same_bytes(self):
+        a = self.ana.id
+        data = (
+            "employee_id,date,time_in,time_out,ot_hours,holiday_name\n"
+            f"{a},2025-08-18,08:00,17:00,inf,\n"
+            f"{a},2025-08-19,08:00,17:00,NaN,\n"
+            f"{a},2025-08-20,08:00,17:00,-Infinity,\n"
+            f"{a},2025-08-25,,,,Niño Day\n"   # latin-1 ñ must decode alike to match the holiday
+            f"{a},2025-08-22,08:00,17:00,2.25,\n"
+        ).encode("latin-1")
+        Holiday.objects.create(name="Niño Day", date=date(2025, 8, 25), type=Holiday.SPECIAL)
+        invalidate_holiday_calendar()
+
+        results = {}
+        for engine in ("python", "pandas"):
+            TimeLog.objects.all().delete()
+            result = import_timelogs(io.BytesIO(data), "logs.csv", ImportOptions(mode="bulk", engine=engine))
+            results[engine] = (
+                (result.created, result.skipped),
+                [e.split(":")[0] for e in result.errors],
+                list(TimeLog.objects.order_by("date").values_list("date", "ot_hours", "holiday__name")),
+            )
+        self.assertEqual(results["pandas"], results["python"])
+        self.assertEqual(results["python"][0], (2, 3))
+        self.assertEqual(results["python"][1], ["Row 1", "Row 2", "Row 3"])
+        self.assertEqual(
+            results["python"][2],
+            [(date(2025, 8, 22), Decimal("2.25"), None), (date(2025, 8, 25), Decimal("0.00"), "Niño Day")],
+        )
+
+    def test_bulk_dry_run_writes_nothing(self):
+        result = self._run("bulk", dry_run=True)
+        self.assertEqual(result.created, 4)
+        self.assertFalse(TimeLog.objects.exists())
+
+
+class StreamingCsvTests(SimpleTestCase):
+
+    def _rows(self, data: bytes, block_size: int):
+        rows, columns = _iter_rows_from_file(io.BytesIO(data), "logs.csv", True, block_size=block_size)
+        return list(rows), columns
+
+    def test_utf8_split_across_blocks_and_quoted_newlines(self):
+        data = '\ufeffemployee_id,date,holiday_name\r\n1,2025-08-20,"Araw ng\nKagitingan ñ"\r\n2,2025-08-21,Niño\r\n'.encode("utf-8")
+        for block_size in (1, 2, 3, 7, 4096):
+            rows, columns = self._rows(data, block_size)
+            self.assertEqual(columns, {"employee_id", "date", "holiday_name"})
+            self.assertEqual([r["holiday_name"] for r in rows], ["Araw ng\nKagitingan ñ", "Niño"], block_size)
+
+    def test_latin1_fallback(self):
+        data = "employee_id,date,holiday_name\n1,2025-08-20,Niño\n".encode("latin-1")
+        rows, _ = self._rows(data, 8)
+        self.assertEqual(rows[0]["holiday_name"], "Niño")
+
+    def test_invalid_bytes_after_utf8_first_block(self):
+        data = "employee_id,date,holiday_name\n".encode("utf-8") + "1,2025-08-20,Niño\n".encode("latin-1")
+        rows, _ = self._rows(data, 16)
+        self.assertEqual(rows[0]["holiday_name"], "Niño")
+
+    def test_peak_memory_is_bounded_by_block_not_file(self):
+        line = b"123,2025-08-20,08:00,17:00,1.50,5,0,false,false,Some Holiday Name\n"
+        with tempfile.TemporaryFile() as fh:
+            fh.write(b"employee_id,date,time_in,time_out,ot_hours,late_minutes,undertime_minutes,is_rest_day,is_absent,holiday_name\n")
+            for _ in range(8):
+                fh.write(line * 20000)  # ~11 MB in total
+            size = fh.tell()
+
+            tracemalloc.start()
+            try:
+                rows, _ = _iter_rows_from_file(fh, "logs.csv", True, block_size=64 * 1024)
+                count = sum(1 for _ in rows)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertEqual(count, 160000)
+        self.assertLess(peak, 2 * 1024 * 1024, f"peak {peak} bytes for a {size} byte file")
+
+
+class TimeLogDryRunTests(TestCase):
+    """dry_run validates and diffs without issuing a single write."""
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Dry Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        cls.emp = Employee.objects.create(first_name="Cara", last_name="Lim", hire_date=date(2024, 1, 1), branch=branch)
+        TimeLog.objects.create(employee=cls.emp, date=date(2025, 8, 1), time_in=time(8, 0), time_out=time(17, 0))
+        TimeLog.objects.create(employee=cls.emp, date=date(2025, 8, 2), time_in=time(8, 0), time_out=time(17, 0))
+
+    def test_classifies_rows_without_writing(self):
+        e = self.emp.id
+        data = csv_bytes([
+            "employee_id,date,time_in,time_out",
+            f"{e},2025-08-01,08:00,17:00",   # unchanged
+            f"{e},2025-08-02,08:30,17:00",   # update
+            f"{e},2025-08-03,08:00,17:00",   # create
+            f"{e},2025-08-03,08:00,17:00",   # same as the row above → unchanged
+            f"{e},not-a-date,08:00,17:00",   # error
+        ])
+        before = self._snapshot()
+        with CaptureQueriesContext(connection) as ctx:
+            result = import_timelogs(data, "logs.csv", ImportOptions(dry_run=True, mode="bulk"))
+
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("SELECT")]
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))]
+        self.assertEqual(len(selects), 2)  # employees + stored rows for the one chunk
+        self.assertEqual(writes, [])
+
+        self.assertEqual(self._snapshot(), before)
+        self.assertEqual(
+            (result.created, result.updated, result.unchanged, result.skipped),
+            (1, 1, 2, 1),
+        )
+        actions = [p["action"] for p in result.preview]
+        self.assertEqual(actions, ["unchanged", "update", "create", "unchanged", "error"])
+        self.assertEqual(result.preview[1]["changes"], {"time_in": ["08:00:00", "08:30:00"]})
+
+    def _snapshot(self):
+        return list(TimeLog.objects.order_by("id").values_list("id", "date", "time_in"))
+
+
+class TimeLogReimportTests(TestCase):
+    """Re-importing the same rows is counted as unchanged and issues no writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Hash Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        cls.emp = Employee.objects.create(first_name="Eva", last_name="Tan", hire_date=date(2024, 1, 1), branch=branch)
+
+    def _file(self, late="0"):
+        e = self.emp.id
+        return csv_bytes(["employee_id,date,time_in,time_out,ot_hours,late_minutes"] + [
+            f"{e},2025-09-{d:02d},08:00,17:00,1.5,{late if d == 28 else 0}" for d in range(1, 29)
+        ])
+
+    def test_reimport_skips_unchanged_rows(self):
+        for mode in ("bulk", "row"):
+            with self.subTest(mode=mode):
+                TimeLog.objects.all().delete()
+                first = import_timelogs(self._file(), "a.csv", ImportOptions(mode=mode))
+                self.assertEqual(first.created, 28)
+
+                with CaptureQueriesContext(connection) as ctx:
+                    again = import_timelogs(self._file(late="7"), "a.csv", ImportOptions(mode=mode))
+                writes = [
+                    q["sql"] for q in ctx.captured_queries
+                    if q["sql"].lstrip().upper().startswith(("INSERT", "UPDATE")) and '"timekeeping_timelog"' in q["sql"][:40]
+                ]
+
+                self.assertEqual((again.created, again.updated, again.unchanged), (0, 1, 27))
+                self.assertEqual(len(writes), 1, writes)
+                self.assertEqual(TimeLog.objects.get(date=date(2025, 9, 28)).late_minutes, 7)
+
+    def test_manual_edit_invalidates_hash(self):
+        import_timelogs(self._file(), "a.csv", ImportOptions(mode="bulk"))
+        log = TimeLog.objects.get(date=date(2025, 9, 1))
+        log.late_minutes = 30
+        log.save(update_fields=["late_minutes"])
+
+        again = import_timelogs(self._file(), "a.csv", ImportOptions(mode="bulk"))
+        self.assertEqual((again.updated, again.unchanged), (1, 27))
+        self.assertEqual(TimeLog.objects.get(date=date(2025, 9, 1)).late_minutes, 0)
+
+    def test_migration_backfill_hashes_like_the_model(self):
+        import_timelogs(self._file(late="7"), "a.csv", ImportOptions(mode="bulk"))
+        migration = importlib.import_module("timekeeping.migrations.0005_timelog_import_hash")
+        for log in TimeLog.objects.all():
+            frozen = migration.timelog_content_hash({f: getattr(log, f) for f in migration.TIMELOG_HASHED_FIELDS})
+            self.assertEqual(frozen, log.import_hash)
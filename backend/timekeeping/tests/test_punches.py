@@ -0,0 +1,89 @@
+# timekeeping/tests/test_punches.py
+"""Raw punch events and their pairing into TimeLogs."""
+import csv
+import io
+from datetime import date, time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from timekeeping.importers.punches import PunchIngestOptions, ingest_punches
+from timekeeping.models import TimeLog
+from timekeeping.services.punch_pairing import pair_punches
+from timekeeping.tests.helpers import csv_bytes
+
+
+class PunchPairingTests(TestCase):
+    """Device dumps are appended idempotently and paired into one TimeLog per employee-day."""
+
+    @classmethod
+    def setUpTestData(cls):
+        business = Business.objects.create(name="Punch Co")
+        branch = Branch.objects.create(business=business, name="Main")
+        cls.day = Employee.objects.create(first_name="Dan", last_name="Lim", hire_date=date(2024, 1, 1), branch=branch)
+        cls.night = Employee.objects.create(first_name="Nia", last_name="Go", hire_date=date(2024, 1, 1), branch=branch)
+
+    def _attlog(self, lines):
+        return io.BytesIO(("\r\n".join(lines) + "\r\n").encode("ascii"))
+
+    def test_ingest_and_pair_incrementally(self):
+        d, n = self.day.id, self.night.id
+        dump = self._attlog([
+            f"{d}\t2025-08-04 07:58:10\t1\t0\t0\t0",
+            f"{d}\t2025-08-04 07:59:05\t1\t0\t0\t0",   # double tap
+            f"{d}\t2025-08-04 12:01:00\t1\t2\t0\t0",   # break out
+            f"{d}\t2025-08-04 12:58:00\t1\t3\t0\t0",   # break in
+            f"{d}\t2025-08-04 17:03:00\t1\t1\t0\t0",
+            f"{n}\t2025-08-04 21:55:00\t1\t0\t0\t0",   # overnight shift
+            f"{n}\t2025-08-05 06:04:00\t1\t1\t0\t0",
+            "999\t2025-08-04 08:00:00\t1\t0\t0\t0",
+        ])
+        result = ingest_punches(dump, "ABC123_attlog.dat", PunchIngestOptions(device_id="ABC123"))
+        self.assertEqual((result.inserted, result.skipped), (7, 1))
+
+        paired = pair_punches()
+        self.assertEqual((paired.punches, paired.created), (7, 2))
+        log = TimeLog.objects.get(employee=self.day)
+        self.assertEqual((log.date, log.time_in, log.time_out), (date(2025, 8, 4), time(7, 58, 10), time(17, 3)))
+        log = TimeLog.objects.get(employee=self.night)
+        self.assertEqual((log.date, log.time_in, log.time_out), (date(2025, 8, 4), time(21, 55), time(6, 4)))
+        self.assertEqual(log.duration_hours(), Decimal("8.15"))
+
+        # Re-sending the dump adds nothing and the next run has nothing to do
+        dump.seek(0)
+        again = ingest_punches(dump, "ABC123_attlog.dat", PunchIngestOptions(device_id="ABC123"))
+        self.assertEqual((again.inserted, again.duplicates), (0, 7))
+        self.assertEqual(pair_punches().punches, 0)
+
+        # A late OUT only rebuilds its own day; direction-less CSV punches are inferred
+        late = csv_bytes([
+            "employee_id,timestamp,direction",
+            f"{d},2025-08-04 19:30:00,OUT",
+            f"{d},2025-08-05 08:10:00,",
+            f"{d},2025-08-05 17:00:00,",
+        ])
+        self.assertEqual(ingest_punches(late, "late.csv").inserted, 3)
+        paired = pair_punches()
+        self.assertEqual((paired.punches, paired.created, paired.updated), (3, 1, 1))
+        self.assertEqual(TimeLog.objects.get(employee=self.day, date=date(2025, 8, 4)).time_out, time(19, 30))
+        log = TimeLog.objects.get(employee=self.day, date=date(2025, 8, 5))
+        self.assertEqual((log.time_in, log.time_out, log.is_absent), (time(8, 10), time(17, 0), False))
+
+    def test_upload_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user("clerk", password="x"))
+        upload = SimpleUploadedFile("punches.csv", csv_bytes([
+            "employee_id,date,time,direction",
+            f"{self.day.id},2025-08-06,08:00,IN",
+            f"{self.day.id},2025-08-06,17:00,OUT",
+        ]).getvalue())
+        response = client.post("/api/punches/upload/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["inserted"], 2)
+        self.assertEqual(response.data["pairing"]["created"], 1)
+        self.assertTrue(TimeLog.objects.filter(employee=self.day, date=date(2025, 8, 6), time_out=time(17, 0)).exists())
@@ -0,0 +1,145 @@
+# timekeeping/tests/test_timelog_views.py
+"""TimeLog history pages and the streaming CSV export."""
+import csv
+import io
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from employees.models import Employee
+from organization.models import Branch, Business
+from timekeeping.models import Holiday, TimeLog
+from timekeeping.views import EXPORT_COLUMNS
+
+
+class TimeLogViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = Business.objects.create(name="History Co")
+        cls.main = Branch.objects.create(business=cls.business, name="Main")
+        cls.annex = Branch.objects.create(business=cls.business, name="Annex")
+        other = Branch.objects.create(business=Business.objects.create(name="Elsewhere"), name="HQ")
+        cls.ana = Employee.objects.create(first_name="Ana", last_name="Cruz", hire_date=date(2024, 1, 1), branch=cls.main)
+        cls.ben = Employee.objects.create(first_name="Ben", last_name="Lim", hire_date=date(2024, 1, 1), branch=cls.main)
+        cls.cy = Employee.objects.create(first_name="Cy", last_name="Tan", hire_date=date(2024, 1, 1), branch=cls.annex)
+        cls.dee = Employee.objects.create(first_name="Dee", last_name="Go", hire_date=date(2024, 1, 1), branch=other)
+        cls.holiday = Holiday.objects.create(name="Founders Day", date=date(2025, 3, 3), type="SPECIAL")
+
+        # Two employees share every date, so pages must break ties on id
+        for offset in range(6):
+            day = date(2025, 3, 1) + timedelta(days=offset)
+            for employee in (cls.ana, cls.ben, cls.cy, cls.dee):
+                TimeLog.objects.create(
+                    employee=employee, date=day, time_in=time(8, 0), time_out=time(17, 0),
+                    ot_hours=Decimal("1.50") if employee == cls.ana else 0,
+                    holiday=cls.holiday if day == cls.holiday.date else None,
+                )
+        cls.user = get_user_model().objects.create_user(username="history", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _walk(self, params):
+        ids, url, params = [], "/api/timekeeping/by-business-branch/", dict(params)
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertLessEqual(len(response.data["results"]), int(params.get("page_size", 200)))
+            ids += [row["id"] for row in response.data["results"]]
+            url, params = response.data["next"], {}  # `next` already carries every query param
+        return ids
+
+    # ------------------------------
+    # by-business-branch
+    # ------------------------------
+    def test_pages_walk_the_branch_newest_first_without_gaps(self):
+        ids = self._walk({"business_id": self.business.id, "branch_id": self.main.id, "page_size": 5})
+        expected = list(
+            TimeLog.objects.filter(employee__branch=self.main).order_by("-date", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(ids), 12)
+
+    def test_scope_filters(self):
+        annex = self._walk({"business_id": self.business.id, "branch_id": self.annex.id})
+        self.assertEqual(set(annex), set(TimeLog.objects.filter(employee=self.cy).values_list("id", flat=True)))
+
+        business = self._walk({"business_id": self.business.id, "page_size": 7})
+        self.assertEqual(len(business), 18)  # Dee's business is left out
+
+        ben = self._walk({"business_id": self.business.id, "employee_id": self.ben.id, "page_size": 4})
+        self.assertEqual(set(ben), set(TimeLog.objects.filter(employee=self.ben).values_list("id", flat=True)))
+
+    def test_first_page_size_and_next(self):
+        response = self.client.get(
+            "/api/timekeeping/by-business-branch/", {"business_id": self.business.id, "branch_id": self.main.id}
+        )
+        self.assertEqual(len(response.data["results"]), 12)  # default page of 200
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(
+            "/api/timekeeping/by-business-branch/",
+            {"business_id": self.business.id, "branch_id": self.main.id, "page_size": 2},
+        )
+        self.assertEqual([row["date"] for row in response.data["results"]], ["2025-03-06", "2025-03-06"])
+        self.assertIn("business_id=", response.data["next"])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get("/api/timekeeping/by-business-branch/", {"cursor": "WyIyMDI1LTAzLTAxIl0="})
+        self.assertEqual(response.status_code, 404)  # one value for a two-field ordering
+
+    # ------------------------------
+    # list
+    # ------------------------------
+    def test_list_joins_the_employee(self):
+        # force_authenticate skips the user lookup, so the logs and their employees are one query
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/timekeeping/", {"month": "2025-03"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 24)
+        self.assertEqual({row["employee_name"] for row in response.data}, {"Ana Cruz", "Ben Lim", "Cy Tan", "Dee Go"})
+
+    # ------------------------------
+    # export
+    # ------------------------------
+    def _export(self, params):
+        response = self.client.get("/api/timekeeping/export/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        body = b"".join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(body)))
+
+    def test_export_streams_the_range_oldest_first(self):
+        rows = self._export({"start": "2025-03-02", "end": "2025-03-04", "branch_id": self.main.id})
+        self.assertEqual(rows[0], EXPORT_COLUMNS)
+        expected = list(
+            TimeLog.objects.filter(employee__branch=self.main, date__range=(date(2025, 3, 2), date(2025, 3, 4)))
+            .order_by("date", "id").values_list("id", flat=True)
+        )
+        self.assertEqual([int(r[0]) for r in rows[1:]], expected)
+
+        first = dict(zip(EXPORT_COLUMNS, rows[1]))
+        self.assertEqual(first["employee_name"], "Ana Cruz")
+        self.assertEqual((first["date"], first["time_in"], first["time_out"]), ("2025-03-02", "08:00:00", "17:00:00"))
+        self.assertEqual((first["ot_hours"], first["is_absent"], first["holiday"]), ("1.50", "0", ""))
+        holiday_rows = [dict(zip(EXPORT_COLUMNS, r)) for r in rows[1:] if r[3] == "2025-03-03"]
+        self.assertEqual({r["holiday"] for r in holiday_rows}, {"Founders Day"})
+
+    def test_export_scope_filters(self):
+        rows = self._export({"start": "2025-03-01", "end": "2025-03-31", "business_id": self.business.id})
+        self.assertEqual(len(rows) - 1, 18)
+        rows = self._export({"start": "2025-03-01", "end": "2025-03-31", "employee_id": self.dee.id})
+        self.assertEqual({r[1] for r in rows[1:]}, {str(self.dee.id)})
+
+    def test_export_needs_a_valid_range(self):
+        for params in ({}, {"start": "2025-03-01"}, {"start": "March", "end": "2025-03-31"},
+                       {"start": "2025-03-31", "end": "2025-03-01"}):
+            response = self.client.get("/api/timekeeping/export/", params)
+            self.assertEqual(response.status_code, 400, params)
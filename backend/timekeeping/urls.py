@@ -1,14 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from timekeeping.views import BulkTimeLogUploadView, TimeLogViewSet, HolidayViewSet, TimeLogImportView
+from timekeeping.views import BulkTimeLogUploadView, TimeLogViewSet, HolidayViewSet, TimeLogImportView, TimeLogImportJobViewSet, PunchUploadView
 
 
 router = DefaultRouter()
 router.register(r'timelogs', TimeLogViewSet)
 router.register(r'holidays', HolidayViewSet, basename='holidays')
+router.register(r'timelog-import-jobs', TimeLogImportJobViewSet, basename='timelog-import-jobs')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('timelogs/bulk/', BulkTimeLogUploadView.as_view(), name='bulk-timelog-upload'),  # 👈 Custom route
     path('timelogs/import/', TimeLogImportView.as_view(), name='timelog-import'),
+    path('punches/upload/', PunchUploadView.as_view(), name='punch-upload'),
 ]
\ No newline at end of file
@@ -1,22 +1,54 @@
-from rest_framework import viewsets, permissions, filters, status
+import csv
+from calendar import monthrange
+
+from rest_framework import mixins, viewsets, permissions, filters, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from drf_spectacular.utils import extend_schema
-from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from datetime import date
 
-from timekeeping.models import TimeLog, Holiday
+from timekeeping.models import TimeLog, Holiday, TimeLogImportJob
 from timekeeping.serializers import (
     TimeLogSerializer,
     HolidaySerializer,
     TimeLogImportSerializer,
+    TimeLogImportJobSerializer,
+    PunchUploadSerializer,
 )
-from common.constants import PH_DEFAULT_MULTIPLIERS
 from common.filters import HolidayFilter
-from common.utils_ph_holidays import get_ph_recurring_holidays
-from timekeeping.importers.timelog_importer import ImportOptions, import_timelogs
+from common.pagination import TimeLogPagination
+from timekeeping.importers.timelog_importer import ImportOptions, import_timelogs, upsert_timelog_rows
+from timekeeping.importers.jobs import enqueue_import
+from timekeeping.importers.punches import PunchIngestOptions, ingest_punches
+from timekeeping.services.holiday_calendar import get_calendar
+from timekeeping.services.ph_holidays import seed_ph_holidays
+from timekeeping.services.punch_pairing import pair_punches
+
+
+def _month_bounds(month_param: str):
+    """'YYYY-MM' -> (first_day, last_day), or None if malformed."""
+    try:
+        year, month_num = map(int, month_param.split("-")[:2])
+        if not 1 <= month_num <= 12:
+            return None
+    except (ValueError, AttributeError):
+        return None
+    return date(year, month_num, 1), date(year, month_num, monthrange(year, month_num)[1])
+
+
+class _Echo:
+    """File-like sink for csv.writer: hands each formatted line straight back."""
+    def write(self, value):
+        return value
+
+
+EXPORT_COLUMNS = [
+    "id", "employee_id", "employee_name", "date", "time_in", "time_out",
+    "ot_hours", "late_minutes", "undertime_minutes", "is_rest_day", "is_absent", "holiday",
+]
 
 
 # ------------------------------
@@ -28,7 +60,8 @@ class TimeLogViewSet(viewsets.ModelViewSet):
     serializer_class = TimeLogSerializer
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        # TimeLogSerializer renders employee_name; join it instead of one query per row
+        qs = super().get_queryset().select_related("employee")
         employee_id = self.request.query_params.get("employee_id")
         month_param = self.request.query_params.get("month")  # Expected: YYYY-MM
 
@@ -36,40 +69,84 @@ class TimeLogViewSet(viewsets.ModelViewSet):
             qs = qs.filter(employee_id=employee_id)
 
         if month_param:
-            try:
-                year, month_num = map(int, month_param.split("-"))
-                if 1 <= month_num <= 12:
-                    qs = qs.filter(date__year=year, date__month=month_num)
-            except (ValueError, AttributeError):
-                pass
+            # A plain range keeps the (employee, date) / (date) indexes usable;
+            # date__year/date__month wrap the column in EXTRACT()
+            bounds = _month_bounds(month_param)
+            if bounds:
+                qs = qs.filter(date__range=bounds)
 
         return qs.order_by("-date")
 
+    def _scope(self, qs):
+        params = self.request.query_params
+        if params.get("employee_id"):
+            qs = qs.filter(employee_id=params["employee_id"])
+        if params.get("branch_id"):
+            qs = qs.filter(employee__branch_id=params["branch_id"])
+        if params.get("business_id"):
+            qs = qs.filter(employee__branch__business_id=params["business_id"])
+        return qs
+
     # 🔹 New endpoint: filter attendance history by business + branch + employee
     @action(detail=False, methods=["get"], url_path="by-business-branch")
     def by_business_branch(self, request):
         """
         Filter TimeLogs by employee + branch + business
         Example:
-          GET /api/timelogs/by-business-branch/?employee_id=1&branch_id=2&business_id=3
-        """
-        employee_id = request.query_params.get("employee_id")
-        branch_id = request.query_params.get("branch_id")
-        business_id = request.query_params.get("business_id")
+          GET /api/timekeeping/by-business-branch/?employee_id=1&branch_id=2&business_id=3&month=2025-08
 
-        qs = self.get_queryset()
+        Keyset-paginated on (-date, -id): follow `next` for older logs.
+        """
+        qs = self._scope(self.get_queryset())
 
-        if employee_id:
-            qs = qs.filter(employee_id=employee_id)
+        paginator = TimeLogPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
-        if branch_id:
-            qs = qs.filter(employee__branch_id=branch_id)
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream TimeLogs as CSV without materializing the result set.
+        Example:
+          GET /api/timekeeping/export/?start=2025-01-01&end=2025-12-31&business_id=3
+        Optional: employee_id, branch_id, business_id
+        """
+        try:
+            start = date.fromisoformat(request.query_params.get("start", ""))
+            end = date.fromisoformat(request.query_params.get("end", ""))
+        except ValueError:
+            return Response(
+                {"detail": "Query params `start` and `end` are required (YYYY-MM-DD)."}, status=400
+            )
+        if start > end:
+            return Response({"detail": "`start` must not be after `end`."}, status=400)
+
+        rows = (
+            self._scope(TimeLog.objects.filter(date__range=(start, end)))
+            .order_by("date", "id")
+            .values_list(
+                "id", "employee_id", "employee__first_name", "employee__last_name", "date",
+                "time_in", "time_out", "ot_hours", "late_minutes", "undertime_minutes",
+                "is_rest_day", "is_absent", "holiday__name",
+            )
+            .iterator(chunk_size=2000)
+        )
 
-        if business_id:
-            qs = qs.filter(employee__branch__business_id=business_id)
+        def _stream():
+            writer = csv.writer(_Echo())
+            yield writer.writerow(EXPORT_COLUMNS)
+            for (pk, emp_id, first, last, day, t_in, t_out, ot, late, under,
+                 rest, absent, holiday) in rows:
+                yield writer.writerow([
+                    pk, emp_id, f"{first} {last}", day.isoformat(),
+                    t_in.isoformat() if t_in else "", t_out.isoformat() if t_out else "",
+                    ot, late, under, int(rest), int(absent), holiday or "",
+                ])
 
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        response = StreamingHttpResponse(_stream(), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="timelogs_{start}_{end}.csv"'
+        return response
 
 
 # ------------------------------
@@ -77,6 +154,15 @@ class TimeLogViewSet(viewsets.ModelViewSet):
 # ------------------------------
 @extend_schema(tags=["Timekeeping"])
 class BulkTimeLogUploadView(APIView):
+    """
+    POST {"logs": [{"employee", "date", "time_in", "time_out"}, ...]}
+    Upserts on (employee, date) in batches, writing only the times: OT, late,
+    absence and holiday keep their stored values (defaults for new logs).
+    All-or-nothing: any invalid row
+    (or unknown employee) → 400 and nothing is written.
+    Responds with counts and ids; add ?include=logs to echo the stored rows.
+    """
+
     def post(self, request):
         logs = request.data.get("logs", None)
         if not isinstance(logs, list):
@@ -85,22 +171,21 @@ class BulkTimeLogUploadView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        serializer = TimeLogSerializer(
-            data=logs, many=True, context={"request": request}
-        )
-        serializer.is_valid(raise_exception=True)
-
-        # All-or-nothing write for consistency
-        with transaction.atomic():
-            instances = serializer.save()
+        result = upsert_timelog_rows(logs)
+        if result.errors:
+            return Response({"errors": result.errors[:100]}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(
-            {
-                "message": f"{len(instances)} time logs created successfully.",
-                "data": TimeLogSerializer(instances, many=True).data,
-            },
-            status=status.HTTP_201_CREATED,
-        )
+        body = {
+            "message": f"{result.created} time logs created, {result.updated} updated.",
+            "created": result.created,
+            "updated": result.updated,
+            "unchanged": result.unchanged,
+            "ids": result.ids,
+        }
+        if request.query_params.get("include") == "logs":
+            instances = TimeLog.objects.filter(id__in=result.ids).select_related("employee").order_by("id")
+            body["data"] = TimeLogSerializer(instances, many=True).data
+        return Response(body, status=status.HTTP_201_CREATED)
 
 
 # ------------------------------
@@ -114,8 +199,8 @@ class HolidayViewSet(viewsets.ModelViewSet):
     Endpoints:
       - GET  /holidays/?year=2025&type=REGULAR
       - GET  /holidays/upcoming/
-      - GET  /holidays/on/YYYY-MM-DD/
-      - POST /holidays/seed_ph/<year>/
+      - GET  /holidays/on/YYYY-MM-DD/?branch=<id>   (served from the holiday calendar)
+      - POST /holidays/seed_ph/<year>/?to=<year>&refresh=1   (offline rules; refresh adds the online API)
     """
 
     queryset = Holiday.objects.all().order_by("date")
@@ -146,53 +231,29 @@ class HolidayViewSet(viewsets.ModelViewSet):
             return Response(
                 {"detail": "Invalid date format. Use YYYY-MM-DD."}, status=400
             )
-        qs = self.get_queryset().filter(date=target)
-        if not qs.exists():
+        branch = request.query_params.get("branch")
+        holiday = get_calendar(target.year).get(target, int(branch) if branch and branch.isdigit() else None)
+        if holiday is None:
             return Response({"is_holiday": False, "holiday": None})
-        serializer = self.get_serializer(qs.first())
+        serializer = self.get_serializer(holiday)
         return Response({"is_holiday": True, "holiday": serializer.data})
 
     @action(detail=False, methods=["post"], url_path=r"seed_ph/(?P<year>\d{4})")
     def seed_ph(self, request, year=None):
         """
-        Seed recurring PH holidays for a given year.
-        Skips duplicates (date is unique).
+        Seed PH holidays for a year (or up to ?to=YYYY) from the bundled rules;
+        no network needed. ?refresh=1 also merges the online holiday API.
+        Skips dates that already have a nationwide holiday.
         """
         year = int(year)
-        data_map = get_ph_recurring_holidays(year)
-        created, skipped = [], []
-
-        with transaction.atomic():
-            # REGULAR
-            for name, d in data_map["REGULAR"]:
-                obj, was_created = Holiday.objects.get_or_create(
-                    date=d,
-                    defaults={
-                        "name": name,
-                        "type": Holiday.REGULAR,
-                        "multiplier": PH_DEFAULT_MULTIPLIERS["REGULAR"],
-                        "is_national": True,
-                    },
-                )
-                (created if was_created else skipped).append(str(d))
-
-            # SPECIAL
-            for name, d in data_map["SPECIAL"]:
-                obj, was_created = Holiday.objects.get_or_create(
-                    date=d,
-                    defaults={
-                        "name": name,
-                        "type": Holiday.SPECIAL,
-                        "multiplier": PH_DEFAULT_MULTIPLIERS["SPECIAL"],
-                        "is_national": True,
-                    },
-                )
-                (created if was_created else skipped).append(str(d))
+        to = request.query_params.get("to")
+        refresh = request.query_params.get("refresh", "").lower() in ("1", "true", "yes")
+        try:
+            result = seed_ph_holidays(year, int(to) if to else year, refresh=refresh)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(
-            {"year": year, "created_dates": created, "skipped_existing_dates": skipped},
-            status=status.HTTP_201_CREATED,
-        )
+        return Response({"year": year, **result}, status=status.HTTP_201_CREATED)
 
 
 # ------------------------------
@@ -212,6 +273,10 @@ class TimeLogImportView(APIView):
             time_format=ser.validated_data["time_format"],
             has_header=ser.validated_data["has_header"],
             dry_run=ser.validated_data["dry_run"],
+            mode=ser.validated_data["mode"],
+            chunk_size=ser.validated_data["chunk_size"],
+            workers=ser.validated_data["workers"],
+            engine=ser.validated_data["engine"],
         )
 
         result = import_timelogs(f.file, f.name, options=opts)
@@ -226,8 +291,101 @@ class TimeLogImportView(APIView):
                     "created": result.created,
                     "updated": result.updated,
                     "skipped": result.skipped,
+                    "elapsed_seconds": result.elapsed_seconds,
+                    "rows_per_second": result.rows_per_second,
+                    "unchanged": result.unchanged,
                 },
                 "errors": result.errors[:100],  # cap to avoid huge payloads
+                **({"preview": result.preview} if opts.dry_run else {}),
             },
             status=status.HTTP_200_OK,
         )
+
+
+# ------------------------------
+# Background import jobs
+# ------------------------------
+@extend_schema(tags=["Timekeeping"])
+class TimeLogImportJobViewSet(mixins.CreateModelMixin,
+                              mixins.RetrieveModelMixin,
+                              mixins.ListModelMixin,
+                              viewsets.GenericViewSet):
+    """
+    POST   /timelog-import-jobs/              multipart upload (same fields as /timelogs/import/) → 202 + job
+    GET    /timelog-import-jobs/{id}/         status, percent_complete, rows_per_second, counts
+    GET    /timelog-import-jobs/{id}/errors/  full per-row error report (CSV download)
+    Jobs are run by `manage.py process_timelog_imports`.
+    Users only see the jobs they uploaded; staff see every job.
+    """
+    queryset = TimeLogImportJob.objects.all()
+    serializer_class = TimeLogImportJobSerializer
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.request.user.is_staff:
+            return qs
+        # Uploads carry no business of their own; the uploader owns the job and its error report
+        return qs.filter(created_by=self.request.user)
+
+    @extend_schema(request=TimeLogImportSerializer, responses={202: TimeLogImportJobSerializer})
+    def create(self, request, *args, **kwargs):
+        ser = TimeLogImportSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        options = dict(ser.validated_data)
+        upload = options.pop("file")
+        job = enqueue_import(upload, options, user=request.user)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["get"], url_path="errors")
+    def errors(self, request, pk=None):
+        job = self.get_object()
+        if not job.errors_file:
+            return Response({"detail": "This job has no errors."}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            job.errors_file.open("rb"),
+            as_attachment=True,
+            filename=f"timelog_import_{job.pk}_errors.csv",
+            content_type="text/csv",
+        )
+
+
+# ------------------------------
+# Raw device punches
+# ------------------------------
+@extend_schema(tags=["Timekeeping"], request=PunchUploadSerializer)
+class PunchUploadView(APIView):
+    """
+    POST a device dump (CSV, or a ZKTeco attlog .dat). Punches are appended to
+    the raw store; with pair=true (default) the new punches are then folded
+    into TimeLogs. Otherwise `manage.py pair_punches` does it later.
+    """
+
+    def post(self, request, *args, **kwargs):
+        ser = PunchUploadSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        f = ser.validated_data["file"]
+        opts = PunchIngestOptions(
+            employee_field=ser.validated_data["employee_field"],
+            device_id=ser.validated_data["device_id"],
+        )
+        try:
+            result = ingest_punches(f.file, f.name, options=opts)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        body = {
+            "total_rows": result.total_rows,
+            "inserted": result.inserted,
+            "duplicates": result.duplicates,
+            "skipped": result.skipped,
+            "errors": result.errors[:100],
+        }
+        if ser.validated_data["pair"]:
+            paired = pair_punches()
+            body["pairing"] = {
+                "punches": paired.punches,
+                "created": paired.created,
+                "updated": paired.updated,
+                "unchanged": paired.unchanged,
+            }
+        return Response(body, status=status.HTTP_200_OK)
@@ -76,6 +76,8 @@ export default function AttendancePage() {
   );
   const [statusValue, setStatusValue] = useState<string>("Present");
   const [submitting, setSubmitting] = useState(false);
+  const [historyNext, setHistoryNext] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // === Load businesses & branches ===
   useEffect(() => {
@@ -118,11 +120,12 @@ export default function AttendancePage() {
     if (!selectedBranch || !selectedBusinessId) return;
     (async () => {
       try {
-        const data = await getTimekeepingByBusinessBranch(
+        const page = await getTimekeepingByBusinessBranch(
           selectedBusinessId,
           selectedBranch
         );
-        setAttendanceData(Array.isArray(data) ? data.map(mapApiToRecord) : []);
+        setAttendanceData(page.results.map(mapApiToRecord));
+        setHistoryNext(page.next);
       } catch (err: any) {
         toast({
           title: "Error",
@@ -133,6 +136,30 @@ export default function AttendancePage() {
     })();
   }, [selectedBranch, selectedBusinessId, toast]);
 
+  // === Load older attendance (one page at a time) ===
+  const loadOlderAttendance = async () => {
+    if (!historyNext || !selectedBranch || !selectedBusinessId) return;
+    try {
+      setLoadingMore(true);
+      const page = await getTimekeepingByBusinessBranch(
+        selectedBusinessId,
+        selectedBranch,
+        undefined,
+        historyNext
+      );
+      setAttendanceData((prev) => [...prev, ...page.results.map(mapApiToRecord)]);
+      setHistoryNext(page.next);
+    } catch (err: any) {
+      toast({
+        title: "Error",
+        description: err?.message || "Failed to load attendance records.",
+        variant: "destructive",
+      });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // === Map employee names ===
   const employeesMap = useMemo(() => {
     const m = new Map<number, string>();
@@ -374,6 +401,17 @@ export default function AttendancePage() {
               </tbody>
             </table>
           </div>
+          {historyNext && (
+            <div className="flex justify-center mt-4">
+              <Button
+                variant="outline"
+                onClick={loadOlderAttendance}
+                disabled={loadingMore}
+              >
+                {loadingMore ? "Loading..." : "Load older records"}
+              </Button>
+            </div>
+          )}
         </div>
       </Card>
     </div>
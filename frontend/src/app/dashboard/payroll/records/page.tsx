@@ -2,6 +2,7 @@
 
 import React, { useEffect, useState } from "react";
 import { getRecords } from "@/lib/api"; // adjust path to your api file
+import { Button } from "@/components/ui/button";
 import {
   Table,
   TableBody,
@@ -16,12 +17,15 @@ const PayrollRecordsPage = () => {
   const [records, setRecords] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [next, setNext] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchRecords = async () => {
       try {
-        const data = await getRecords();
-        setRecords(data);
+        const page = await getRecords();
+        setRecords(page.results);
+        setNext(page.next);
       } catch (err: any) {
         setError(err.message || "Failed to load records");
       } finally {
@@ -32,6 +36,21 @@ const PayrollRecordsPage = () => {
     fetchRecords();
   }, []);
 
+  // Pages are fetched on demand instead of loading every record up front
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const page = await getRecords(next);
+      setRecords((prev) => [...prev, ...page.results]);
+      setNext(page.next);
+    } catch (err: any) {
+      setError(err.message || "Failed to load records");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <div>
       <h1 className="text-2xl font-bold mb-4">Payroll Records</h1>
@@ -81,6 +100,14 @@ const PayrollRecordsPage = () => {
           </TableBody>
         </Table>
       )}
+
+      {!loading && !error && next && (
+        <div className="flex justify-center mt-4">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 };
@@ -624,11 +624,17 @@ export async function getTimekeeping() {
   return data;
 }
 // GET TIMEKEEPING HISTORY BY BUSINESS + BRANCH (+ optional employee)
+// Keyset-paginated, newest first ({ next, results }). Pass the previous page's
+// `next` to fetch older logs; `next` is null on the last page. For bulk use
+// (reports, backups) stream /api/timekeeping/export/ instead.
+export type TimekeepingPage = { next: string | null; results: any[] };
+
 export async function getTimekeepingByBusinessBranch(
   businessId: number,
   branchId: number,
-  employeeId?: number
-) {
+  employeeId?: number,
+  next?: string | null
+): Promise<TimekeepingPage> {
   const token = localStorage.getItem("token");
   if (!token) throw new Error("No token found");
 
@@ -641,14 +647,17 @@ export async function getTimekeepingByBusinessBranch(
     ...(employeeId ? { employee_id: String(employeeId) } : {}),
   });
 
-  const res = await fetch(`${base}/api/timekeeping/by-business-branch/?${query}`, {
-    method: "GET",
-    headers: {
-      Authorization: `Token ${token}`,
-      "Content-Type": "application/json",
-    },
-    cache: "no-store",
-  });
+  const res = await fetch(
+    next || `${base}/api/timekeeping/by-business-branch/?${query}`,
+    {
+      method: "GET",
+      headers: {
+        Authorization: `Token ${token}`,
+        "Content-Type": "application/json",
+      },
+      cache: "no-store",
+    }
+  );
 
   const data = await res.json();
   if (!res.ok) {
@@ -659,7 +668,7 @@ export async function getTimekeepingByBusinessBranch(
         "Failed to fetch timelogs by business/branch"
     );
   }
-  return data;
+  return { next: data.next ?? null, results: data.results ?? data };
 }
 
 // ADD Timekeeping
@@ -1322,12 +1331,16 @@ export async function previewPayslip(selectedEmployee: string, selectedPeriod: s
 
 // -----------------------------------------------------------------------------RECORDS OF PAYSLIP----------------------------------------------------
 // GET Records
-export async function getRecords() {
+// /records/ is keyset-paginated ({ next, results }). Pass the previous page's
+// `next` to fetch the following one; `next` is null on the last page.
+export type RecordsPage = { next: string | null; results: any[] };
+
+export async function getRecords(next?: string | null): Promise<RecordsPage> {
   const token = localStorage.getItem("token");
   if (!token) throw new Error("No token found");
 
   const res = await fetch(
-    process.env.NEXT_PUBLIC_API_BASE_URL + "/api/records/",
+    next || process.env.NEXT_PUBLIC_API_BASE_URL + "/api/records/",
     {
       method: "GET",
       headers: {
@@ -1340,10 +1353,10 @@ export async function getRecords() {
   const data = await res.json();
 
   if (!res.ok) {
-    throw new Error(data.detail || "Failed to fetch employees");
+    throw new Error(data.detail || "Failed to fetch records");
   }
 
-  return data; // this is the employee list
+  return { next: data.next ?? null, results: data.results ?? data };
 }
 // ADDRecords
 export async function AddRecords(body: any) {